@@ -120,13 +120,27 @@ def compile(file, cfile=None, dfile=None, doraise=False):
             return
     if cfile is None:
         cfile = file + (__debug__ and 'c' or 'o')
-    with open(cfile, 'wb') as fc:
-        fc.write('\0\0\0\0')
-        wr_long(fc, timestamp)
-        marshal.dump(codeobject, fc)
-        fc.flush()
-        fc.seek(0, 0)
-        fc.write(MAGIC)
+    # PyPy: write to a temporary file and rename it, so that
+    # processes compiling or importing the same module concurrently never
+    # see a partially written file
+    tmpfile = '%s.%d.tmp' % (cfile, os.getpid())
+    try:
+        with open(tmpfile, 'wb') as fc:
+            fc.write('\0\0\0\0')
+            wr_long(fc, timestamp)
+            marshal.dump(codeobject, fc)
+            fc.flush()
+            fc.seek(0, 0)
+            fc.write(MAGIC)
+        if os.name == 'nt' and os.path.exists(cfile):
+            os.unlink(cfile)    # os.rename() does not replace it on Windows
+        os.rename(tmpfile, cfile)
+    except:
+        try:
+            os.unlink(tmpfile)
+        except OSError:
+            pass
+        raise
 
 def main(args=None):
     """Compile several source files.
@@ -71,6 +71,25 @@ class CompileallTests(unittest.TestCase):
         os.unlink(self.bc_path)
         os.unlink(self.bc_path2)
 
+    def test_compile_dir_workers(self):
+        subdir = os.path.join(self.directory, 'sub')
+        os.mkdir(subdir)
+        source_path3 = os.path.join(subdir, '_test3.py')
+        shutil.copyfile(self.source_path, source_path3)
+        self.assertTrue(compileall.compile_dir(self.directory, quiet=True,
+                                               workers=2))
+        for fn in (self.source_path, self.source_path2, source_path3):
+            self.assertTrue(os.path.isfile(fn + ('c' if __debug__ else 'o')))
+        self.assertRaises(ValueError, compileall.compile_dir,
+                          self.directory, workers=-1)
+
+    def test_no_temporary_files_left(self):
+        py_compile.compile(self.source_path)
+        py_compile.compile(self.source_path)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         sorted(['_test.py', '_test2.py',
+                                 os.path.basename(self.bc_path)]))
+
 def test_main():
     test_support.run_unittest(CompileallTests)
 
@@ -144,6 +144,12 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
               cmdline="--ext",
               default=None),
 
+    StrOption("frozenmodules",
+              "Comma-separated list of stdlib modules whose code objects are "
+              "built into the binary",
+              cmdline="--frozenmodules",
+              default=None),
+
     BoolOption("translationmodules",
           "use only those modules that are needed to run translate.py on pypy",
                default=False,
@@ -153,6 +159,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
     BoolOption("lonepycfiles", "Import pyc files with no matching py file",
                default=False),
 
+    BoolOption("lazypycfiles",
+               "Unmarshal the functions of pyc files only when they are defined",
+               default=False),
+
     StrOption("soabi",
               "Tag to differentiate extension modules built for different Python interpreters",
               cmdline="--soabi",
@@ -210,6 +220,10 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         IntOption("methodcachesizeexp",
                   " 2 ** methodcachesizeexp is the size of the of the method cache ",
                   default=11),
+        IntOption("methodcachemaxsizeexp",
+                  "the method cache grows by itself up to 2 ** "
+                  "methodcachemaxsizeexp entries",
+                  default=15),
         BoolOption("intshortcut",
                    "special case addition and subtraction of two integers in BINARY_ADD/"
                    "/BINARY_SUBTRACT and their inplace counterparts",
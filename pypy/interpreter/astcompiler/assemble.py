@@ -11,6 +11,10 @@ from pypy.interpreter.miscutils import string_sort
 from pypy.tool import stdlib_opcode as ops
 
 
+# how many jumps to jumps are followed at most when threading a jump
+THREAD_JUMPS_LIMIT = 16
+
+
 class StackDepthComputationError(Exception):
     pass
 
@@ -276,6 +280,154 @@ class PythonCodeMaker(ast.ASTVisitor):
             self.lineno = lineno
             self.lineno_set = False
 
+    def _optimize_blocks(self):
+        """Peephole optimizations done on the graph of blocks, before it is
+        linearized: fold conditional jumps on a constant, thread jumps
+        going to other jumps, and empty the blocks that can no longer be
+        reached.
+        """
+        blocks = self.first_block.post_order()
+        positions = {}
+        for i in range(len(blocks)):
+            blocks[i].marked = 0
+            positions[blocks[i]] = i
+        for block in blocks:
+            self._fold_constant_jumps(block, positions)
+        for block in blocks:
+            for instr in block.instructions:
+                if instr.has_jump:
+                    self._thread_jump(instr)
+        reachable = _reachable_blocks(self.first_block)
+        for block in blocks:
+            if block not in reachable:
+                del block.instructions[:]
+
+    def _fold_constant_jumps(self, block, positions):
+        """Replace LOAD_CONST followed by a conditional jump with an
+        unconditional jump or nothing at all.  'positions' gives the
+        order in which the blocks are laid out."""
+        instrs = block.instructions
+        i = 0
+        while i < len(instrs) - 1:
+            load, jump = instrs[i], instrs[i + 1]
+            i += 1
+            if load.opcode != ops.LOAD_CONST or not jump.has_jump:
+                continue
+            op = jump.opcode
+            if op == ops.POP_JUMP_IF_TRUE or op == ops.JUMP_IF_TRUE_OR_POP:
+                jump_if = True
+            elif (op == ops.POP_JUMP_IF_FALSE or
+                  op == ops.JUMP_IF_FALSE_OR_POP):
+                jump_if = False
+            else:
+                continue
+            taken = self.space.is_true(self.consts_w[load.arg]) == jump_if
+            target = jump.jump[0]
+            lineno = load.lineno or jump.lineno
+            if taken:
+                # only backward jumps are JUMP_ABSOLUTE, which is where
+                # the JIT looks for loops
+                if positions[target] > positions[block]:
+                    new_jump = Instruction(ops.JUMP_FORWARD)
+                    new_jump.jump_to(target)
+                else:
+                    new_jump = Instruction(ops.JUMP_ABSOLUTE)
+                    new_jump.jump_to(target, True)
+                if op == ops.POP_JUMP_IF_TRUE or op == ops.POP_JUMP_IF_FALSE:
+                    new_jump.lineno = lineno
+                    instrs[i - 1] = new_jump
+                else:
+                    # the constant stays on the stack
+                    new_jump.lineno = jump.lineno
+                    instrs[i] = new_jump
+                    i += 1
+                # the rest of the block is dead
+                del instrs[i:]
+                break
+            if lineno:
+                # don't lose the line number when removing both
+                # instructions, give it to the next one if possible
+                if i + 1 >= len(instrs) or instrs[i + 1].lineno:
+                    continue
+                instrs[i + 1].lineno = lineno
+            del instrs[i - 1:i + 1]
+            i -= 1
+
+    def _thread_jump(self, instr):
+        """Make a jump going to an unconditional jump go directly to the
+        final target."""
+        op = instr.opcode
+        if op == ops.JUMP_ABSOLUTE or op == ops.JUMP_FORWARD:
+            # JUMP_ABSOLUTE is the only opcode where the JIT can start
+            # a loop, so if the final target is reached by a backward
+            # JUMP_ABSOLUTE, the new jump must still be a JUMP_ABSOLUTE
+            follow_absolute = True
+        elif (op == ops.POP_JUMP_IF_TRUE or op == ops.POP_JUMP_IF_FALSE or
+              op == ops.JUMP_IF_TRUE_OR_POP or op == ops.JUMP_IF_FALSE_OR_POP):
+            follow_absolute = False
+        else:
+            return
+        target, absolute = instr.jump
+        changed = False
+        through_absolute = False
+        for i in range(THREAD_JUMPS_LIMIT):
+            block = target
+            while not block.instructions and block.next_block is not None:
+                block = block.next_block
+            if not block.instructions:
+                break
+            first = block.instructions[0]
+            if first.lineno:
+                break    # it would skip a line event
+            if follow_absolute and first.opcode == ops.RETURN_VALUE:
+                # Replace JUMP_* to a RETURN into just a RETURN
+                instr.opcode = ops.RETURN_VALUE
+                instr.arg = 0
+                instr.has_jump = False
+                return
+            if not first.has_jump:
+                break    # not a jump
+            if first.opcode == ops.JUMP_FORWARD or (
+                    follow_absolute and first.opcode == ops.JUMP_ABSOLUTE):
+                if first.jump[0] is target:
+                    break    # infinite loop
+                if first.opcode == ops.JUMP_ABSOLUTE:
+                    through_absolute = True
+                target = first.jump[0]
+                changed = True
+            else:
+                break
+        if changed:
+            if op == ops.JUMP_FORWARD and through_absolute:
+                instr.opcode = ops.JUMP_ABSOLUTE
+                absolute = True
+            instr.jump = (target, absolute)
+
+    def _remove_jumps_to_next_block(self, blocks):
+        """Remove the unconditional jumps that go to the instruction just
+        after them, once the blocks are linearized."""
+        for i in range(len(blocks)):
+            instrs = blocks[i].instructions
+            if not instrs:
+                continue
+            instr = instrs[-1]
+            if not (instr.opcode == ops.JUMP_ABSOLUTE or
+                    instr.opcode == ops.JUMP_FORWARD):
+                continue
+            if instr.lineno:
+                continue    # keep it for the line event
+            j = i + 1
+            while j < len(blocks) and not blocks[j].instructions:
+                j += 1
+            if j == len(blocks):
+                continue
+            next_block = blocks[j]
+            target = instr.jump[0]
+            while not target.instructions and target.next_block is not None:
+                target = target.next_block
+            if target is next_block:
+                instrs.pop()
+
     def _resolve_block_targets(self, blocks):
         """Compute the arguments of jump instructions."""
         last_extended_arg_count = 0
@@ -287,7 +439,6 @@ class PythonCodeMaker(ast.ASTVisitor):
         while True:
             extended_arg_count = 0
             offset = 0
-            force_redo = False
             # Calculate the code offset of each block.
             for block in blocks:
                 block.offset = offset
@@ -297,27 +448,8 @@ class PythonCodeMaker(ast.ASTVisitor):
                 for instr in block.instructions:
                     offset += instr.size()
                     if instr.has_jump:
+                        # jumps were already threaded by _optimize_blocks()
                         target, absolute = instr.jump
-                        op = instr.opcode
-                        # Optimize an unconditional jump going to another
-                        # unconditional jump.
-                        if op == ops.JUMP_ABSOLUTE or op == ops.JUMP_FORWARD:
-                            if target.instructions:
-                                target_op = target.instructions[0].opcode
-                                if target_op == ops.JUMP_ABSOLUTE:
-                                    target = target.instructions[0].jump[0]
-                                    instr.opcode = ops.JUMP_ABSOLUTE
-                                    absolute = True
-                                elif target_op == ops.RETURN_VALUE:
-                                    # Replace JUMP_* to a RETURN into
-                                    # just a RETURN
-                                    instr.opcode = ops.RETURN_VALUE
-                                    instr.arg = 0
-                                    instr.has_jump = False
-                                    # The size of the code changed,
-                                    # we have to trigger another pass
-                                    force_redo = True
-                                    continue
                         if absolute:
                             jump_arg = target.offset
                         else:
@@ -325,8 +457,7 @@ class PythonCodeMaker(ast.ASTVisitor):
                         instr.arg = jump_arg
                         if jump_arg > 0xFFFF:
                             extended_arg_count += 1
-            if (extended_arg_count == last_extended_arg_count and
-                not force_redo):
+            if extended_arg_count == last_extended_arg_count:
                 break
             else:
                 last_extended_arg_count = extended_arg_count
@@ -451,7 +582,9 @@ class PythonCodeMaker(ast.ASTVisitor):
                 self.first_lineno = self.first_block.instructions[0].lineno
             else:
                 self.first_lineno = 1
+        self._optimize_blocks()
         blocks = self.first_block.post_order()
+        self._remove_jumps_to_next_block(blocks)
         self._resolve_block_targets(blocks)
         lnotab = self._build_lnotab(blocks)
         stack_depth = self._stacksize(blocks)
@@ -487,6 +620,32 @@ def _list_from_dict(d, offset=0):
     return result
 
 
+def _reachable_blocks(first_block):
+    """Return a dict whose keys are the blocks that control flow can
+    reach from first_block."""
+    seen = {first_block: None}
+    pending = [first_block]
+    while pending:
+        block = pending.pop()
+        falls_through = True
+        for instr in block.instructions:
+            if instr.has_jump:
+                target = instr.jump[0]
+                if target not in seen:
+                    seen[target] = None
+                    pending.append(target)
+            op = instr.opcode
+            falls_through = not (op == ops.JUMP_ABSOLUTE or
+                                 op == ops.JUMP_FORWARD or
+                                 op == ops.RETURN_VALUE or
+                                 op == ops.RAISE_VARARGS)
+        next_block = block.next_block
+        if falls_through and next_block is not None and next_block not in seen:
+            seen[next_block] = None
+            pending.append(next_block)
+    return seen
+
+
 _static_opcode_stack_effects = {
     ops.NOP: 0,
     ops.STOP_CODE: 0,
@@ -23,7 +23,9 @@ def generate_function_code(expr, space):
     symbols = symtable.SymtableBuilder(space, ast, info)
     generator = codegen.FunctionCodeGenerator(
         space, 'function', function_ast, 1, symbols, info)
+    generator._optimize_blocks()
     blocks = generator.first_block.post_order()
+    generator._remove_jumps_to_next_block(blocks)
     generator._resolve_block_targets(blocks)
     return generator, blocks
 
@@ -1138,6 +1140,82 @@ class TestOptimizations:
                           ops.POP_JUMP_IF_FALSE: 1,
                           ops.RETURN_VALUE: 2}
 
+    def test_fold_constant_conditional_jump(self):
+        # the conditions of comprehensions are not folded in the AST
+        source = """def f(y):
+            return [x for x in y if 1]
+        """
+        counts = self.count_instructions(source)
+        assert ops.LOAD_CONST not in counts
+        assert ops.POP_JUMP_IF_FALSE not in counts
+        assert counts[ops.LIST_APPEND] == 1
+        source = """def f(y):
+            return [x for x in y if 0]
+        """
+        counts = self.count_instructions(source)
+        assert ops.LOAD_CONST not in counts
+        assert ops.POP_JUMP_IF_FALSE not in counts
+        assert ops.LIST_APPEND not in counts
+        assert counts[ops.JUMP_ABSOLUTE] == 1
+        space = self.space
+        w_res = space.appexec([], """():
+            return ([x for x in range(3) if 1], [x for x in range(3) if 0],
+                    [x for x in range(3) if ()], list(x for x in (5,) if 1))
+        """)
+        assert space.unwrap(w_res) == ([0, 1, 2], [], [], [5])
+
+    def test_thread_conditional_jump(self):
+        source = """def f(x, y):
+            if x:
+                if y:
+                    g()
+                else:
+                    h()
+            else:
+                k()
+        """
+        code, blocks = generate_function_code(source, self.space)
+        instrs = []
+        for block in blocks:
+            instrs.extend(block.instructions)
+        # no jump goes to a JUMP_FORWARD, and the forward jumps stay
+        # relative
+        for instr in instrs:
+            assert instr.opcode != ops.JUMP_ABSOLUTE
+            if instr.has_jump:
+                target = instr.jump[0]
+                while target is not None and not target.instructions:
+                    target = target.next_block
+                if target is not None:
+                    assert target.instructions[0].opcode != ops.JUMP_FORWARD
+
+    def test_thread_keeps_loop_jump_absolute(self):
+        source = """def f(x):
+            while x:
+                if x.y:
+                    continue
+                x.z()
+        """
+        counts = self.count_instructions(source)
+        assert counts[ops.JUMP_ABSOLUTE] >= 1
+
+    def test_thread_jump_to_return_keeps_line(self):
+        from pypy.interpreter.astcompiler.assemble import Block, Instruction
+        generator, _ = generate_function_code("def f(): pass", self.space)
+        block = Block()
+        ret = Instruction(ops.RETURN_VALUE)
+        ret.lineno = 3
+        block.instructions.append(ret)
+        jump = Instruction(ops.JUMP_FORWARD)
+        jump.jump_to(block)
+        generator._thread_jump(jump)
+        # the RETURN_VALUE starts a line, the jump must not skip it
+        assert jump.opcode == ops.JUMP_FORWARD
+        ret.lineno = 0
+        generator._thread_jump(jump)
+        assert jump.opcode == ops.RETURN_VALUE
+        assert not jump.has_jump
+
     def test_remove_dead_yield(self):
         source = """def f(x):
             return
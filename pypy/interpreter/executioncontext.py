@@ -1,4 +1,5 @@
 import sys
+import weakref
 from pypy.interpreter.error import OperationError, get_cleared_operation_error
 from rpython.rlib.unroll import unrolling_iterable
 from rpython.rlib.objectmodel import specialize, not_rpython
@@ -166,9 +167,23 @@ class ExecutionContext(object):
             self._revdb_potential_stop_point(frame)
         if (frame.get_w_f_trace() is None or self.is_tracing or
             self.gettrace() is None):
+            self.record_line_event(frame)
             return
         self.run_trace_func(frame)
 
+    @objectmodel.always_inline
+    def record_line_event(self, frame):
+        if self.space.fromcache(LineRecorders).active:
+            self._record_line_event(frame)
+
+    def _record_line_event(self, frame):
+        line_events = self.space.fromcache(LineEventBuffer)
+        if line_events.active:
+            line_events.record(frame)
+        line_hits = self.space.fromcache(LineHitMaps)
+        if line_hits.active:
+            line_hits.record(frame)
+
     @jit.unroll_safe
     def run_trace_func(self, frame):
         code = frame.getcode() # promote the frame!
@@ -423,6 +438,172 @@ class ExecutionContext(object):
                         " traceback and see where this one comes from :-)")
 
 
+class LineRecorders(object):
+    """'active' is true if a LineEventBuffer or a LineHitMaps is active, so
+    that the interpreter only checks a single flag before each bytecode."""
+    _immutable_fields_ = ['active?']
+
+    def __init__(self, space):
+        self.space = space
+        self.active = False
+
+    def update(self):
+        space = self.space
+        self.active = (space.fromcache(LineEventBuffer).active or
+                       space.fromcache(LineHitMaps).active)
+
+
+class LineEventBuffer(object):
+    """Low-overhead alternative to a 'line' trace function: when active,
+    every line started by the interpreter or by JIT-compiled code is
+    appended as a (code, line) pair to two flat lists, which app-level
+    code empties in batches (see __pypy__.pop_line_events()).  Only one
+    out of every 'period' line events is recorded, and at most 'maxsize'
+    of them are kept until the lists are emptied: the events that don't
+    fit are only counted in 'dropped'.
+
+    Unlike settrace(), this does not force the frames or make the JIT
+    fall back to the interpreter: 'active' is quasi-immutable and
+    PyCode.get_line_starts() is constant-folded, so a trace only
+    contains the append for the bytecodes that really start a line.
+    """
+    _immutable_fields_ = ['active?']
+
+    def __init__(self, space):
+        self.space = space
+        self.active = False
+        self.period = 1
+        self.countdown = 1
+        self.maxsize = 1
+        self.dropped = 0
+        self.codes = []
+        self.lines = []
+
+    def start(self, period, maxsize):
+        assert period > 0
+        assert maxsize > 0
+        self.period = period
+        self.countdown = period
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.active = True
+        self.space.fromcache(LineRecorders).update()
+
+    def stop(self):
+        self.active = False
+        self.space.fromcache(LineRecorders).update()
+
+    def record(self, frame):
+        code = frame.getcode()
+        if code.hidden_applevel:
+            return
+        line = code.get_line_starts()[frame.last_instr]
+        if line < 0:
+            return
+        self.countdown -= 1
+        if self.countdown > 0:
+            return
+        self.countdown = self.period
+        if len(self.codes) >= self.maxsize:
+            self.dropped += 1
+            return
+        self.codes.append(code)
+        self.lines.append(line)
+
+    def pop_all(self):
+        codes = self.codes
+        lines = self.lines
+        self.codes = []
+        self.lines = []
+        return codes, lines
+
+
+class LineHitMaps(object):
+    """Coverage without a trace function: when active, every line started
+    by the interpreter or by JIT-compiled code sets a flag in the
+    'line_hits' list of its PyCode, indexed by 'line - co_firstlineno'.
+    The codes that got such a list are remembered here, through weak
+    references, so that the flags can be read and cleared in bulk (see
+    __pypy__.get_line_hits()).
+
+    As with LineEventBuffer, a JIT trace only contains a store of a
+    constant at a constant index for each bytecode that starts a line.
+    """
+    _immutable_fields_ = ['active?']
+
+    def __init__(self, space):
+        self.space = space
+        self.active = False
+        self.codes_wref = []
+        self.next_cleanup = 16
+
+    def start(self):
+        self.active = True
+        self.space.fromcache(LineRecorders).update()
+
+    def stop(self):
+        self.active = False
+        self.space.fromcache(LineRecorders).update()
+
+    def record(self, frame):
+        code = frame.getcode()
+        if code.hidden_applevel:
+            return
+        line = code.get_line_starts()[frame.last_instr]
+        if line < 0:
+            return
+        line_hits = code.line_hits
+        if line_hits is None:
+            line_hits = self._allocate(code)
+        line_hits[line - code.co_firstlineno] = True
+
+    @jit.dont_look_inside
+    def _allocate(self, code):
+        last_line = code.co_firstlineno
+        for line in code.get_line_starts():
+            if line > last_line:
+                last_line = line
+        line_hits = [False] * (last_line - code.co_firstlineno + 1)
+        code.line_hits = line_hits
+        if len(self.codes_wref) >= self.next_cleanup:
+            self._remove_dead_codes()
+            self.next_cleanup = max(16, 2 * len(self.codes_wref))
+        self.codes_wref.append(weakref.ref(code))
+        return line_hits
+
+    def _remove_dead_codes(self):
+        self.codes_wref = [wref for wref in self.codes_wref
+                                if wref() is not None]
+
+    def get_codes(self):
+        "Return the codes that are still alive and got a 'line_hits' list."
+        codes = []
+        for wref in self.codes_wref:
+            code = wref()
+            if code is not None:
+                codes.append(code)
+        return codes
+
+    def get_hits(self, code):
+        "Return the list of lines of 'code' that were hit, in order."
+        lines = []
+        line_hits = code.line_hits
+        if line_hits is not None:
+            for i in range(len(line_hits)):
+                if line_hits[i]:
+                    lines.append(code.co_firstlineno + i)
+        return lines
+
+    def reset(self):
+        # clear the flags in-place: replacing the lists would invalidate
+        # all the JIT-compiled code that depends on them
+        for code in self.get_codes():
+            line_hits = code.line_hits
+            for i in range(len(line_hits)):
+                line_hits[i] = False
+        self._remove_dead_codes()
+
+
 class AbstractActionFlag(object):
     """This holds in an integer the 'ticker'.  If threads are enabled,
     it is decremented at each bytecode; when it reaches zero, we release
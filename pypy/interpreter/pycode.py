@@ -7,6 +7,7 @@ The bytecode interpreter itself is implemented by the PyFrame class.
 import dis, imp, struct, types, new, sys, os
 
 from pypy.interpreter import eval
+from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec
@@ -53,6 +54,60 @@ class CodeHookCache(object):
     def __init__(self, space):
         self._code_hook = None
 
+class W_LazyCode(W_Root):
+    """Placeholder for a nested code object in co_consts_w, built only
+    the first time a function is made out of it.  See the option
+    objspace.lazypycfiles and pypy.module.marshal.interp_marshal."""
+    _immutable_fields_ = ["w_code?"]
+
+    def __init__(self):
+        self.w_code = None
+        self.kill_docstrings = False
+        # see update_filenames()
+        self.new_filename = None
+        self.old_filename = None
+
+    def materialize(self, space):
+        w_code = self.w_code
+        if w_code is None:
+            w_code = self._load(space)
+            if self.kill_docstrings:
+                w_code.remove_docstrings(space)
+            if self.new_filename is not None:
+                from pypy.module.imp.importing import update_code_filenames
+                update_code_filenames(space, w_code, self.new_filename,
+                                      self.old_filename)
+            self.w_code = w_code
+        return w_code
+
+    def _load(self, space):
+        "Build and return the PyCode.  Called at most once."
+        raise NotImplementedError
+
+    def remove_docstrings(self, space):
+        if self.w_code is not None:
+            self.w_code.remove_docstrings(space)
+        else:
+            self.kill_docstrings = True
+
+    def update_filenames(self, space, pathname, oldname):
+        """Like importing.update_code_filenames(), applied when the code
+        object is built if it is not built yet."""
+        if self.w_code is not None:
+            from pypy.module.imp.importing import update_code_filenames
+            update_code_filenames(space, self.w_code, pathname, oldname)
+        elif self.new_filename is None:
+            self.new_filename = pathname
+            self.old_filename = oldname
+        elif self.new_filename == oldname:
+            self.new_filename = pathname
+
+def materialize_const(space, w_const):
+    if isinstance(w_const, W_LazyCode):
+        return w_const.materialize(space)
+    return w_const
+
+
 class PyCode(eval.Code):
     "CPython-style code objects."
     _immutable_fields_ = ["_signature", "co_argcount", "co_cellvars[*]",
@@ -62,7 +117,9 @@ class PyCode(eval.Code):
                           "co_stacksize", "co_varnames[*]",
                           "_args_as_cellvars[*]",
                           "w_globals?",
-                          "cell_families[*]"]
+                          "cell_families[*]",
+                          "_line_starts?[*]",
+                          "line_hits?"]
 
     def __init__(self, space,  argcount, nlocals, stacksize, flags,
                      code, consts, names, varnames, filename,
@@ -93,6 +150,8 @@ class PyCode(eval.Code):
         self.w_globals = None
         self.hidden_applevel = hidden_applevel
         self.magic = magic
+        self._line_starts = None
+        self.line_hits = None     # see executioncontext.LineHitMaps
         self._signature = make_signature(self)
         self._initialize()
         self._init_ready()
@@ -138,6 +197,37 @@ class PyCode(eval.Code):
         init_mapdict_cache(self)
         self._globals_caches = [None] * len(self.co_names_w)
 
+    def get_line_starts(self):
+        """Return a list indexed by bytecode offset: the line number if
+        the line changes at that offset according to co_lnotab, or -1.
+        Built lazily; used to record line events without going through
+        the app-level trace function."""
+        line_starts = self._line_starts
+        if line_starts is None:
+            line_starts = self._compute_line_starts()
+            self._line_starts = line_starts
+        return line_starts
+
+    @jit.dont_look_inside
+    def _compute_line_starts(self):
+        size = len(self.co_code)
+        line_starts = [-1] * size
+        lnotab = self.co_lnotab
+        addr = 0
+        line = self.co_firstlineno
+        prev_line = -1
+        for p in range(0, len(lnotab) - 1, 2):
+            c = ord(lnotab[p])
+            if c and line != prev_line:
+                if addr < size:
+                    line_starts[addr] = line
+                prev_line = line
+            addr += c
+            line += ord(lnotab[p + 1])
+        if addr < size and line != prev_line:
+            line_starts[addr] = line
+        return line_starts
+
     def _init_ready(self):
         "This is a hook for the vmprof module, which overrides this method."
 
@@ -239,7 +329,7 @@ class PyCode(eval.Code):
 
     def getdocstring(self, space):
         if self.co_consts_w:   # it is probably never empty
-            w_first = self.co_consts_w[0]
+            w_first = materialize_const(space, self.co_consts_w[0])
             if space.isinstance_w(w_first, space.w_basestring):
                 return w_first
         return space.w_None
@@ -248,14 +338,30 @@ class PyCode(eval.Code):
         if self.co_flags & CO_KILL_DOCSTRING:
             self.co_consts_w[0] = space.w_None
         for w_co in self.co_consts_w:
-            if isinstance(w_co, PyCode):
+            if isinstance(w_co, PyCode) or isinstance(w_co, W_LazyCode):
                 w_co.remove_docstrings(space)
 
+    def get_consts_w(self):
+        """Return co_consts_w with the W_LazyCode placeholders replaced by
+        the corresponding code objects."""
+        space = self.space
+        consts_w = self.co_consts_w
+        for w_const in consts_w:
+            if isinstance(w_const, W_LazyCode):
+                break
+        else:
+            return consts_w
+        result_w = [None] * len(consts_w)
+        for i in range(len(consts_w)):
+            result_w[i] = materialize_const(space, consts_w[i])
+        return result_w
+
     def _to_code(self):
         """For debugging only."""
-        consts = [None] * len(self.co_consts_w)
+        consts_w = self.get_consts_w()
+        consts = [None] * len(consts_w)
         num = 0
-        for w in self.co_consts_w:
+        for w in consts_w:
             if isinstance(w, PyCode):
                 consts[num] = w._to_code()
             else:
@@ -289,7 +395,7 @@ class PyCode(eval.Code):
         dis.dis(co)
 
     def fget_co_consts(self, space):
-        return space.newtuple(self.co_consts_w)
+        return space.newtuple(self.get_consts_w())
 
     def fget_co_names(self, space):
         return space.newtuple(self.co_names_w)
@@ -325,8 +431,10 @@ class PyCode(eval.Code):
             if not space.eq_w(self.co_names_w[i], w_other.co_names_w[i]):
                 return space.w_False
 
-        for i in range(len(self.co_consts_w)):
-            if not _code_const_eq(space, self.co_consts_w[i], w_other.co_consts_w[i]):
+        consts_w = self.get_consts_w()
+        other_consts_w = w_other.get_consts_w()
+        for i in range(len(consts_w)):
+            if not _code_const_eq(space, consts_w[i], other_consts_w[i]):
                 return space.w_False
 
         return space.w_True
@@ -351,7 +459,7 @@ class PyCode(eval.Code):
         w_result = space.newint(intmask(result))
         for w_name in self.co_names_w:
             w_result = space.xor(w_result, space.hash(w_name))
-        for w_const in self.co_consts_w:
+        for w_const in self.get_consts_w():
             w_key = self.const_comparison_key(space, w_const)
             w_result = space.xor(w_result, space.hash(w_key))
         return w_result
@@ -405,7 +513,7 @@ class PyCode(eval.Code):
             space.newint(self.co_stacksize),
             space.newint(self.co_flags),
             space.newbytes(self.co_code),
-            space.newtuple(self.co_consts_w),
+            space.newtuple(self.get_consts_w()),
             space.newtuple(self.co_names_w),
             space.newtuple([space.newtext(v) for v in self.co_varnames]),
             space.newtext(self.co_filename),
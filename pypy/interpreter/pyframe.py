@@ -609,22 +609,17 @@ class PyFrame(W_Root):
             w_value = self.locals_cells_stack_w[i]
             if w_value is not None:
                 self.space.setitem_str(w_locals, name, w_value)
-            else:
-                w_name = self.space.newtext(name)
-                try:
-                    self.space.delitem(w_locals, w_name)
-                except OperationError as e:
-                    if not e.match(self.space, self.space.w_KeyError):
-                        raise
+            elif (not write and
+                  self.space.finditem_str(w_locals, name) is not None):
+                # this is called for every trace event once f_locals was
+                # used: avoid a KeyError for each unbound local
+                self.space.delitem(w_locals, self.space.newtext(name))
 
         # cellvars are values exported to inner scopes
         # freevars are values coming from outer scopes
-        # (see locals2fast for why CO_OPTIMIZED)
-        freevarnames = self.pycode.co_cellvars
-        if self.pycode.co_flags & consts.CO_OPTIMIZED:
-            freevarnames = freevarnames + self.pycode.co_freevars
-        for i in range(len(freevarnames)):
-            name = freevarnames[i]
+        # (see _num_cells_in_locals() for why CO_OPTIMIZED)
+        for i in range(self._num_cells_in_locals()):
+            name = self._get_cell_name(i)
             cell = self._getcell(i)
             try:
                 w_value = cell.get()
@@ -644,33 +639,45 @@ class PyFrame(W_Root):
         varnames = self.getcode().getvarnames()
         numlocals = self.getcode().co_nlocals
 
-        new_fastlocals_w = [None] * numlocals
+        # write directly into the frame instead of building a new list
+        # for setfastscope(): like fast2locals(), this runs for every
+        # trace event once f_locals was used
+        for i in range(numlocals):
+            w_value = None
+            if i < len(varnames):
+                w_value = self.space.finditem_str(w_locals, varnames[i])
+            self.locals_cells_stack_w[i] = w_value
+        self.init_cells()
 
-        for i in range(min(len(varnames), numlocals)):
-            name = varnames[i]
-            w_value = self.space.finditem_str(w_locals, name)
-            if w_value is not None:
-                new_fastlocals_w[i] = w_value
-
-        self.setfastscope(new_fastlocals_w)
-
-        freevarnames = self.pycode.co_cellvars
-        if self.pycode.co_flags & consts.CO_OPTIMIZED:
-            freevarnames = freevarnames + self.pycode.co_freevars
-            # If the namespace is unoptimized, then one of the
-            # following cases applies:
-            # 1. It does not contain free variables, because it
-            #    uses import * or is a top-level namespace.
-            # 2. It is a class namespace.
-            # We don't want to accidentally copy free variables
-            # into the locals dict used by the class.
-        for i in range(len(freevarnames)):
-            name = freevarnames[i]
+        for i in range(self._num_cells_in_locals()):
+            name = self._get_cell_name(i)
             cell = self._getcell(i)
             w_value = self.space.finditem_str(w_locals, name)
             if w_value is not None:
                 cell.set(w_value)
 
+    def _num_cells_in_locals(self):
+        # the cellvars, and also the freevars if CO_OPTIMIZED.  If the
+        # namespace is unoptimized, then one of the following cases
+        # applies:
+        # 1. It does not contain free variables, because it
+        #    uses import * or is a top-level namespace.
+        # 2. It is a class namespace.
+        # We don't want to accidentally copy free variables
+        # into the locals dict used by the class.
+        code = self.pycode
+        result = len(code.co_cellvars)
+        if code.co_flags & consts.CO_OPTIMIZED:
+            result += len(code.co_freevars)
+        return result
+
+    def _get_cell_name(self, i):
+        code = self.pycode
+        ncellvars = len(code.co_cellvars)
+        if i < ncellvars:
+            return code.co_cellvars[i]
+        return code.co_freevars[i - ncellvars]
+
     @jit.unroll_safe
     def init_cells(self):
         """
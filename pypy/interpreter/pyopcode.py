@@ -150,6 +150,8 @@ class __extend__(pyframe.PyFrame):
                 if self.debugdata:
                     ec.bytecode_only_trace(self)
                     next_instr = r_uint(self.last_instr)
+                else:
+                    ec.record_line_event(self)
             else:
                 ec.bytecode_trace(self)
                 next_instr = r_uint(self.last_instr)
@@ -1250,7 +1252,7 @@ class __extend__(pyframe.PyFrame):
         self.call_function(oparg, w_varargs, w_varkw)
 
     def MAKE_FUNCTION(self, numdefaults, next_instr):
-        w_codeobj = self.popvalue()
+        w_codeobj = pycode.materialize_const(self.space, self.popvalue())
         codeobj = self.space.interp_w(PyCode, w_codeobj)
         defaultarguments = self.popvalues(numdefaults)
         fn = function.Function(self.space, codeobj, self.get_w_globals(),
@@ -1259,7 +1261,7 @@ class __extend__(pyframe.PyFrame):
 
     @jit.unroll_safe
     def MAKE_CLOSURE(self, numdefaults, next_instr):
-        w_codeobj = self.popvalue()
+        w_codeobj = pycode.materialize_const(self.space, self.popvalue())
         codeobj = self.space.interp_w(pycode.PyCode, w_codeobj)
         w_freevarstuple = self.popvalue()
         freevars = [self.space.interp_w(Cell, cell)
@@ -32,14 +32,19 @@ futureFlags_2_7 = FutureFlags((2, 7, 0, 'final', 0))
 
 
 class TokenIterator:
-    def __init__(self, tokens):
+    def __init__(self, tokens, tokenizer=None):
+        # if a tokenizer is given, 'tokens' is extended with the tokens
+        # read from it as needed
         self.tokens = tokens
+        self.tokenizer = tokenizer
         self.index = 0
         self.next()
 
     def next(self):
         index = self.index
         self.index = index + 1
+        if index == len(self.tokens) and self.tokenizer is not None:
+            self.tokens.append(self.tokenizer.next())
         self.tok = self.tokens[index]
 
     def skip(self, n):
@@ -74,9 +79,13 @@ class TokenIterator:
             pass
 
 
-def add_future_flags(future_flags, tokens):
+def add_future_flags(future_flags, tokens, tokenizer=None):
+    """Return the flags of the __future__ imports at the start of the
+    tokens, and the position of the last one.  If a tokenizer is given,
+    only the tokens needed are read from it, and appended to 'tokens'.
+    """
     from pypy.interpreter.pyparser import pygram
-    it = TokenIterator(tokens)
+    it = TokenIterator(tokens, tokenizer)
     result = 0
     last_position = (0, 0)
     #
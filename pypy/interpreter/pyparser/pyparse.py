@@ -148,51 +148,64 @@ class PythonParser(parser.Parser):
 
         self.prepare(_targets[compile_info.mode])
         try:
+            # Note: we no longer pass the CO_FUTURE_* to the tokenizer,
+            # which is expected to work independently of them.  It's
+            # certainly the case for all futures in Python <= 2.7.
+            tokenizer = pytokenizer.Tokenizer(source_lines, flags)
+            # The tokens are fed to the parser as the tokenizer produces
+            # them, so that the complete list of tokens of big modules
+            # never needs to be kept in memory.  Only the tokens needed
+            # to find the __future__ imports are read first.
+            head_tokens = []
             try:
-                # Note: we no longer pass the CO_FUTURE_* to the tokenizer,
-                # which is expected to work independently of them.  It's
-                # certainly the case for all futures in Python <= 2.7.
-                tokens = pytokenizer.generate_tokens(source_lines, flags)
+                newflags, last_future_import = (
+                    future.add_future_flags(self.future_flags, head_tokens,
+                                            tokenizer))
+                compile_info.last_future_import = last_future_import
+                compile_info.flags |= newflags
+
+                self.grammar = pygram.choose_grammar(
+                    print_function=compile_info.flags & consts.CO_FUTURE_PRINT_FUNCTION,
+                    revdb=self.space.config.translation.reverse_debugger)
+
+                try:
+                    done = False
+                    for token in head_tokens:
+                        if self.add_token(token):
+                            done = True
+                            break
+                    while not done:
+                        done = self.add_token(tokenizer.next())
+                    # like when all the tokens were produced first, report
+                    # the tokenizing errors after the end of the input
+                    # that the parser needed (in 'single' mode)
+                    while not tokenizer.done:
+                        tokenizer.next()
+                except parser.ParseError as e:
+                    # Catch parse errors, pretty them up and reraise them as a
+                    # SyntaxError.
+                    new_err = error.IndentationError
+                    if e.token.token_type == pygram.tokens.INDENT:
+                        msg = "unexpected indent"
+                    elif e.expected == pygram.tokens.INDENT:
+                        msg = "expected an indented block"
+                    else:
+                        new_err = error.SyntaxError
+                        msg = "invalid syntax"
+                        if e.expected_str is not None:
+                            msg += " (expected '%s')" % e.expected_str
+
+                    # parser.ParseError(...).column is 0-based, but the offsets in the
+                    # exceptions in the error module are 1-based, hence the '+ 1'
+                    raise new_err(msg, e.token.lineno, e.token.column + 1, e.token.line,
+                                  compile_info.filename)
             except error.TokenError as e:
                 e.filename = compile_info.filename
                 raise
             except error.TokenIndentationError as e:
                 e.filename = compile_info.filename
                 raise
-
-            newflags, last_future_import = (
-                future.add_future_flags(self.future_flags, tokens))
-            compile_info.last_future_import = last_future_import
-            compile_info.flags |= newflags
-
-            self.grammar = pygram.choose_grammar(
-                print_function=compile_info.flags & consts.CO_FUTURE_PRINT_FUNCTION,
-                revdb=self.space.config.translation.reverse_debugger)
-
-            try:
-                for token in tokens:
-                    if self.add_token(token):
-                        break
-            except parser.ParseError as e:
-                # Catch parse errors, pretty them up and reraise them as a
-                # SyntaxError.
-                new_err = error.IndentationError
-                if token.token_type == pygram.tokens.INDENT:
-                    msg = "unexpected indent"
-                elif e.expected == pygram.tokens.INDENT:
-                    msg = "expected an indented block"
-                else:
-                    new_err = error.SyntaxError
-                    msg = "invalid syntax"
-                    if e.expected_str is not None:
-                        msg += " (expected '%s')" % e.expected_str
-
-                # parser.ParseError(...).column is 0-based, but the offsets in the
-                # exceptions in the error module are 1-based, hence the '+ 1'
-                raise new_err(msg, e.token.lineno, e.token.column + 1, e.token.line,
-                              compile_info.filename)
-            else:
-                tree = self.root
+            tree = self.root
         finally:
             # Avoid hanging onto the tree.
             self.root = None
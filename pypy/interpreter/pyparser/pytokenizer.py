@@ -73,57 +73,111 @@ def generate_tokens(lines, flags):
         and the line on which the token was found. The line passed is the
         logical line; continuation lines are included.
     """
+    tokenizer = Tokenizer(lines, flags)
     token_list = []
-    lnum = continued = 0
-    namechars = NAMECHARS
-    numchars = NUMCHARS
-    contstrs, needcont = [], False
-    indents = [0]
-    last_comment = ''
-    parenstack = []
+    while True:
+        tok = tokenizer.next()
+        token_list.append(tok)
+        if tok.token_type == tokens.ENDMARKER:
+            return token_list
 
-    # make the annotator happy
-    endDFA = DUMMY_DFA
-    # make the annotator happy
-    line = ''
-    pos = 0
-    lines.append("")
-    strstart = (0, 0, "")
-    for line in lines:
-        lnum = lnum + 1
+
+class Tokenizer(object):
+    """Produces the same tokens as generate_tokens(), but one at a time:
+    the lines are only tokenized when the tokens of the previous ones
+    have been consumed, so that the parser can run on the tokens while
+    they are produced instead of waiting for the complete list.
+    """
+
+    def __init__(self, lines, flags):
+        lines.append("")
+        self.lines = lines
+        self.line_index = 0
+        self.flags = flags
+        self.token_list = []     # tokens of the current line
+        self.token_index = 0     # index of the next token to return
+        self.last_token = None
+        self.done = False
+        self.lnum = 0
+        self.continued = 0
+        self.contstrs = []
+        self.needcont = False
+        self.indents = [0]
+        self.last_comment = ''
+        self.parenstack = []
+        # make the annotator happy
+        self.endDFA = DUMMY_DFA
+        # make the annotator happy
+        self.line = ''
+        self.pos = 0
+        self.strstart = (0, 0, "")
+
+    def next(self):
+        """Return the next token.  The last one is ENDMARKER, which is
+        then returned again by any further call."""
+        while self.token_index == len(self.token_list):
+            if self.done:
+                return self.last_token
+            self.token_list = []
+            self.token_index = 0
+            if not self._tokenize_next_line():
+                self._finish()
+                self.done = True
+        tok = self.token_list[self.token_index]
+        self.token_index += 1
+        return tok
+
+    def _add_token(self, tok):
+        self.token_list.append(tok)
+        self.last_token = tok
+
+    def _tokenize_next_line(self):
+        """Tokenize the next line.  Returns False if the end of the input
+        is reached."""
+        if self.line_index == len(self.lines):
+            return False
+        line = self.lines[self.line_index]
+        self.line_index += 1
+        self.lnum = lnum = self.lnum + 1
         line = universal_newline(line)
+        self.line = line
         pos, max = 0, len(line)
+        self.pos = pos
+        token_list = self.token_list
+        namechars = NAMECHARS
+        numchars = NUMCHARS
 
-        if contstrs:
+        if self.contstrs:
+            strstart = self.strstart
             if not line:
                 raise TokenError(
                     "end of file (EOF) while scanning triple-quoted string literal",
                     strstart[2], strstart[0], strstart[1]+1,
                     token_list, lnum-1)
-            endmatch = endDFA.recognize(line)
+            endmatch = self.endDFA.recognize(line)
             if endmatch >= 0:
                 pos = end = endmatch
-                contstrs.append(line[:end])
-                tok = Token(tokens.STRING, "".join(contstrs), strstart[0],
+                self.contstrs.append(line[:end])
+                tok = Token(tokens.STRING, "".join(self.contstrs), strstart[0],
                        strstart[1], line)
-                token_list.append(tok)
-                last_comment = ''
-                contstrs, needcont = [], False
-            elif (needcont and not line.endswith('\\\n') and
+                self._add_token(tok)
+                self.last_comment = ''
+                self.contstrs, self.needcont = [], False
+            elif (self.needcont and not line.endswith('\\\n') and
                                not line.endswith('\\\r\n')):
-                contstrs.append(line)
-                tok = Token(tokens.ERRORTOKEN, "".join(contstrs), strstart[0],
-                       strstart[1], line)
-                token_list.append(tok)
-                last_comment = ''
-                contstrs = []
-                continue
+                self.contstrs.append(line)
+                tok = Token(tokens.ERRORTOKEN, "".join(self.contstrs),
+                       strstart[0], strstart[1], line)
+                self._add_token(tok)
+                self.last_comment = ''
+                self.contstrs = []
+                return True
             else:
-                contstrs.append(line)
-                continue
+                self.contstrs.append(line)
+                return True
 
-        elif not parenstack and not continued:  # new statement
-            if not line: break
+        elif not self.parenstack and not self.continued:  # new statement
+            if not line: return False
             column = 0
             while pos < max:                   # measure leading whitespace
                 if line[pos] == ' ': column = column + 1
@@ -131,33 +185,35 @@ def generate_tokens(lines, flags):
                 elif line[pos] == '\f': column = 0
                 else: break
                 pos = pos + 1
-            if pos == max: break
+            self.pos = pos
+            if pos == max: return False
 
             if line[pos] in '#\r\n':
                 # skip comments or blank lines
-                continue
+                return True
 
+            indents = self.indents
             if column > indents[-1]:           # count indents or dedents
                 indents.append(column)
-                token_list.append(Token(tokens.INDENT, line[:pos], lnum, 0, line))
-                last_comment = ''
+                self._add_token(Token(tokens.INDENT, line[:pos], lnum, 0, line))
+                self.last_comment = ''
             while column < indents[-1]:
                 indents.pop()
-                token_list.append(Token(tokens.DEDENT, '', lnum, pos, line))
-                last_comment = ''
+                self._add_token(Token(tokens.DEDENT, '', lnum, pos, line))
+                self.last_comment = ''
             if column != indents[-1]:
                 err = "unindent does not match any outer indentation level"
                 raise TokenIndentationError(err, line, lnum, column+1, token_list)
 
         else:                                  # continued statement
             if not line:
-                if parenstack:
-                    _, lnum1, start1, line1 = parenstack[0]
+                if self.parenstack:
+                    _, lnum1, start1, line1 = self.parenstack[0]
                     raise TokenError("parenthesis is never closed", line1,
                                      lnum1, start1 + 1, token_list, lnum)
                 raise TokenError("end of file (EOF) in multi-line statement", line,
                                  lnum, 0, token_list) # XXX why is the offset 0 here?
-            continued = 0
+            self.continued = 0
 
         while pos < max:
             pseudomatch = pseudoDFA.recognize(line, pos)
@@ -176,59 +232,60 @@ def generate_tokens(lines, flags):
                 token, initial = line[start:end], line[start]
                 if initial in numchars or \
                    (initial == '.' and token != '.'):      # ordinary number
-                    token_list.append(Token(tokens.NUMBER, token, lnum, start, line))
-                    last_comment = ''
+                    self._add_token(Token(tokens.NUMBER, token, lnum, start, line))
+                    self.last_comment = ''
                 elif initial in '\r\n':
-                    if not parenstack:
-                        tok = Token(tokens.NEWLINE, last_comment, lnum, start, line)
-                        token_list.append(tok)
-                    last_comment = ''
+                    if not self.parenstack:
+                        tok = Token(tokens.NEWLINE, self.last_comment, lnum,
+                                    start, line)
+                        self._add_token(tok)
+                    self.last_comment = ''
                 elif initial == '#':
                     # skip comment
-                    last_comment = token
+                    self.last_comment = token
                 elif token in triple_quoted:
-                    endDFA = endDFAs[token]
-                    endmatch = endDFA.recognize(line, pos)
+                    self.endDFA = endDFAs[token]
+                    endmatch = self.endDFA.recognize(line, pos)
                     if endmatch >= 0:                     # all on one line
                         pos = endmatch
                         token = line[start:pos]
                         tok = Token(tokens.STRING, token, lnum, start, line)
-                        token_list.append(tok)
-                        last_comment = ''
+                        self._add_token(tok)
+                        self.last_comment = ''
                     else:
-                        strstart = (lnum, start, line)
-                        contstrs = [line[start:]]
+                        self.strstart = (lnum, start, line)
+                        self.contstrs = [line[start:]]
                         break
                 elif initial in single_quoted or \
                     token[:2] in single_quoted or \
                     token[:3] in single_quoted:
                     if token[-1] == '\n':                  # continued string
-                        strstart = (lnum, start, line)
-                        endDFA = (endDFAs[initial] or endDFAs[token[1]] or
-                                   endDFAs[token[2]])
-                        contstrs, needcont = [line[start:]], True
+                        self.strstart = (lnum, start, line)
+                        self.endDFA = (endDFAs[initial] or endDFAs[token[1]] or
+                                       endDFAs[token[2]])
+                        self.contstrs, self.needcont = [line[start:]], True
                         break
                     else:                                  # ordinary string
                         tok = Token(tokens.STRING, token, lnum, start, line)
-                        token_list.append(tok)
-                        last_comment = ''
+                        self._add_token(tok)
+                        self.last_comment = ''
                 elif initial in namechars:                 # ordinary name
-                    token_list.append(Token(tokens.NAME, token, lnum, start, line))
-                    last_comment = ''
+                    self._add_token(Token(tokens.NAME, token, lnum, start, line))
+                    self.last_comment = ''
                 elif initial == '\\':                      # continued stmt
-                    continued = 1
+                    self.continued = 1
                 elif initial == '$':
-                    token_list.append(Token(tokens.REVDBMETAVAR, token,
-                                       lnum, start, line))
-                    last_comment = ''
+                    self._add_token(Token(tokens.REVDBMETAVAR, token,
+                                          lnum, start, line))
+                    self.last_comment = ''
                 else:
                     if initial in '([{':
-                        parenstack.append((initial, lnum, start, line))
+                        self.parenstack.append((initial, lnum, start, line))
                     elif initial in ')]}':
-                        if not parenstack:
+                        if not self.parenstack:
                             raise TokenError("unmatched '%s'" % initial, line,
                                              lnum, start + 1, token_list)
-                        opening, lnum1, start1, line1 = parenstack.pop()
+                        opening, lnum1, start1, line1 = self.parenstack.pop()
                         if not ((opening == "(" and initial == ")") or
                                 (opening == "[" and initial == "]") or
                                 (opening == "{" and initial == "}")):
@@ -243,8 +300,8 @@ def generate_tokens(lines, flags):
                         punct = python_opmap[token]
                     else:
                         punct = tokens.OP
-                    token_list.append(Token(punct, token, lnum, start, line))
-                    last_comment = ''
+                    self._add_token(Token(punct, token, lnum, start, line))
+                    self.last_comment = ''
             else:
                 if start < 0:
                     start = pos
@@ -252,22 +309,27 @@ def generate_tokens(lines, flags):
                     raise TokenError("end of line (EOL) while scanning string literal",
                              line, lnum, start+1, token_list)
                 tok = Token(tokens.ERRORTOKEN, line[pos], lnum, pos, line)
-                token_list.append(tok)
-                last_comment = ''
+                self._add_token(tok)
+                self.last_comment = ''
                 pos = pos + 1
+        self.pos = pos
+        return True
 
-    lnum -= 1
-    if not (flags & consts.PyCF_DONT_IMPLY_DEDENT):
-        if token_list and token_list[-1].token_type != tokens.NEWLINE:
-            tok = Token(tokens.NEWLINE, '', lnum, 0, '\n')
-            token_list.append(tok)
-        for indent in indents[1:]:                # pop remaining indent levels
-            token_list.append(Token(tokens.DEDENT, '', lnum, pos, line))
-    tok = Token(tokens.NEWLINE, '', lnum, 0, '\n')
-    token_list.append(tok)
+    def _finish(self):
+        lnum = self.lnum - 1
+        line = self.line
+        pos = self.pos
+        if not (self.flags & consts.PyCF_DONT_IMPLY_DEDENT):
+            if (self.last_token is not None and
+                    self.last_token.token_type != tokens.NEWLINE):
+                tok = Token(tokens.NEWLINE, '', lnum, 0, '\n')
+                self._add_token(tok)
+            for indent in self.indents[1:]:       # pop remaining indent levels
+                self._add_token(Token(tokens.DEDENT, '', lnum, pos, line))
+        tok = Token(tokens.NEWLINE, '', lnum, 0, '\n')
+        self._add_token(tok)
 
-    token_list.append(Token(tokens.ENDMARKER, '', lnum, pos, line))
-    return token_list
+        self._add_token(Token(tokens.ENDMARKER, '', lnum, pos, line))
 
 
 def universal_newline(line):
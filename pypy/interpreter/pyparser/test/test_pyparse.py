@@ -101,6 +101,19 @@ stuff = "nothing"
         assert exc.lineno == 1
         assert exc.offset == 4
 
+    def test_first_error_is_reported(self):
+        # the tokens are produced while parsing, so a syntax error is
+        # reported even if the tokenizer would fail later
+        exc = py.test.raises(SyntaxError, self.parse, "x = = 1\n)\n").value
+        assert exc.msg == "invalid syntax"
+        assert exc.lineno == 1
+        exc = py.test.raises(SyntaxError, self.parse, "x = 1\n)\n").value
+        assert exc.msg == "unmatched ')'"
+        # in 'single' mode, the rest of the input is still tokenized
+        exc = py.test.raises(SyntaxError, self.parse, "x = 1\n)\n",
+                             "single").value
+        assert exc.msg == "unmatched ')'"
+
     def test_is(self):
         self.parse("x is y")
         self.parse("x is not y")
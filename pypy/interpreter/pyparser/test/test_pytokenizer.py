@@ -65,3 +65,17 @@ class TestTokenizer(object):
 
     def test_eof_triple_quoted(self):
         check_token_error("'''", pos=1, line=1)
+
+    def test_tokenizer_is_lazy(self):
+        lines = ["a = 1\n", "b = 2\n"]
+        tokenizer = pytokenizer.Tokenizer(lines, 0)
+        assert tokenizer.next() == Token(tokens.NAME, 'a', 1, 0, lines[0])
+        # only the first line was tokenized so far
+        assert tokenizer.line_index == 1
+        result = [tokenizer.next() for i in range(7)]
+        assert [tok.value for tok in result] == ['=', '1', '', 'b', '=', '2',
+                                                 '']
+        assert tokenizer.line_index == 2
+        assert tokenizer.next().token_type == tokens.NEWLINE
+        assert tokenizer.next().token_type == tokens.ENDMARKER
+        assert tokenizer.next().token_type == tokens.ENDMARKER
@@ -333,6 +333,44 @@ def test_trace_try_finally():
     assert issubclass(l[0][0], Exception)
     assert issubclass(l[1][0], Exception)
 
+def test_trace_lines_with_threaded_jumps():
+    import sys
+    def f(x, y):
+        if x:
+            if y:
+                z = 1
+            else:
+                z = 2
+        else:
+            return 0 and x
+        while x:
+            x -= 1
+            if x % 2:
+                continue
+            z += 1
+        return z
+    first = f.__code__.co_firstlineno
+    def trace(frame, event, arg):
+        if frame.f_code is f.__code__ and event == 'line':
+            l.append(frame.f_lineno - first)
+        return trace
+
+    l = []
+    sys.settrace(trace)
+    f(0, 0)
+    sys.settrace(None)
+    assert l == [1, 7]
+    l = []
+    sys.settrace(trace)
+    f(1, 0)
+    sys.settrace(None)
+    assert l == [1, 2, 5, 8, 9, 10, 12, 8, 13]
+    l = []
+    sys.settrace(trace)
+    f(3, 1)
+    sys.settrace(None)
+    assert l == [1, 2, 3, 8, 9, 10, 12, 8, 9, 10, 11, 8, 9, 10, 12, 8, 13]
+
 def test_trace_raise_three_arg():
     import sys
     l = []
@@ -468,6 +506,28 @@ def test_trace_changes_locals():
     sys.settrace(None)
     assert res == 42
 
+def test_trace_sees_unbound_locals():
+    import sys
+    seen = []
+    def trace(frame, what, arg):
+        if frame.f_code.co_name == 'f':
+            seen.append(sorted(frame.f_locals.items()))
+        return trace
+    def f(z):
+        x = 1
+        del x
+        def g():
+            return z
+        y = 2
+        return g
+    sys.settrace(trace)
+    g = f(5)
+    sys.settrace(None)
+    assert [('x', 1), ('z', 5)] in seen
+    assert seen[-1][-1] == ('z', 5)
+    assert [name for name, value in seen[-1]] == ['g', 'y', 'z']
+    assert g() == 5
+
 def test_set_unset_f_trace():
     import sys
     seen = []
@@ -326,6 +326,30 @@ class TestExecutionContext:
             sys.setprofile(None)
         """)
 
+    def test_line_hits_dont_keep_codes_alive(self):
+        import gc, weakref
+        space = self.space
+        line_hits = space.fromcache(executioncontext.LineHitMaps)
+        w_f = space.appexec([], """():
+            d = {}
+            exec "def f():\\n    return 42\\n" in d
+            return d['f']
+        """)
+        line_hits.start()
+        try:
+            space.call_function(w_f)
+        finally:
+            line_hits.stop()
+        w_code = space.getattr(w_f, space.wrap('__code__'))
+        assert w_code in line_hits.get_codes()
+        wref = weakref.ref(w_code)
+        del w_f, w_code
+        gc.collect()
+        assert wref() is None
+        line_hits.reset()
+        for code_wref in line_hits.codes_wref:
+            assert code_wref() is not None
+
 
 class AppTestProfile:
 
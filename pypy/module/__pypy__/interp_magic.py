@@ -1,14 +1,16 @@
 from pypy.interpreter.error import oefmt, wrap_oserror
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.pycode import CodeHookCache
+from pypy.interpreter.executioncontext import LineEventBuffer, LineHitMaps
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.mixedmodule import MixedModule
 from rpython.rlib.objectmodel import we_are_translated
 from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
-from pypy.objspace.std.typeobject import MethodCache
-from pypy.objspace.std.mapdict import MapAttrCache
+from pypy.objspace.std.typeobject import (
+    MethodCache, MIN_METHOD_CACHE_SIZE_EXP, MAX_METHOD_CACHE_SIZE_EXP)
+from pypy.objspace.std.mapdict import MapAttrCache, InlineCacheCounters
 from rpython.rlib import rposix, rgc, rstack
 from rpython.rtyper.lltypesystem import rffi
 
@@ -42,6 +44,36 @@ def reset_method_cache_counter(space):
     cache.misses = {}
     cache.hits = {}
 
+def method_cache_stats(space):
+    """Return a tuple (hits, misses, collisions, size) for the global method
+    cache: collisions are the misses that replaced another entry, and size
+    is the current number of entries."""
+    cache = space.fromcache(MethodCache)
+    return space.newtuple([space.newint(cache.num_hits),
+                           space.newint(cache.num_misses),
+                           space.newint(cache.num_collisions),
+                           space.newint(len(cache.versions))])
+
+def reset_method_cache_stats(space):
+    """Reset the counters returned by method_cache_stats() to zero."""
+    space.fromcache(MethodCache).reset_stats()
+
+@unwrap_spec(size=int)
+def set_method_cache_size(space, size):
+    """Resize the global method cache to 'size' entries, which must be a
+    power of two.  The cache keeps growing by itself from there if it
+    sees too many collisions."""
+    size_exp = 0
+    while size_exp <= MAX_METHOD_CACHE_SIZE_EXP and (1 << size_exp) < size:
+        size_exp += 1
+    if (size != 1 << size_exp or size_exp < MIN_METHOD_CACHE_SIZE_EXP or
+            size_exp > MAX_METHOD_CACHE_SIZE_EXP):
+        raise oefmt(space.w_ValueError,
+                    "method cache size must be a power of two between %d "
+                    "and %d", 1 << MIN_METHOD_CACHE_SIZE_EXP,
+                    1 << MAX_METHOD_CACHE_SIZE_EXP)
+    space.fromcache(MethodCache).resize(size_exp)
+
 @unwrap_spec(name='text')
 def mapdict_cache_counter(space, name):
     """Return a tuple (index_cache_hits, index_cache_misses) for lookups
@@ -51,6 +83,94 @@ def mapdict_cache_counter(space, name):
     return space.newtuple2(space.newint(cache.hits.get(name, 0)),
                            space.newint(cache.misses.get(name, 0)))
 
+def inline_cache_counters(space):
+    """Return a tuple (polymorphic_hits, misses, evictions) for the
+    polymorphic caches of attribute and method lookups of the interpreter:
+    the lookups found in another entry than the most recent one, the
+    lookups that had to fill the cache, and the entries dropped because
+    a call site saw more than four different layouts."""
+    counters = space.fromcache(InlineCacheCounters)
+    return space.newtuple([space.newint(counters.polymorphic_hits),
+                           space.newint(counters.misses),
+                           space.newint(counters.evictions)])
+
+def reset_inline_cache_counters(space):
+    """Reset the counters returned by inline_cache_counters() to zero."""
+    space.fromcache(InlineCacheCounters).reset()
+
+@unwrap_spec(period=int, maxsize=int)
+def start_line_events(space, period=1, maxsize=1000000):
+    """Start recording a (code, line) pair every time the interpreter or
+    JIT-compiled code starts a new line, keeping only one out of 'period'
+    events.  This is much cheaper than sys.settrace(): no app-level code
+    is called and the JIT keeps running.  Use pop_line_events() to fetch
+    the pairs recorded so far.  At most 'maxsize' pairs are kept between
+    two calls to pop_line_events(); see dropped_line_events().
+
+    Unlike the 'line' events of sys.settrace(), an event is only recorded
+    when the first bytecode of a line runs.  A backward jump into the
+    middle of a line does not record that line again, so the line of a
+    'for' or 'while' statement is recorded once, not once per iteration."""
+    if period <= 0:
+        raise oefmt(space.w_ValueError, "period must be positive")
+    if maxsize <= 0:
+        raise oefmt(space.w_ValueError, "maxsize must be positive")
+    space.fromcache(LineEventBuffer).start(period, maxsize)
+
+def stop_line_events(space):
+    """Stop recording line events.  The pairs already recorded are kept
+    until the next call to pop_line_events()."""
+    space.fromcache(LineEventBuffer).stop()
+
+def pop_line_events(space):
+    """Return the list of (code, line) pairs recorded since the last call,
+    in the order in which the lines were reached, and empty the buffer."""
+    codes, lines = space.fromcache(LineEventBuffer).pop_all()
+    events_w = [None] * len(codes)
+    for i in range(len(codes)):
+        events_w[i] = space.newtuple2(codes[i], space.newint(lines[i]))
+    return space.newlist(events_w)
+
+def dropped_line_events(space):
+    """Return the number of line events that were not recorded since
+    start_line_events() because 'maxsize' pairs were already waiting for
+    pop_line_events()."""
+    return space.newint(space.fromcache(LineEventBuffer).dropped)
+
+def start_line_hits(space):
+    """Start recording which lines are executed, for coverage tools.  Each
+    code object gets one flag per line, set by the interpreter and by
+    JIT-compiled code without calling back into app-level code.  Use
+    get_line_hits() to read the flags."""
+    space.fromcache(LineHitMaps).start()
+
+def stop_line_hits(space):
+    """Stop recording which lines are executed.  The lines already
+    recorded are kept."""
+    space.fromcache(LineHitMaps).stop()
+
+@unwrap_spec(reset=bool)
+def get_line_hits(space, reset=False):
+    """Return a list of (code, lines) pairs, one for each code object
+    executed since recording started, where 'lines' is the sorted list of
+    its lines that were executed.  This is not a dict because equal code
+    objects compiled from different files compare equal.  If 'reset' is
+    true, clear all the flags afterwards."""
+    line_hits = space.fromcache(LineHitMaps)
+    result_w = []
+    for code in line_hits.get_codes():
+        lines = line_hits.get_hits(code)
+        if lines:
+            lines_w = [space.newint(line) for line in lines]
+            result_w.append(space.newtuple2(code, space.newlist(lines_w)))
+    if reset:
+        line_hits.reset()
+    return space.newlist(result_w)
+
+def reset_line_hits(space):
+    """Clear the lines recorded so far for all code objects."""
+    space.fromcache(LineHitMaps).reset()
+
 def builtinify(space, w_func):
     """To implement at app-level modules that are, in CPython,
     implemented in C: this decorator protects a function from being ever
@@ -122,6 +122,20 @@ class Module(MixedModule):
         'newmemoryview'             : 'interp_buffer.newmemoryview',
         'utf8content'               : 'interp_magic.utf8content',
         'list_get_physical_size'    : 'interp_magic.list_get_physical_size',
+        'method_cache_stats'        : 'interp_magic.method_cache_stats',
+        'reset_method_cache_stats'  : 'interp_magic.reset_method_cache_stats',
+        'set_method_cache_size'     : 'interp_magic.set_method_cache_size',
+        'inline_cache_counters'     : 'interp_magic.inline_cache_counters',
+        'reset_inline_cache_counters':
+                          'interp_magic.reset_inline_cache_counters',
+        'start_line_events'         : 'interp_magic.start_line_events',
+        'stop_line_events'          : 'interp_magic.stop_line_events',
+        'pop_line_events'           : 'interp_magic.pop_line_events',
+        'dropped_line_events'       : 'interp_magic.dropped_line_events',
+        'start_line_hits'           : 'interp_magic.start_line_hits',
+        'stop_line_hits'            : 'interp_magic.stop_line_hits',
+        'get_line_hits'             : 'interp_magic.get_line_hits',
+        'reset_line_hits'           : 'interp_magic.reset_line_hits',
     }
     if sys.platform == 'win32':
         interpleveldefs['get_console_cp'] = 'interp_magic.get_console_cp'
@@ -84,3 +84,94 @@ def f():
         l = [1, 2]
         l.append(3)
         assert list_get_physical_size(l) >= 3 # should be 6, but untranslated 3
+
+    def test_line_events(self):
+        from __pypy__ import (start_line_events, stop_line_events,
+                              pop_line_events)
+        def f(n):
+            total = 0
+            for i in range(n):
+                total += i
+            return total
+        pop_line_events()
+        start_line_events()
+        f(3)
+        stop_line_events()
+        f(3)
+        first = f.__code__.co_firstlineno
+        events = [(line - first) for (code, line) in pop_line_events()
+                  if code is f.__code__]
+        # no event for line 2 when jumping back to the 'for'
+        assert events == [1, 2, 3, 3, 3, 4]
+        assert pop_line_events() == []
+        #
+        start_line_events(period=2)
+        f(3)
+        stop_line_events()
+        events = [(line - first) for (code, line) in pop_line_events()
+                  if code is f.__code__]
+        assert len(events) == 3
+        raises(ValueError, start_line_events, 0)
+
+    def test_line_events_maxsize(self):
+        from __pypy__ import (start_line_events, stop_line_events,
+                              pop_line_events, dropped_line_events)
+        def f(n):
+            total = 0
+            for i in range(n):
+                total += i
+            return total
+        pop_line_events()
+        start_line_events(maxsize=4)
+        f(10)
+        stop_line_events()
+        assert len(pop_line_events()) == 4
+        assert dropped_line_events() >= 10
+        start_line_events(maxsize=100)
+        assert dropped_line_events() == 0
+        stop_line_events()
+        raises(ValueError, start_line_events, 1, 0)
+
+    def test_line_hits(self):
+        from __pypy__ import (start_line_hits, stop_line_hits,
+                              get_line_hits, reset_line_hits)
+        def hits_of(code, **kwds):
+            for c, lines in get_line_hits(**kwds):
+                if c is code:
+                    return lines
+            return None
+        def f(n):
+            if n:
+                n += 1
+            else:
+                n -= 1
+            return n
+        start_line_hits()
+        f(0)
+        stop_line_hits()
+        f(1)
+        first = f.__code__.co_firstlineno
+        hits = hits_of(f.__code__)
+        assert [line - first for line in hits] == [1, 4, 5]
+        assert hits_of(f.__code__, reset=True) == hits
+        assert hits_of(f.__code__) is None
+        start_line_hits()
+        f(1)
+        stop_line_hits()
+        assert [line - first for line in hits_of(f.__code__)] == [1, 2, 5]
+        reset_line_hits()
+        assert hits_of(f.__code__) is None
+
+    def test_line_hits_equal_codes(self):
+        from __pypy__ import start_line_hits, stop_line_hits, get_line_hits
+        code_a = compile("x = 1\n", "a.py", "exec")
+        code_b = compile("x = 1\n", "b.py", "exec")
+        assert code_a == code_b
+        start_line_hits()
+        exec code_a in {}
+        exec code_b in {}
+        stop_line_hits()
+        hits = [(code, lines) for (code, lines) in get_line_hits(reset=True)
+                if code is code_a or code is code_b]
+        assert len(hits) == 2
+        assert hits[0][1] == hits[1][1] == [1]
@@ -121,6 +121,8 @@ class AppTest(object):
         d = {}
         assert strategy(d) == "EmptyDictStrategy"
         d = {1: None, 5: None}
+        assert strategy(d) == "DenseIntDictStrategy"
+        d = {1000: None, 5: None}
         assert strategy(d) == "IntDictStrategy"
 
     def test_set_strategy(self):
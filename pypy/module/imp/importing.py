@@ -10,9 +10,10 @@ from pypy.interpreter.typedef import TypeDef, generic_new_descr
 from pypy.interpreter.error import OperationError, oefmt, wrap_oserror
 from pypy.interpreter.baseobjspace import W_Root, CannotHaveLock
 from pypy.interpreter.eval import Code
-from pypy.interpreter.pycode import PyCode
+from pypy.interpreter.pycode import PyCode, W_LazyCode
 from pypy.interpreter.streamutil import wrap_streamerror
-from rpython.rlib import streamio, jit
+from rpython.rlib import streamio, jit, rtime, rmd5
+from rpython.rlib.rpath import risabs
 from rpython.rlib.streamio import StreamErrors
 from rpython.rlib.objectmodel import we_are_translated, specialize
 from pypy.module.sys.version import PYPY_VERSION
@@ -72,29 +73,43 @@ def has_so_extension(space):
     return (space.config.objspace.usemodules.cpyext or
             space.config.objspace.usemodules._cffi_backend)
 
-def has_init_module(space, filepart):
-    "Return True if the directory filepart qualifies as a package."
+def has_init_module(space, filepart, listing=None):
+    """Return True if the directory filepart qualifies as a package.
+    'listing' is the cached DirectoryListing of filepart, if any."""
     init = os.path.join(filepart, "__init__")
+    if listing is not None:
+        if listing.path_exists(init + ".py"):
+            return True
+        if (space.config.objspace.lonepycfiles and
+                listing.path_exists(init + ".pyc")):
+            return True
+        return False
     if path_exists(init + ".py"):
         return True
     if space.config.objspace.lonepycfiles and path_exists(init + ".pyc"):
         return True
     return False
 
-def find_modtype(space, filepart):
+def _file_exists(listing, path):
+    if listing is not None:
+        return listing.file_exists(path)
+    return file_exists(path)
+
+def find_modtype(space, filepart, listing=None):
     """Check which kind of module to import for the given filepart,
     which is a path without extension.  Returns PY_SOURCE, PY_COMPILED or
-    SEARCH_ERROR.
+    SEARCH_ERROR.  If given, 'listing' is the cached DirectoryListing of
+    the directory containing filepart.
     """
     # check the .py file
     pyfile = filepart + ".py"
-    if file_exists(pyfile):
+    if _file_exists(listing, pyfile):
         return PY_SOURCE, ".py", "U"
 
     # on Windows, also check for a .pyw file
     if _WIN32:
         pyfile = filepart + ".pyw"
-        if file_exists(pyfile):
+        if _file_exists(listing, pyfile):
             return PY_SOURCE, ".pyw", "U"
 
     # The .py file does not exist.  By default on PyPy, lonepycfiles
@@ -105,14 +120,14 @@ def find_modtype(space, filepart):
     # check the .pyc file
     if space.config.objspace.lonepycfiles:
         pycfile = filepart + ".pyc"
-        if file_exists(pycfile):
+        if _file_exists(listing, pycfile):
             # existing .pyc file
             return PY_COMPILED, ".pyc", "rb"
 
     if has_so_extension(space):
         so_extension = get_so_extension(space)
         pydfile = filepart + so_extension
-        if file_exists(pydfile):
+        if _file_exists(listing, pydfile):
             return C_EXTENSION, so_extension, "rb"
 
     return SEARCH_ERROR, None, None
@@ -137,6 +152,164 @@ else:
         except OSError:
             return False
 
+# ____________________________________________________________
+#
+# Cache of the directory listings of sys.path entries and packages, so
+# that looking for a module costs a stat() of the directory instead of
+# one stat() per candidate file name.  A listing is considered valid as
+# long as the mtime of the directory did not change.  Because mtimes
+# have a limited granularity, a directory modified less than
+# LISTING_RACY_DELAY seconds before it was listed is never cached (the
+# same trick as git's "racy" index entries).  imp.invalidate_caches()
+# drops all listings.
+
+LISTING_RACY_DELAY = 2.0
+
+NAME_MISSING = 0
+NAME_EXACT = 1
+NAME_OTHER_CASE = 2
+
+class DirectoryListing(object):
+    def __init__(self, directory, mtime, names):
+        # every path given to the methods below starts with 'prefix'
+        self.prefix = os.path.join(directory, '')
+        self.mtime = mtime
+        self.names = {}
+        self.lowercase_names = {}
+        for name in names:
+            self.names[name] = None
+            self.lowercase_names[name.lower()] = None
+
+    def _lookup(self, path):
+        assert path.startswith(self.prefix)
+        name = path[len(self.prefix):]
+        if name in self.names:
+            return NAME_EXACT
+        if name.lower() in self.lowercase_names:
+            return NAME_OTHER_CASE
+        return NAME_MISSING
+
+    # A name found with the exact case needs no case_ok().  A name that
+    # only differs by case goes through the same checks as without a
+    # listing, so that the case rules of case_ok() apply.
+
+    def file_exists(self, path):
+        "Like file_exists(), but a missing file costs no system call."
+        found = self._lookup(path)
+        if found == NAME_EXACT:
+            return os.path.isfile(path)
+        return found == NAME_OTHER_CASE and file_exists(path)
+
+    def path_exists(self, path):
+        "Like path_exists(), but a missing path costs no system call."
+        found = self._lookup(path)
+        if found == NAME_EXACT:
+            return os.path.exists(path)
+        return found == NAME_OTHER_CASE and path_exists(path)
+
+    def isdir(self, path):
+        found = self._lookup(path)
+        if found == NAME_EXACT:
+            return os.path.isdir(path)
+        return (found == NAME_OTHER_CASE and os.path.isdir(path) and
+                case_ok(path))
+
+
+class DirectoryListingCache(object):
+    def __init__(self, space):
+        self.listings = {}
+
+    def get_listing(self, directory):
+        """Return the DirectoryListing of the given absolute directory, or
+        None if it cannot be listed; the caller should then fall back to
+        checking every file name individually."""
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        mtime = st.st_mtime
+        listing = self.listings.get(directory, None)
+        if listing is not None and listing.mtime == mtime:
+            return listing
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            # e.g. a directory that is searchable but not readable
+            return None
+        listing = DirectoryListing(directory, mtime, names)
+        if mtime < rtime.time() - LISTING_RACY_DELAY:
+            self.listings[directory] = listing
+        else:
+            self.listings.pop(directory, None)
+        return listing
+
+    def invalidate(self):
+        self.listings.clear()
+
+def get_directory_listing(space, directory):
+    if not risabs(directory):
+        # the meaning of a relative path changes with the current directory
+        return None
+    return space.fromcache(DirectoryListingCache).get_listing(directory)
+
+def invalidate_caches(space):
+    """Drop the cached listings of the directories searched for modules.
+    Call this after creating modules in a directory that was searched
+    already, if that happens within the granularity of the directory's
+    modification time."""
+    space.fromcache(DirectoryListingCache).invalidate()
+
+# ____________________________________________________________
+#
+# Frozen modules: the stdlib modules listed in the option
+# objspace.frozenmodules are compiled when the space is built, i.e. at
+# translation time, and their code objects are part of the binary.  They
+# are still found on sys.path as usual and their source file is read,
+# but if it has the same size and MD5 digest as the frozen one, the code
+# object is reused instead of loading the .pyc file or compiling the
+# source.  The frozen source itself is not kept in the binary.
+
+class FrozenModule(object):
+    def __init__(self, size, digest, w_code):
+        self.size = size
+        self.digest = digest
+        self.w_code = w_code
+
+class FrozenModules(object):
+    def __init__(self, space):
+        "NOT_RPYTHON"
+        import hashlib
+        self.modules = {}
+        names = space.config.objspace.frozenmodules
+        if not names:
+            return
+        from pypy.tool.lib_pypy import LIB_PYPY, LIB_PYTHON
+        for name in names.split(','):
+            name = name.strip()
+            for libdir in [LIB_PYPY, LIB_PYTHON]:
+                path = libdir.join(name + '.py')
+                if path.check(file=1):
+                    break
+            else:
+                raise ValueError("frozen module %r not found" % (name,))
+            source = path.read('rb')
+            w_code = space.createcompiler().compile(source, str(path),
+                                                    'exec', 0)
+            # same digest as rmd5, much faster on the host
+            digest = hashlib.md5(source).digest()
+            self.modules[name] = FrozenModule(len(source), digest, w_code)
+
+    def get_code(self, modulename, source):
+        """Return the frozen code object for the given module, or None if
+        it is not frozen or if its source changed."""
+        frozen = self.modules.get(modulename, None)
+        if (frozen is not None and frozen.size == len(source) and
+                frozen.digest == rmd5.RMD5(source).digest()):
+            return frozen.w_code
+        return None
+
 def try_getattr(space, w_obj, w_name):
     try:
         return space.getattr(w_obj, w_name)
@@ -578,14 +751,22 @@ def find_module(space, modulename, w_modulename, partname, w_path,
             path = space.fsencode_w(w_pathitem)
             filepart = os.path.join(path, partname)
             log_pyverbose(space, 2, "# trying %s\n" % (filepart,))
-            if os.path.isdir(filepart) and case_ok(filepart):
-                if has_init_module(space, filepart):
+            listing = get_directory_listing(space, path)
+            if listing is not None:
+                isdir = listing.isdir(filepart)
+            else:
+                isdir = os.path.isdir(filepart) and case_ok(filepart)
+            if isdir:
+                pkglisting = None
+                if listing is not None:
+                    pkglisting = get_directory_listing(space, filepart)
+                if has_init_module(space, filepart, pkglisting):
                     return FindInfo(PKG_DIRECTORY, filepart, None)
                 else:
                     msg = ("Not importing directory '%s' missing __init__.py" %
                            (filepart,))
                     space.warn(space.newtext(msg), space.w_ImportWarning)
-            modtype, suffix, filemode = find_modtype(space, filepart)
+            modtype, suffix, filemode = find_modtype(space, filepart, listing)
             try:
                 if modtype in (PY_SOURCE, PY_COMPILED, C_EXTENSION):
                     assert suffix is not None
@@ -931,22 +1112,29 @@ def load_source_module(space, w_modulename, w_mod, pathname, source, fd,
     cpathname = pathname + 'c'
     mtime = int(src_stat[stat.ST_MTIME])
     mode = src_stat[stat.ST_MODE]
-    stream = check_compiled_module(space, cpathname, mtime)
-
-    if stream:
-        # existing and up-to-date .pyc file
-        try:
-            code_w = read_compiled_module(space, cpathname,
-                                          _wrap_readall(space, stream))
-        finally:
-            _close_ignore(stream)
-        space.setattr(w_mod, space.newtext('__file__'), space.newtext(cpathname))
+    code_w = space.fromcache(FrozenModules).get_code(
+        space.text_w(w_modulename), source)
+    if code_w is not None:
+        log_pyverbose(space, 1, "# code of %s is frozen\n" %
+                      (space.text_w(w_modulename),))
     else:
-        code_w = parse_source_module(space, pathname, source)
+        stream = check_compiled_module(space, cpathname, mtime)
+        if stream:
+            # existing and up-to-date .pyc file
+            try:
+                code_w = read_compiled_module(space, cpathname,
+                                              _wrap_readall(space, stream))
+            finally:
+                _close_ignore(stream)
+            space.setattr(w_mod, space.newtext('__file__'),
+                          space.newtext(cpathname))
+        else:
+            code_w = parse_source_module(space, pathname, source)
 
-        if write_pyc:
-            if not space.is_true(space.sys.get('dont_write_bytecode')):
-                write_compiled_module(space, code_w, cpathname, mode, mtime)
+            if write_pyc:
+                if not space.is_true(space.sys.get('dont_write_bytecode')):
+                    write_compiled_module(space, code_w, cpathname, mode,
+                                          mtime)
 
     try:
         optimize = space.sys.get_flag('optimize')
@@ -972,6 +1160,8 @@ def update_code_filenames(space, code_w, pathname, oldname=None):
     for const in constants:
         if const is not None and isinstance(const, PyCode):
             update_code_filenames(space, const, pathname, oldname)
+        elif isinstance(const, W_LazyCode):
+            const.update_filenames(space, pathname, oldname)
 
 def _get_long(s):
     a = ord(s[0])
@@ -1059,8 +1249,12 @@ def check_compiled_module(space, pycfilename, expected_mtime):
 def read_compiled_module(space, cpathname, strbuf):
     """ Read a code object from a file and check it for validity """
 
-    w_marshal = space.getbuiltinmodule('marshal')
-    w_code = space.call_method(w_marshal, 'loads', space.newbytes(strbuf))
+    if space.config.objspace.lazypycfiles:
+        from pypy.module.marshal.interp_marshal import loads_lazy_code
+        w_code = loads_lazy_code(space, space.newbytes(strbuf))
+    else:
+        w_marshal = space.getbuiltinmodule('marshal')
+        w_code = space.call_method(w_marshal, 'loads', space.newbytes(strbuf))
     if not isinstance(w_code, Code):
         raise oefmt(space.w_ImportError, "Non-code object in %s", cpathname)
     return w_code
@@ -1120,14 +1314,18 @@ def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
         return
     #
     # Careful here: we must not crash nor leave behind something that looks
-    # too much like a valid pyc file but really isn't one.
+    # too much like a valid pyc file but really isn't one.  The file is
+    # written under a temporary name and then renamed, so that other
+    # processes importing or compiling the same module concurrently never
+    # see a partially written pyc file.
     #
     mode = src_mode & ~0111
+    tmppathname = '%s.%d.tmp' % (cpathname, os.getpid())
     try:
-        stream = open_exclusive(space, cpathname, mode)
+        stream = open_exclusive(space, tmppathname, mode)
     except (OSError, StreamErrors):
         try:
-            os.unlink(cpathname)
+            os.unlink(tmppathname)
         except OSError:
             pass
         return
@@ -1146,8 +1344,15 @@ def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
             _w_long(stream, src_mtime)
         finally:
             stream.close()
-    except StreamErrors:
+        if _WIN32:
+            # os.rename() does not replace an existing file on Windows
+            try:
+                os.unlink(cpathname)
+            except OSError:
+                pass
+        os.rename(tmppathname, cpathname)
+    except (OSError, StreamErrors):
         try:
-            os.unlink(cpathname)
+            os.unlink(tmppathname)
         except OSError:
             pass
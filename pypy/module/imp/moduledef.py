@@ -24,6 +24,7 @@ class Module(MixedModule):
         'load_dynamic':    'interp_imp.load_dynamic',
         '_run_compiled_module': 'interp_imp._run_compiled_module',   # pypy
         '_getimporter':    'importing._getimporter',                 # pypy
+        'invalidate_caches': 'importing.invalidate_caches',          # pypy
         #'run_module':      'interp_imp.run_module',
         'new_module':      'interp_imp.new_module',
         'init_builtin':    'interp_imp.init_builtin',
@@ -45,7 +46,9 @@ class Module(MixedModule):
         "NOT_RPYTHON"
         MixedModule.__init__(self, space, *args)
         from pypy.module.posix.interp_posix import add_fork_hook
-        from pypy.module.imp import interp_imp
+        from pypy.module.imp import interp_imp, importing
+        # compile the frozen modules now, i.e. before translation
+        space.fromcache(importing.FrozenModules)
         add_fork_hook('before', interp_imp.acquire_lock)
         add_fork_hook('parent', interp_imp.release_lock)
         add_fork_hook('child', interp_imp.reinit_lock)
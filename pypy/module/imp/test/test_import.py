@@ -864,6 +864,134 @@ class TestAbi:
             assert importing.get_so_extension(space1) == '.TESTi.so'
             assert importing.get_so_extension(space2) == '.so'
 
+class TestDirectoryListingCache:
+    def setup_method(self, meth):
+        self.dir = udir.join('listingcache').join(meth.__name__)
+        self.dir.ensure(dir=1)
+        self.dir.join('mod.py').write('x = 1\n')
+        self.dir.join('pkg').ensure(dir=1)
+        self.make_old(self.dir)
+
+    def make_old(self, p):
+        p.setmtime(p.mtime() - 100)
+
+    def test_listing(self):
+        space = self.space
+        d = str(self.dir)
+        listing = importing.get_directory_listing(space, d)
+        assert sorted(listing.names) == ['mod.py', 'pkg']
+        assert listing.file_exists(os.path.join(d, 'mod.py'))
+        assert not listing.file_exists(os.path.join(d, 'mod.pyc'))
+        assert not listing.file_exists(os.path.join(d, 'pkg'))
+        assert listing.isdir(os.path.join(d, 'pkg'))
+        assert importing.find_modtype(space, os.path.join(d, 'mod'),
+                                      listing)[0] == importing.PY_SOURCE
+        assert importing.find_modtype(space, os.path.join(d, 'nomod'),
+                                      listing)[0] == importing.SEARCH_ERROR
+
+    def test_case_rules(self, monkeypatch):
+        space = self.space
+        d = str(self.dir)
+        listing = importing.get_directory_listing(space, d)
+        path = os.path.join(d, 'MOD.py')
+        # a case-insensitive file system
+        monkeypatch.setattr(importing.os.path, 'isfile',
+                            lambda p: p.lower() == path.lower())
+        # names that differ by case follow case_ok(), like without listing
+        monkeypatch.setattr(importing, 'case_ok', lambda p: False)
+        assert not listing.file_exists(path)
+        assert not importing.file_exists(path)
+        monkeypatch.setattr(importing, 'case_ok', lambda p: True)
+        assert listing.file_exists(path)
+        assert importing.file_exists(path)
+        assert not listing.file_exists(os.path.join(d, 'other.py'))
+
+    def test_cached_until_mtime_changes(self):
+        space = self.space
+        d = str(self.dir)
+        listing = importing.get_directory_listing(space, d)
+        assert importing.get_directory_listing(space, d) is listing
+        self.dir.join('new.py').write('')
+        listing2 = importing.get_directory_listing(space, d)
+        assert listing2 is not listing
+        assert 'new.py' in listing2.names
+        # the directory was just modified: don't cache it
+        assert importing.get_directory_listing(space, d) is not listing2
+
+    def test_invalidate_caches(self):
+        space = self.space
+        d = str(self.dir)
+        listing = importing.get_directory_listing(space, d)
+        importing.invalidate_caches(space)
+        assert importing.get_directory_listing(space, d) is not listing
+
+    def test_no_listing(self):
+        space = self.space
+        assert importing.get_directory_listing(space, 'relative') is None
+        assert importing.get_directory_listing(
+            space, str(self.dir.join('mod.py'))) is None
+        assert importing.get_directory_listing(
+            space, str(self.dir.join('missing'))) is None
+
+
+class AppTestDirectoryListingCache:
+    def setup_class(cls):
+        p = udir.join('listingcache_app')
+        p.ensure(dir=1)
+        p.join('cached_a.py').write('x = 1\n')
+        cls.w_path = cls.space.wrap(str(p))
+
+    def test_invalidate_caches(self):
+        import imp, os, sys
+        mtime = os.stat(self.path).st_mtime - 100
+        os.utime(self.path, (mtime, mtime))
+        sys.path.insert(0, self.path)
+        try:
+            import cached_a
+            assert cached_a.x == 1
+            with open(os.path.join(self.path, 'cached_b.py'), 'w') as f:
+                f.write('x = 2\n')
+            # pretend the directory was not modified: the cached listing
+            # is still used and doesn't know about cached_b
+            os.utime(self.path, (mtime, mtime))
+            raises(ImportError, "import cached_b")
+            imp.invalidate_caches()
+            import cached_b
+            assert cached_b.x == 2
+        finally:
+            sys.path.remove(self.path)
+
+
+class TestFrozenModules:
+    def test_frozen_module(self):
+        from pypy.interpreter.function import Function
+        space = maketestobjspace(make_config(None, frozenmodules='stat'))
+        frozen = space.fromcache(importing.FrozenModules)
+        w_code = frozen.modules['stat'].w_code
+        assert not hasattr(frozen.modules['stat'], 'source')
+        from pypy.tool.lib_pypy import LIB_PYTHON
+        source = LIB_PYTHON.join('stat.py').read('rb')
+        assert frozen.get_code('stat', source) is w_code
+        assert frozen.get_code('stat', source + '\n') is None
+        assert frozen.get_code('stat', source.replace('S_', 'T_')) is None
+        assert frozen.get_code('os', source) is None
+        w_mod = space.appexec([], """():
+            import sys
+            sys.modules.pop('stat', None)
+            import stat
+            return stat
+        """)
+        w_func = space.getattr(w_mod, space.wrap('S_ISDIR'))
+        assert isinstance(w_func, Function)
+        assert w_func.code in w_code.co_consts_w
+        w_file = space.getattr(w_mod, space.wrap('__file__'))
+        assert space.text_w(w_file).endswith('stat.py')
+        assert w_code.co_filename == space.text_w(w_file)
+
+    def test_no_frozen_modules(self):
+        assert self.space.fromcache(importing.FrozenModules).modules == {}
+
+
 def _getlong(data):
     x = marshal.dumps(data)
     return x[-4:]
@@ -947,6 +1075,34 @@ class TestPycStuff:
         ret = space.int_w(w_ret)
         assert ret == 42
 
+    def test_read_compiled_module_lazily(self):
+        from pypy.interpreter.pycode import W_LazyCode
+        space = maketestobjspace(make_config(None, lazypycfiles=True))
+        co = compile('def f(x):\n    def g():\n        return x\n'
+                     '    return g\n', '?', 'exec')
+        cpathname = _testfile(importing.get_pyc_magic(space), 12345, co)
+        stream = streamio.open_file_as_stream(cpathname, "rb")
+        try:
+            stream.seek(8, 0)
+            pycode = importing.read_compiled_module(
+                    space, cpathname, stream.readall())
+        finally:
+            stream.close()
+        w_lazy, = [w_const for w_const in pycode.co_consts_w
+                   if isinstance(w_const, W_LazyCode)]
+        assert w_lazy.w_code is None
+        importing.update_code_filenames(space, pycode, 'new.py')
+        w_dic = space.newdict()
+        pycode.exec_code(space, w_dic, w_dic)
+        assert w_lazy.w_code.co_name == 'f'
+        assert w_lazy.w_code.co_filename == 'new.py'
+        w_inner, = [w_const for w_const in w_lazy.w_code.co_consts_w
+                    if isinstance(w_const, W_LazyCode)]
+        assert w_inner.materialize(space).co_filename == 'new.py'
+        w_ret = space.call_function(space.call_function(
+            space.getitem(w_dic, space.wrap('f')), space.wrap(42)))
+        assert space.int_w(w_ret) == 42
+
     def test_load_compiled_module(self):
         space = self.space
         mtime = 12345
@@ -1159,6 +1315,35 @@ class TestPycStuff:
         ret = space.int_w(w_ret)
         assert ret == 42
 
+    def test_write_compiled_module_atomically(self):
+        space = self.space
+        pathname = _testfilesource()
+        stream = streamio.open_file_as_stream(pathname, "r")
+        try:
+            pycode = importing.parse_source_module(space, pathname,
+                                                   stream.readall())
+        finally:
+            stream.close()
+        cpathname = str(udir.join('atomic.pyc'))
+        f = open(cpathname, 'wb')
+        f.write('garbage')
+        f.close()
+        f = open(cpathname, 'rb')
+        try:
+            importing.write_compiled_module(space, pycode, cpathname,
+                                            0666, 12345)
+            # a reader which had the old file opened still sees it
+            # entirely, the new one replaced it as a whole
+            assert f.read() == 'garbage'
+        finally:
+            f.close()
+        ret = importing.check_compiled_module(space, cpathname, 12345)
+        assert ret is not None
+        ret.close()
+        leftovers = [name for name in os.listdir(str(udir))
+                          if name.startswith('atomic.pyc.')]
+        assert leftovers == []
+
     def test_pyc_magic_changes(self):
         py.test.skip("For now, PyPy generates only one kind of .pyc files")
         # test that the pyc files produced by a space are not reimportable
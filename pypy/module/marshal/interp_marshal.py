@@ -1,9 +1,11 @@
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import WrappedDefault, unwrap_spec
+from pypy.interpreter.pycode import PyCode, W_LazyCode
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib import rstackovf
 from pypy.module._file.interp_file import W_File
 from pypy.objspace.std.marshal_impl import marshal, get_unmarshallers
+from pypy.objspace.std import marshal_impl as mi
 
 
 Py_MARSHAL_VERSION = 2
@@ -53,6 +55,15 @@ ignored."""
     obj = u.load_w_obj()
     return obj
 
+def loads_lazy_code(space, w_str):
+    """Like loads(), but the code objects nested inside code objects are
+    only unmarshalled when they are first needed: their co_consts_w
+    entries are W_LazyCode placeholders.  Used for importing .pyc files
+    with the option objspace.lazypycfiles."""
+    u = StringUnmarshaller(space, w_str)
+    u.lazy_code = True
+    return u.load_w_obj()
+
 
 class AbstractReaderWriter(object):
     def __init__(self, space):
@@ -338,6 +349,7 @@ class Unmarshaller(_Base):
         self.space = space
         self.reader = reader
         self.stringtable_w = []
+        self.lazy_code = False
 
     def get(self, n):
         assert n >= 0
@@ -437,6 +449,19 @@ class Unmarshaller(_Base):
     def get_list_w(self):
         return self.get_tuple_w()[:]
 
+    def get_consts_w(self):
+        "Return the co_consts_w of a code object."
+        self.start(mi.TYPE_TUPLE)
+        return self.get_tuple_w()
+
+    def add_interned(self, s):
+        w_ret = self.space.new_interned_str(s)
+        self.stringtable_w.append(w_ret)
+        return w_ret
+
+    def next_interned_index(self):
+        return len(self.stringtable_w)
+
     def _overflow(self):
         self.raise_exc('object too deeply nested to unmarshal')
 
@@ -498,3 +523,113 @@ class StringUnmarshaller(Unmarshaller):
             return x
         else:
             self.raise_exc('bad marshal data')
+
+    def get_consts_w(self):
+        if not self.lazy_code:
+            return Unmarshaller.get_consts_w(self)
+        self.start(mi.TYPE_TUPLE)
+        lng = self.get_lng()
+        consts_w = [None] * lng
+        for i in range(lng):
+            pos = self.bufpos
+            if pos < self.limit and self.bufstr[pos] == mi.TYPE_CODE:
+                interned_index = self.next_interned_index()
+                self.skip_w_obj()
+                # copy the data of the code object, instead of keeping
+                # alive the data of the whole file
+                end = self.bufpos
+                assert pos >= 0
+                assert end >= 0
+                consts_w[i] = W_LazyMarshalledCode(
+                    self.bufstr[pos:end], self.stringtable_w, interned_index)
+            else:
+                consts_w[i] = self.get_w_obj()
+        return consts_w
+
+    def skip_w_obj(self):
+        """Skip over one marshalled object without building it, except for
+        the interned strings, which are referenced by index from the rest
+        of the data.  Returns the type code of the skipped object."""
+        tc = self.get1()
+        if (tc == mi.TYPE_NULL or tc == mi.TYPE_NONE or
+                tc == mi.TYPE_FALSE or tc == mi.TYPE_TRUE or
+                tc == mi.TYPE_STOPITER or tc == mi.TYPE_ELLIPSIS):
+            pass
+        elif tc == mi.TYPE_INT or tc == mi.TYPE_STRINGREF:
+            self.get(4)
+        elif tc == mi.TYPE_INT64 or tc == mi.TYPE_BINARY_FLOAT:
+            self.get(8)
+        elif tc == mi.TYPE_BINARY_COMPLEX:
+            self.get(16)
+        elif tc == mi.TYPE_FLOAT:
+            self.get_pascal()
+        elif tc == mi.TYPE_COMPLEX:
+            self.get_pascal()
+            self.get_pascal()
+        elif tc == mi.TYPE_LONG:
+            lng = self.get_int()
+            if lng < 0:
+                lng = -lng
+            self.get(2 * lng)
+        elif tc == mi.TYPE_STRING or tc == mi.TYPE_UNICODE:
+            self.get_str()
+        elif tc == mi.TYPE_INTERNED:
+            self.add_interned(self.get_str())
+        elif (tc == mi.TYPE_TUPLE or tc == mi.TYPE_LIST or
+                tc == mi.TYPE_SET or tc == mi.TYPE_FROZENSET):
+            for i in range(self.get_lng()):
+                self.skip_w_obj()
+        elif tc == mi.TYPE_DICT:
+            while self.skip_w_obj() != mi.TYPE_NULL:
+                self.skip_w_obj()
+        elif tc == mi.TYPE_CODE:
+            # see unmarshal_pycode() for the layout
+            self.get(16)           # argcount, nlocals, stacksize, flags
+            for i in range(8):     # code, consts, names, varnames,
+                self.skip_w_obj()  # freevars, cellvars, filename, name
+            self.get(4)            # firstlineno
+            self.skip_w_obj()      # lnotab
+        else:
+            self.raise_exc("bad marshal data (unknown type code)")
+        return tc
+
+
+class LazyCodeUnmarshaller(StringUnmarshaller):
+    """Unmarshaller for the code object of a W_LazyMarshalledCode.  The
+    interned strings are already in 'stringtable_w': they were added
+    when the enclosing data was skipped over."""
+    def __init__(self, space, bufstr, stringtable_w, interned_index):
+        Unmarshaller.__init__(self, space, None)
+        self.bufstr = bufstr
+        self.bufpos = 0
+        self.limit = len(bufstr)
+        self.stringtable_w = stringtable_w
+        self.interned_index = interned_index
+        self.lazy_code = True
+
+    def add_interned(self, s):
+        index = self.interned_index
+        if index >= len(self.stringtable_w):
+            self.raise_exc("bad marshal data")
+        self.interned_index = index + 1
+        return self.stringtable_w[index]
+
+    def next_interned_index(self):
+        return self.interned_index
+
+
+class W_LazyMarshalledCode(W_LazyCode):
+    def __init__(self, bufstr, stringtable_w, interned_index):
+        W_LazyCode.__init__(self)
+        self.bufstr = bufstr     # the marshalled data of this code only
+        self.stringtable_w = stringtable_w
+        self.interned_index = interned_index
+
+    def _load(self, space):
+        u = LazyCodeUnmarshaller(space, self.bufstr, self.stringtable_w,
+                                 self.interned_index)
+        w_code = u.load_w_obj()
+        assert isinstance(w_code, PyCode)
+        self.bufstr = None
+        self.stringtable_w = None
+        return w_code
@@ -91,3 +91,71 @@ def test_long_more(space):
         for i in range(100):
             _marshal_check(sign * ((1L << i) - 1L))
             _marshal_check(sign * (1L << i))
+
+
+LAZY_SOURCE = '''
+def f(a, b=2.5):
+    "doc of f"
+    x = (1, 2L, -3L ** 70, 4.5, 1j, u"\\xe9", None, Ellipsis, frozenset([7]))
+    def g(c):
+        def h():
+            return a, c, "interned_name"
+        return h
+    return x, g(b)()
+
+lam = lambda: "interned_name"
+'''
+
+def test_loads_lazy_code(space):
+    from pypy.interpreter.pycode import PyCode, W_LazyCode
+    w_data = space.appexec([space.newtext(LAZY_SOURCE)], """(source):
+        import marshal
+        return marshal.dumps(compile(source, 'lazy.py', 'exec'))
+    """)
+    w_eager = interp_marshal.loads(space, w_data)
+    w_code = interp_marshal.loads_lazy_code(space, w_data)
+    assert isinstance(w_code, PyCode)
+    lazies = [w_const for w_const in w_code.co_consts_w
+              if isinstance(w_const, W_LazyCode)]
+    assert len(lazies) == 2
+    assert [w_lazy.w_code for w_lazy in lazies] == [None, None]
+    # the placeholders only keep the data of their own code object
+    data = space.bytes_w(w_data)
+    assert lazies[0].bufstr[0] == 'c'
+    assert lazies[0].bufstr in data
+    assert len(lazies[0].bufstr) + len(lazies[1].bufstr) < len(data)
+    assert space.is_true(space.eq(w_code, w_eager))
+    # comparing the code objects built all the lazy ones
+    w_f = lazies[0].w_code
+    assert isinstance(w_f, PyCode)
+    assert w_f.co_name == 'f'
+    assert len([w_const for w_const in w_f.co_consts_w
+                if isinstance(w_const, W_LazyCode)]) == 1
+    #
+    w_code = interp_marshal.loads_lazy_code(space, w_data)
+    w_res = space.appexec([w_code], """(code):
+        d = {}
+        exec code in d
+        assert d['f'](1) == (
+            (1, 2L, -3L ** 70, 4.5, 1j, u"\\xe9", None, Ellipsis,
+             frozenset([7])), (1, 2.5, "interned_name"))
+        assert d['f'].__doc__ == "doc of f"
+        return d['lam']()
+    """)
+    assert space.text_w(w_res) == "interned_name"
+
+def test_loads_lazy_code_remove_docstrings(space):
+    from pypy.interpreter.pycode import PyCode
+    w_data = space.appexec([space.newtext(LAZY_SOURCE)], """(source):
+        import marshal
+        return marshal.dumps(compile(source, 'lazy.py', 'exec'))
+    """)
+    w_code = interp_marshal.loads_lazy_code(space, w_data)
+    assert isinstance(w_code, PyCode)
+    w_code.remove_docstrings(space)
+    w_res = space.appexec([w_code], """(code):
+        d = {}
+        exec code in d
+        return d['f'].__doc__
+    """)
+    assert space.is_w(w_res, space.w_None)
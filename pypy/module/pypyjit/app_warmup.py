@@ -0,0 +1,92 @@
+"""
+Saving the JIT counters of a warm process to a file, and pre-seeding the
+counters of a fresh process from it.  This lets e.g. the workers of a
+prefork server skip most of the warmup after every restart.
+
+The positions are identified by (co_filename, co_name, co_firstlineno,
+next_instr), so that they can be found again in another process that
+imported the same modules.  The file is a marshalled list of
+(co_filename, co_name, co_firstlineno, next_instr, fraction) tuples.
+"""
+
+def _iter_codes(modules):
+    # only look at the types of the objects: calling hasattr() or getattr()
+    # could run the __getattr__ of arbitrary objects
+    import types
+    seen = set()
+    todo = []
+    for module in modules:
+        if issubclass(type(module), types.ModuleType):
+            todo.extend(module.__dict__.values())
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        t = type(obj)
+        if t is staticmethod or t is classmethod or t is types.MethodType:
+            todo.append(obj.__func__)
+        elif issubclass(t, type) or t is types.ClassType:
+            todo.extend(obj.__dict__.values())
+        elif t is types.FunctionType:
+            todo.append(obj.__code__)
+        elif t is types.CodeType:
+            yield obj
+            todo.extend(obj.co_consts)
+
+def _loop_headers(code):
+    # the positions at which the JIT counts: the start of the code and
+    # the targets of the backward jumps (see interp_jit.jump_absolute)
+    import opcode
+    result = [0]
+    co_code = code.co_code
+    i = 0
+    while i < len(co_code):
+        op = ord(co_code[i])
+        if op >= opcode.HAVE_ARGUMENT:
+            arg = ord(co_code[i + 1]) | (ord(co_code[i + 2]) << 8)
+            if op == opcode.opmap['JUMP_ABSOLUTE'] and arg <= i:
+                if arg not in result:
+                    result.append(arg)
+            i += 3
+        else:
+            i += 1
+    return result
+
+def dump_warmup_profile(filename, min_fraction=0.05):
+    """Write to 'filename' the positions in the code of the modules of
+    sys.modules whose JIT counter is at least 'min_fraction' (1.0 for the
+    ones that were compiled).  Returns the number of positions written."""
+    import sys, marshal
+    from pypyjit import get_counter_fraction
+    entries = []
+    for code in _iter_codes(sys.modules.values()):
+        for next_instr in _loop_headers(code):
+            fraction = get_counter_fraction(next_instr, False, code)
+            if fraction >= min_fraction:
+                entries.append((code.co_filename, code.co_name,
+                                code.co_firstlineno, next_instr, fraction))
+    with open(filename, 'wb') as f:
+        marshal.dump(entries, f)
+    return len(entries)
+
+def load_warmup_profile(filename):
+    """Pre-seed the JIT counters with the ones written by
+    dump_warmup_profile() in another process.  Only the code of modules
+    already in sys.modules is found, so call this after the imports.
+    Returns the number of positions seeded."""
+    import sys, marshal
+    from pypyjit import set_counter_fraction
+    with open(filename, 'rb') as f:
+        entries = marshal.load(f)
+    profile = {}
+    for co_filename, name, firstlineno, next_instr, fraction in entries:
+        key = (co_filename, name, firstlineno)
+        profile.setdefault(key, []).append((next_instr, fraction))
+    count = 0
+    for code in _iter_codes(sys.modules.values()):
+        key = (code.co_filename, code.co_name, code.co_firstlineno)
+        for next_instr, fraction in profile.get(key, ()):
+            set_counter_fraction(next_instr, False, code, fraction)
+            count += 1
+    return count
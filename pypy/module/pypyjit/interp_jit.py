@@ -249,6 +249,31 @@ def trace_next_iteration(space, next_instr, is_being_profiled, w_pycode):
         'pypyjit', r_uint(next_instr), int(is_being_profiled), ll_pycode)
     return space.w_None
 
+@unwrap_spec(next_instr=int, is_being_profiled=bool, w_pycode=PyCode)
+@dont_look_inside
+def get_counter_fraction(space, next_instr, is_being_profiled, w_pycode):
+    """ Return how close this position is to being traced, between 0.0 and
+    1.0, or 1.0 if it was already compiled.
+    """
+    ll_pycode = cast_instance_to_gcref(w_pycode)
+    return space.newfloat(jit_hooks.get_counter_fraction(
+        'pypyjit', r_uint(next_instr), int(is_being_profiled), ll_pycode))
+
+@unwrap_spec(next_instr=int, is_being_profiled=bool, w_pycode=PyCode,
+             fraction=float)
+@dont_look_inside
+def set_counter_fraction(space, next_instr, is_being_profiled, w_pycode,
+                         fraction):
+    """ Pre-seed the counter of this position with a value returned by
+    get_counter_fraction(), possibly in another process.  A value close
+    to 1.0 means that it will be traced very soon.
+    """
+    ll_pycode = cast_instance_to_gcref(w_pycode)
+    jit_hooks.set_counter_fraction(
+        'pypyjit', fraction, r_uint(next_instr), int(is_being_profiled),
+        ll_pycode)
+    return space.w_None
+
 @unwrap_spec(hash=r_uint)
 @dont_look_inside
 def trace_next_iteration_hash(space, hash):
@@ -397,6 +397,16 @@ def get_stats_asmmemmgr(space):
     m2 = jit_hooks.stats_asmmemmgr_used(None)
     return space.newtuple2(space.newint(m1), space.newint(m2))
 
+def get_stats_memmgr(space):
+    """Returns the state of the JIT code cache, as a tuple
+    (number_of_loops_kept, estimated_bytes_kept, number_of_loops_evicted).
+    Loops are evicted when the jit parameter 'code_cache_limit' is set."""
+    n1 = jit_hooks.stats_memmgr_alive_loops(None)
+    n2 = jit_hooks.stats_memmgr_resident_bytes(None)
+    n3 = jit_hooks.stats_memmgr_evicted_loops(None)
+    return space.newtuple([space.newint(n1), space.newint(n2),
+                           space.newint(n3)])
+
 def enable_debug(space):
     """ Set the jit debugging - completely necessary for some stats to work,
     most notably assembler counters.
@@ -2,6 +2,8 @@ from pypy.interpreter.mixedmodule import MixedModule
 
 class Module(MixedModule):
     appleveldefs = {
+        'dump_warmup_profile': 'app_warmup.dump_warmup_profile',
+        'load_warmup_profile': 'app_warmup.load_warmup_profile',
     }
 
     interpleveldefs = {
@@ -13,12 +15,15 @@ class Module(MixedModule):
         'mark_as_being_traced': 'interp_jit.mark_as_being_traced',
         'trace_next_iteration': 'interp_jit.trace_next_iteration',
         'trace_next_iteration_hash': 'interp_jit.trace_next_iteration_hash',
+        'get_counter_fraction': 'interp_jit.get_counter_fraction',
+        'set_counter_fraction': 'interp_jit.set_counter_fraction',
         'releaseall': 'interp_jit.releaseall',
         'set_compile_hook': 'interp_resop.set_compile_hook',
         'set_abort_hook': 'interp_resop.set_abort_hook',
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'get_stats_asmmemmgr': 'interp_resop.get_stats_asmmemmgr',
+        'get_stats_memmgr': 'interp_resop.get_stats_memmgr',
         # those things are disabled because they have bugs, but if
         # they're found to be useful, fix test_ztranslation_jit_stats
         # in the backend first. get_stats_snapshot still produces
@@ -480,3 +480,26 @@ class TestMisc(BaseTestPyPyC):
         loop, = log.loops_by_filename(self.filepath)
         opnames = log.opnames(loop.allops())
         assert "new" not in opnames
+
+    def test_warmup_profile(self, tmpdir):
+        profile = str(tmpdir.join('profile'))
+        def main(n, profile):
+            import pypyjit
+            def f(n):
+                i = 0
+                while i < n:
+                    i += 1
+                return i
+            f(n)
+            count = pypyjit.dump_warmup_profile(profile)
+            assert count > 0
+            # reading it back in the same process finds the same code
+            assert pypyjit.load_warmup_profile(profile) == count
+            return count
+        log = self.run(main, [1000, profile])
+        assert log.result > 0
+        import marshal
+        with open(profile, 'rb') as f:
+            entries = marshal.load(f)
+        assert any(name == 'f' and fraction == 1.0
+                   for (_, name, _, _, fraction) in entries)
@@ -53,13 +53,21 @@ class W_ZipCache(W_Root):
         except KeyError:
             raise OperationError(space.w_KeyError, space.newtext(name))
         assert isinstance(w_zipimporter, W_ZipImporter)
+        zip_file = w_zipimporter.zip_file
+        try:
+            zip_file.read_file_headers()
+        except (BadZipfile, OSError):
+            raise oefmt(get_error(space), "bad local file header in %s",
+                        w_zipimporter.filename)
         w_d = space.newdict()
-        for key, info in w_zipimporter.zip_file.NameToInfo.iteritems():
+        for key, info in zip_file.NameToInfo.iteritems():
             if ZIPSEP != os.path.sep:
                 key = key.replace(ZIPSEP, os.path.sep)
             space.setitem(w_d, space.newtext(key), space.newtuple([
                 space.newtext(info.filename), space.newint(info.compress_type), space.newint(info.compress_size),
-                space.newint(info.file_size), space.newint(info.file_offset), space.newint(info.dostime),
+                space.newint(info.file_size),
+                space.newint(info.file_offset),
+                space.newint(info.dostime),
                 space.newint(info.dosdate), space.newint(info.CRC)]))
         return w_d
 
@@ -115,12 +123,19 @@ W_ZipCache.typedef = TypeDef(
 zip_cache = W_ZipCache()
 
 class W_ZipImporter(W_Root):
-    def __init__(self, space, name, filename, zip_file, prefix):
+    def __init__(self, space, name, filename, zip_file, prefix,
+                 zip_mtime, zip_size):
         self.space = space
         self.name = name
         self.filename = filename
         self.zip_file = zip_file
         self.prefix = prefix
+        # the stat of the archive when 'zip_file' was read
+        self.zip_mtime = zip_mtime
+        self.zip_size = zip_size
+
+    def zip_file_is_up_to_date(self, st):
+        return st.st_mtime == self.zip_mtime and st.st_size == self.zip_size
 
     def getprefix(self, space):
         if ZIPSEP == os.path.sep:
@@ -368,43 +383,56 @@ def descr_new_zipimporter(space, w_type, name):
                     if name[i] == os.path.sep or name[i] == ZIPSEP]
     parts_ends.append(len(name))
     filename = "" # make annotator happy
+    st = None
     for i in parts_ends:
         filename = name[:i]
         if not filename:
             filename = os.path.sep
         try:
-            s = os.stat(filename)
+            st = os.stat(filename)
         except OSError:
             raise oefmt(get_error(space), "Cannot find name %s", filename)
-        if not stat.S_ISDIR(s.st_mode):
+        if not stat.S_ISDIR(st.st_mode):
             ok = True
             break
     if not ok:
         raise oefmt(get_error(space), "Did not find %s to be a valid zippath",
                     name)
+    assert st is not None
+    zip_file = None
     try:
         w_result = zip_cache.get(filename)
         if w_result is None:
             raise oefmt(get_error(space),
                         "Cannot import %s from zipfile, recursion detected or"
                         "already tried and failed", name)
+        # the importers for the subdirectories of an archive, and the
+        # importers created again for the same archive, share the
+        # directory that was read already, as long as the archive is
+        # not modified
+        assert isinstance(w_result, W_ZipImporter)
+        if w_result.zip_file_is_up_to_date(st):
+            zip_file = w_result.zip_file
     except KeyError:
         zip_cache.cache[filename] = None
-    try:
-        zip_file = RZipFile(filename, 'r')
-    except (BadZipfile, OSError):
-        raise oefmt(get_error(space), "%s seems not to be a zipfile", filename)
-    except RZlibError as e:
-        # in this case, CPython raises the direct exception coming
-        # from the zlib module: let's do the same
-        raise zlib_error(space, e.msg)
+    if zip_file is None:
+        try:
+            zip_file = RZipFile(filename, 'r')
+        except (BadZipfile, OSError):
+            raise oefmt(get_error(space), "%s seems not to be a zipfile",
+                        filename)
+        except RZlibError as e:
+            # in this case, CPython raises the direct exception coming
+            # from the zlib module: let's do the same
+            raise zlib_error(space, e.msg)
 
     prefix = name[len(filename):]
     if prefix.startswith(os.path.sep) or prefix.startswith(ZIPSEP):
         prefix = prefix[1:]
     if prefix and not prefix.endswith(ZIPSEP) and not prefix.endswith(os.path.sep):
         prefix += ZIPSEP
-    w_result = W_ZipImporter(space, name, filename, zip_file, prefix)
+    w_result = W_ZipImporter(space, name, filename, zip_file, prefix,
+                             st.st_mtime, st.st_size)
     zip_cache.set(filename, w_result)
     return w_result
 
@@ -125,6 +125,38 @@ class AppTestZipimport:
         finally:
             del _zip_directory_cache[self.zipfile]
 
+    def test_corrupted_local_header(self):
+        self.writefile('x.py', 'y = 42')
+        # break the magic number of the local header of 'x.py', which is
+        # only read when needed
+        f = open(self.zipfile, 'r+b')
+        f.write('XXXX')
+        f.close()
+        from zipimport import _zip_directory_cache, zipimporter
+        from zipimport import ZipImportError
+        importer = zipimporter(self.zipfile)
+        try:
+            raises(ZipImportError, importer.load_module, 'x')
+            raises(ZipImportError, "_zip_directory_cache[self.zipfile]")
+        finally:
+            del _zip_directory_cache[self.zipfile]
+
+    def test_cache_shares_directory(self):
+        import os, time
+        self.writefile('x.py', '')
+        self.writefile('sub/__init__.py', '')
+        from zipimport import zipimporter
+        main_importer = zipimporter(self.zipfile)
+        sub_importer = zipimporter(self.zipfile + os.path.sep + 'sub')
+        assert sub_importer.find_module('x') is None
+        assert main_importer.find_module('x') is main_importer
+        # modify the archive: a new importer must see the new file
+        self.writefile('y.py', '')
+        st = os.stat(self.zipfile)
+        os.utime(self.zipfile, (st.st_atime, st.st_mtime + 10))
+        new_importer = zipimporter(self.zipfile)
+        assert new_importer.find_module('y') is new_importer
+
     def test_cache_subdir(self):
         import os
         self.writefile('x.py', '')
@@ -0,0 +1,317 @@
+"""dict implementation specialized for small, mostly contiguous int keys.
+
+The values are stored in a list indexed by the key, with None marking the
+keys that are not in the dict.  Iterating over the list gives the keys in
+increasing order, so the strategy is only kept as long as the keys were
+inserted in increasing order too; everything else devolves to
+IntDictStrategy or ObjectDictStrategy.
+"""
+
+from rpython.rlib import jit, rerased, objectmodel
+
+from pypy.objspace.std.dictmultiobject import (
+    DictStrategy, IntDictStrategy, ObjectDictStrategy,
+    create_iterator_classes, W_DictObject)
+
+
+# how many holes there may be in the list of values: a new key can be
+# added if afterwards the list is at most twice as long as the number of
+# keys, plus DENSE_SLACK.  Deleting keys only devolves once the list gets
+# twice as sparse as that.
+DENSE_SLACK = 16
+
+def fits_dense(key, length):
+    # compare the key itself: 'key + 1' would overflow for sys.maxint
+    return key < 2 * length + DENSE_SLACK
+
+def too_sparse(size, length):
+    return size > 4 * length + 2 * DENSE_SLACK
+
+
+class DenseIntDictStorage(object):
+    def __init__(self, values_w, length):
+        # values_w[key] is the value for 'key', or None.  The last item of
+        # values_w is never None.
+        self.values_w = values_w
+        self.length = length
+
+    def trim(self):
+        values_w = self.values_w
+        while values_w and values_w[-1] is None:
+            values_w.pop()
+
+
+class DenseIntDictStrategy(DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("denseintdict")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, key):
+        return self.space.newint(key)
+
+    def unwrap(self, wrapped):
+        return self.space.int_w(wrapped)
+
+    def get_empty_storage(self):
+        return self.erase(DenseIntDictStorage([], 0))
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_int)
+
+    def _never_equal_to(self, w_lookup_type):
+        space = self.space
+        return (space.is_w(w_lookup_type, space.w_NoneType) or
+                space.is_w(w_lookup_type, space.w_bytes) or
+                space.is_w(w_lookup_type, space.w_unicode)
+                )
+
+    def _setitem_int(self, storage, key, w_value):
+        # returns False if the key cannot be stored without breaking the
+        # insertion order or making the list too sparse
+        values_w = storage.values_w
+        if key < 0:
+            return False
+        if key < len(values_w):
+            if values_w[key] is None:
+                return False
+            values_w[key] = w_value
+            return True
+        if not fits_dense(key, storage.length + 1):
+            return False
+        while len(values_w) < key:
+            values_w.append(None)
+        values_w.append(w_value)
+        storage.length += 1
+        return True
+
+    def _getitem_int(self, storage, key):
+        values_w = storage.values_w
+        if 0 <= key < len(values_w):
+            return values_w[key]
+        return None
+
+    def _delitem_int(self, w_dict, storage, key):
+        values_w = storage.values_w
+        w_value = values_w[key]
+        values_w[key] = None
+        storage.length -= 1
+        storage.trim()
+        if too_sparse(len(values_w), storage.length):
+            self.switch_to_int_strategy(w_dict)
+        return w_value
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            storage = self.unerase(w_dict.dstorage)
+            if self._setitem_int(storage, self.unwrap(w_key), w_value):
+                return
+            self.switch_to_int_strategy(w_dict)
+        else:
+            self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(w_key, w_value)
+
+    def setitem_str(self, w_dict, key, w_value):
+        self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(self.space.newtext(key), w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            storage = self.unerase(w_dict.dstorage)
+            key = self.unwrap(w_key)
+            w_result = self._getitem_int(storage, key)
+            if w_result is not None:
+                return w_result
+            if self._setitem_int(storage, key, w_default):
+                return w_default
+            self.switch_to_int_strategy(w_dict)
+        else:
+            self.switch_to_object_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            storage = self.unerase(w_dict.dstorage)
+            key = self.unwrap(w_key)
+            if self._getitem_int(storage, key) is None:
+                raise KeyError
+            self._delitem_int(w_dict, storage, key)
+        elif self._never_equal_to(space.type(w_key)):
+            raise KeyError
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.delitem(w_key)
+
+    def length(self, w_dict):
+        return self.unerase(w_dict.dstorage).length
+
+    def getitem_str(self, w_dict, key):
+        return None
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            storage = self.unerase(w_dict.dstorage)
+            return self._getitem_int(storage, self.unwrap(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def listview_int(self, w_dict):
+        values_w = self.unerase(w_dict.dstorage).values_w
+        return [i for i in range(len(values_w)) if values_w[i] is not None]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_int(self.listview_int(w_dict))
+
+    def values(self, w_dict):
+        values_w = self.unerase(w_dict.dstorage).values_w
+        return [w_value for w_value in values_w if w_value is not None]
+
+    def items(self, w_dict):
+        space = self.space
+        values_w = self.unerase(w_dict.dstorage).values_w
+        return [space.newtuple2(self.wrap(i), values_w[i])
+                for i in range(len(values_w)) if values_w[i] is not None]
+
+    def popitem(self, w_dict):
+        storage = self.unerase(w_dict.dstorage)
+        key = len(storage.values_w) - 1
+        if key < 0:
+            raise KeyError
+        w_value = self._delitem_int(w_dict, storage, key)
+        return self.wrap(key), w_value
+
+    def pop(self, w_dict, w_key, w_default):
+        space = self.space
+        if self.is_correct_type(w_key):
+            storage = self.unerase(w_dict.dstorage)
+            key = self.unwrap(w_key)
+            if self._getitem_int(storage, key) is not None:
+                return self._delitem_int(w_dict, storage, key)
+        elif not self._never_equal_to(space.type(w_key)):
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.get_strategy().pop(w_dict, w_key, w_default)
+        if w_default is not None:
+            return w_default
+        raise KeyError
+
+    def clear(self, w_dict):
+        w_dict.dstorage = self.get_empty_storage()
+
+    def copy(self, w_dict):
+        storage = self.unerase(w_dict.dstorage)
+        copy = DenseIntDictStorage(storage.values_w[:], storage.length)
+        return W_DictObject(self.space, self, self.erase(copy))
+
+    def switch_to_int_strategy(self, w_dict):
+        strategy = self.space.fromcache(IntDictStrategy)
+        values_w = self.unerase(w_dict.dstorage).values_w
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for i in range(len(values_w)):
+            w_value = values_w[i]
+            if w_value is not None:
+                d_new[i] = w_value
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_object_strategy(self, w_dict):
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        values_w = self.unerase(w_dict.dstorage).values_w
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for i in range(len(values_w)):
+            w_value = values_w[i]
+            if w_value is not None:
+                d_new[self.wrap(i)] = w_value
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def getiterkeys(self, w_dict):
+        return DenseKeyIterator(self.unerase(w_dict.dstorage).values_w)
+
+    def getitervalues(self, w_dict):
+        return DenseValueIterator(self.unerase(w_dict.dstorage).values_w)
+
+    def getiteritems_with_hash(self, w_dict):
+        return DenseItemsWithHash(self.unerase(w_dict.dstorage).values_w)
+
+    def getiterreversed(self, w_dict):
+        return DenseReversedKeyIterator(
+            self.unerase(w_dict.dstorage).values_w)
+
+    def _unrolling_heuristic(self, w_dict):
+        values_w = self.unerase(w_dict.dstorage).values_w
+        return jit.loop_unrolling_heuristic(values_w, len(values_w),
+                                            DENSE_SLACK)
+
+    def wrapkey(space, key):
+        return space.newint(key)
+
+
+class DenseKeyIterator(object):
+    def __init__(self, values_w):
+        self.values_w = values_w
+        self.i = 0
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        values_w = self.values_w
+        i = self.i
+        while i < len(values_w):
+            if values_w[i] is not None:
+                self.i = i + 1
+                return i
+            i += 1
+        self.i = i
+        raise StopIteration
+
+
+class DenseReversedKeyIterator(object):
+    def __init__(self, values_w):
+        self.values_w = values_w
+        self.i = len(values_w) - 1
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        values_w = self.values_w
+        i = min(self.i, len(values_w) - 1)
+        while i >= 0:
+            if values_w[i] is not None:
+                self.i = i - 1
+                return i
+            i -= 1
+        self.i = i
+        raise StopIteration
+
+
+class DenseValueIterator(object):
+    def __init__(self, values_w):
+        self.keys = DenseKeyIterator(values_w)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        key = self.keys.next()
+        return self.keys.values_w[key]
+
+
+class DenseItemsWithHash(object):
+    def __init__(self, values_w):
+        self.keys = DenseKeyIterator(values_w)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        key = self.keys.next()
+        return (key, self.keys.values_w[key], objectmodel.compute_hash(key))
+
+create_iterator_classes(DenseIntDictStrategy)
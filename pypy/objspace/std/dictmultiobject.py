@@ -720,7 +720,12 @@ class EmptyDictStrategy(DictStrategy):
             return
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
-            self.switch_to_int_strategy(w_dict)
+            from pypy.objspace.std.denseintdict import fits_dense
+            key = self.space.int_w(w_key)
+            if key >= 0 and fits_dense(key, 1):
+                self.switch_to_dense_int_strategy(w_dict)
+            else:
+                self.switch_to_int_strategy(w_dict)
         elif w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
         else:
@@ -744,6 +749,13 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
+    def switch_to_dense_int_strategy(self, w_dict):
+        from pypy.objspace.std.denseintdict import DenseIntDictStrategy
+        strategy = self.space.fromcache(DenseIntDictStrategy)
+        storage = strategy.get_empty_storage()
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
     def switch_to_identity_strategy(self, w_dict):
         from pypy.objspace.std.identitydict import IdentityDictStrategy
         strategy = self.space.fromcache(IdentityDictStrategy)
@@ -1131,12 +1143,24 @@ class AbstractTypedStrategy(object):
     def clear(self, w_dict):
         self.unerase(w_dict.dstorage).clear()
 
+    # True if the hash stored with each key is the same as the app-level
+    # hash of the wrapped key (modulo the -1 => -2 conversion)
+    reuse_hash_for_object_strategy = False
+
     def switch_to_object_strategy(self, w_dict):
         d = self.unerase(w_dict.dstorage)
         strategy = self.space.fromcache(ObjectDictStrategy)
         d_new = strategy.unerase(strategy.get_empty_storage())
-        for key, value in d.iteritems():
-            d_new[self.wrap(key)] = value
+        if self.reuse_hash_for_object_strategy:
+            # don't call space.hash_w() again on every wrapped key
+            objectmodel.prepare_dict_update(d_new, len(d))
+            for key, value, keyhash in objectmodel.iteritems_with_hash(d):
+                keyhash -= (keyhash == -1)
+                objectmodel.setitem_with_hash(d_new, self.wrap(key), keyhash,
+                                              value)
+        else:
+            for key, value in d.iteritems():
+                d_new[self.wrap(key)] = value
         w_dict.set_strategy(strategy)
         w_dict.dstorage = strategy.erase(d_new)
 
@@ -1222,6 +1246,8 @@ class BytesDictStrategy(AbstractTypedStrategy, DictStrategy):
     erase = staticmethod(erase)
     unerase = staticmethod(unerase)
 
+    reuse_hash_for_object_strategy = True
+
     def wrap(self, unwrapped):
         return self.space.newbytes(unwrapped)
 
@@ -1291,6 +1317,8 @@ class UnicodeDictStrategy(AbstractTypedStrategy, DictStrategy):
     erase = staticmethod(erase)
     unerase = staticmethod(unerase)
 
+    reuse_hash_for_object_strategy = True
+
     def wrap(self, unwrapped):
         return unwrapped
 
@@ -1327,12 +1355,21 @@ class UnicodeDictStrategy(AbstractTypedStrategy, DictStrategy):
     ##     assert key is not None
     ##     return self.unerase(w_dict.dstorage).get(key, None)
 
-    ## def listview_ascii(self, w_dict):
-    ##     XXX reimplement.  Also warning: must return a list of _ascii_
-    ##     return self.unerase(w_dict.dstorage).keys()
+    def listview_ascii(self, w_dict):
+        # must return a list of _ascii_ strings, or None
+        d = self.unerase(w_dict.dstorage)
+        result = newlist_hint(len(d))
+        for w_key in d.iterkeys():
+            if not w_key.is_ascii():
+                return None
+            result.append(w_key._utf8)
+        return result
 
-    ## def w_keys(self, w_dict):
-    ##     return self.space.newlist_bytes(self.listview_bytes(w_dict))
+    def w_keys(self, w_dict):
+        keys = self.listview_ascii(w_dict)
+        if keys is not None:
+            return self.space.newlist_utf8(keys, True)
+        return AbstractTypedStrategy.w_keys(self, w_dict)
 
     def wrapkey(space, key):
         return key
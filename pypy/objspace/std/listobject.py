@@ -34,6 +34,7 @@ from pypy.objspace.std.iterobject import (
     W_FastListIterObject, W_ReverseSeqIterObject)
 from pypy.objspace.std.sliceobject import (
     W_SliceObject, normalize_simple_slice, unwrap_start_stop)
+from pypy.objspace.std.specialisedtupleobject import Cls_ff, Cls_ii
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import get_positive_index, negate
@@ -43,6 +44,17 @@ __all__ = ['W_ListObject', 'make_range_list', 'make_empty_list_with_size']
 
 UNROLL_CUTOFF = 5
 
+# slices and copies of at least this many items of an int, float or bytes
+# list share their storage with the original list (see
+# AbstractSharedStrategy)
+COW_SLICE_CUTOFF = 64
+
+
+def _worth_sharing(length, storage_length):
+    # a shared slice must cover at least half of the storage it refers to,
+    # otherwise a small slice could keep a big list alive
+    return length >= COW_SLICE_CUTOFF and 2 * length >= storage_length
+
 
 def make_range_list(space, start, step, length):
     if length <= 0:
@@ -98,14 +110,19 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
         else:
             return space.fromcache(BytesListStrategy)
 
-    elif type(w_firstobj) is W_UnicodeObject and w_firstobj.is_ascii():
-        # check for all-unicodes containing only ascii
+    elif type(w_firstobj) is W_UnicodeObject:
+        # check for all-unicodes, and whether they contain only ascii
+        all_ascii = w_firstobj.is_ascii()
         for i in range(1, len(list_w)):
             item = list_w[i]
-            if type(item) is not W_UnicodeObject or not item.is_ascii():
+            if type(item) is not W_UnicodeObject:
                 break
+            if all_ascii and not item.is_ascii():
+                all_ascii = False
         else:
-            return space.fromcache(AsciiListStrategy)
+            if all_ascii:
+                return space.fromcache(AsciiListStrategy)
+            return space.fromcache(Utf8ListStrategy)
 
     elif type(w_firstobj) is W_FloatObject:
         # check for all-floats
@@ -117,6 +134,22 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
         else:
             return space.fromcache(FloatListStrategy)
 
+    elif type(w_firstobj) is Cls_ii:
+        # check for all-(int, int)-tuples
+        for i in range(1, len(list_w)):
+            if type(list_w[i]) is not Cls_ii:
+                break
+        else:
+            return space.fromcache(IntPairListStrategy)
+
+    elif type(w_firstobj) is Cls_ff:
+        # check for all-(float, float)-tuples
+        for i in range(1, len(list_w)):
+            if type(list_w[i]) is not Cls_ff:
+                break
+        else:
+            return space.fromcache(FloatPairListStrategy)
+
     if check_int_or_float:
         for w_obj in list_w:
             if type(w_obj) is W_IntObject:
@@ -244,6 +277,12 @@ class W_ListObject(W_Root):
         storage = strategy.erase(list_u)
         return W_ListObject.from_storage_and_strategy(space, storage, strategy)
 
+    @staticmethod
+    def newlist_utf8(space, list_u):
+        strategy = space.fromcache(Utf8ListStrategy)
+        storage = strategy.erase(_with_codepoint_lengths(list_u))
+        return W_ListObject.from_storage_and_strategy(space, storage, strategy)
+
     @staticmethod
     def newlist_int(space, list_i):
         strategy = space.fromcache(IntegerListStrategy)
@@ -384,6 +423,11 @@ class W_ListObject(W_Root):
         not use the list strategy, return None."""
         return self.strategy.getitems_ascii(self)
 
+    def getitems_utf8(self):
+        """Return the items in the list as unwrapped utf8 strings. If the list
+        does not use the ascii or utf8 list strategy, return None."""
+        return self.strategy.getitems_utf8(self)
+
     def getitems_int(self):
         """Return the items in the list as unwrapped ints. If the list does not
         use the list strategy, return None."""
@@ -427,6 +471,8 @@ class W_ListObject(W_Root):
         """Sets the slice of the list from start to start+step*slicelength to
         the sequence sequence_w.
         Used by setslice and setitem."""
+        if not self.strategy.is_empty_strategy():
+            sequence_w = sequence_w._temporarily_unshared()
         self.strategy.setslice(self, start, step, slicelength, sequence_w)
 
     def insert(self, index, w_item):
@@ -454,6 +500,12 @@ class W_ListObject(W_Root):
         # exposed in __pypy__
         return self.strategy.physical_size(self)
 
+    def _temporarily_unshared(self):
+        """Returns a list with the same items that does not share them
+        with other lists (see AbstractSharedStrategy).  The result may be
+        self and must only be read from; self is left unchanged."""
+        return self.strategy._temporarily_unshared(self)
+
     # exposed to app-level
 
     @staticmethod
@@ -907,6 +959,9 @@ class ListStrategy(object):
     def getitems_ascii(self, w_list):
         return None
 
+    def getitems_utf8(self, w_list):
+        return None
+
     def getitems_int(self, w_list):
         return None
 
@@ -950,6 +1005,8 @@ class ListStrategy(object):
         space = self.space
         if type(w_any) is W_ListObject or (isinstance(w_any, W_ListObject) and
                                            space._uses_list_iter(w_any)):
+            if not self.is_empty_strategy():
+                w_any = w_any._temporarily_unshared()
             self._extend_from_list(w_list, w_any)
         elif (isinstance(w_any, W_AbstractTupleObject) and
                 not w_any.user_overridden_class and
@@ -1002,6 +1059,9 @@ class ListStrategy(object):
     def is_empty_strategy(self):
         return False
 
+    def _temporarily_unshared(self, w_list):
+        return w_list
+
     def physical_size(self, w_list):
         raise oefmt(self.space.w_ValueError, "can't get physical size of list")
 
@@ -1085,10 +1145,17 @@ class EmptyListStrategy(ListStrategy):
             strategy = self.space.fromcache(IntegerListStrategy)
         elif type(w_item) is W_BytesObject:
             strategy = self.space.fromcache(BytesListStrategy)
-        elif type(w_item) is W_UnicodeObject and w_item.is_ascii():
-            strategy = self.space.fromcache(AsciiListStrategy)
+        elif type(w_item) is W_UnicodeObject:
+            if w_item.is_ascii():
+                strategy = self.space.fromcache(AsciiListStrategy)
+            else:
+                strategy = self.space.fromcache(Utf8ListStrategy)
         elif type(w_item) is W_FloatObject:
             strategy = self.space.fromcache(FloatListStrategy)
+        elif type(w_item) is Cls_ii:
+            strategy = self.space.fromcache(IntPairListStrategy)
+        elif type(w_item) is Cls_ff:
+            strategy = self.space.fromcache(FloatPairListStrategy)
         else:
             strategy = self.space.fromcache(ObjectListStrategy)
 
@@ -1171,6 +1238,12 @@ class EmptyListStrategy(ListStrategy):
             w_list.lstorage = strategy.erase(unilist[:])
             return
 
+        unilist = space.listview_utf8(w_iterable)
+        if unilist is not None:
+            w_list.strategy = strategy = space.fromcache(Utf8ListStrategy)
+            w_list.lstorage = strategy.erase(_with_codepoint_lengths(unilist))
+            return
+
         ListStrategy._extend_from_iterable(self, w_list, w_iterable)
 
     def reverse(self, w_list):
@@ -1525,7 +1598,19 @@ class AbstractUnwrappedStrategy(object):
     def _resize_hint(self, w_list, hint):
         resizelist_hint(self.unerase(w_list.lstorage), hint)
 
+    def _shared_strategy(self):
+        """The strategy of the lists sharing their storage with lists of
+        this strategy, or None if slices and copies are never shared."""
+        return None
+
     def copy_into(self, w_list, w_other):
+        shared = self._shared_strategy()
+        if shared is not None:
+            length = self.length(w_list)
+            if _worth_sharing(length, length):
+                w_other.strategy = shared
+                w_other.lstorage = shared.share(w_list, 0, length)
+                return
         w_other.strategy = self
         items = self.unerase(w_list.lstorage)[:]
         w_other.lstorage = self.erase(items)
@@ -1533,12 +1618,12 @@ class AbstractUnwrappedStrategy(object):
     def find_or_count(self, w_list, w_obj, start, stop, count):
         if self.is_correct_type(w_obj):
             return self._safe_find_or_count(
-                w_list, self.unwrap(w_obj), start, stop, count)
+                self.unerase(w_list.lstorage), self.unwrap(w_obj),
+                start, stop, count)
         return ListStrategy.find_or_count(
             self, w_list, w_obj, start, stop, count)
 
-    def _safe_find_or_count(self, w_list, obj, start, stop, count):
-        l = self.unerase(w_list.lstorage)
+    def _safe_find_or_count(self, l, obj, start, stop, count):
         result = 0
         for i in range(start, min(stop, len(l))):
             val = l[i]
@@ -1596,6 +1681,12 @@ class AbstractUnwrappedStrategy(object):
 
     def getslice(self, w_list, start, stop, step, length):
         if step == 1 and 0 <= start <= stop:
+            shared = self._shared_strategy()
+            if (shared is not None and
+                    _worth_sharing(length, self.length(w_list))):
+                storage = shared.share(w_list, start, stop)
+                return W_ListObject.from_storage_and_strategy(
+                        self.space, storage, shared)
             l = self.unerase(w_list.lstorage)
             assert start >= 0
             assert stop >= 0
@@ -1890,6 +1981,9 @@ class IntegerListStrategy(ListStrategy):
     def getitems_int(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def _shared_strategy(self):
+        return self.space.fromcache(SharedIntegerListStrategy)
+
 
     _base_extend_from_list = _extend_from_list
 
@@ -1994,6 +2088,9 @@ class FloatListStrategy(ListStrategy):
     def getitems_float(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def _shared_strategy(self):
+        return self.space.fromcache(SharedFloatListStrategy)
+
 
     _base_extend_from_list = _extend_from_list
 
@@ -2020,8 +2117,7 @@ class FloatListStrategy(ListStrategy):
         return self._base_setslice(w_list, start, step, slicelength, w_other)
 
 
-    def _safe_find_or_count(self, w_list, obj, start, stop, count):
-        l = self.unerase(w_list.lstorage)
+    def _safe_find_or_count(self, l, obj, start, stop, count):
         stop = min(stop, len(l))
         result = 0
         if not math.isnan(obj):
@@ -2191,8 +2287,7 @@ class IntOrFloatListStrategy(ListStrategy):
                 w_other = self._temporary_longlong_list(longlong_list)
         return self._base_setslice(w_list, start, step, slicelength, w_other)
 
-    def _safe_find_or_count(self, w_list, obj, start, stop, count):
-        l = self.unerase(w_list.lstorage)
+    def _safe_find_or_count(self, l, obj, start, stop, count):
         # careful: we must consider that 0.0 == -0.0 == 0, but also
         # NaN == NaN if they have the same bit pattern.
         fobj = longlong2float.maybe_decode_longlong_as_float(obj)
@@ -2270,6 +2365,9 @@ class BytesListStrategy(ListStrategy):
     def getitems_bytes(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def _shared_strategy(self):
+        return self.space.fromcache(SharedBytesListStrategy)
+
 
 class AsciiListStrategy(ListStrategy):
     import_from_mixin(AbstractUnwrappedStrategy)
@@ -2306,6 +2404,693 @@ class AsciiListStrategy(ListStrategy):
     def getitems_ascii(self, w_list):
         return self.unerase(w_list.lstorage)
 
+    def getitems_utf8(self, w_list):
+        return self.unerase(w_list.lstorage)
+
+    def switch_to_utf8_strategy(self, w_list):
+        strategy = self.space.fromcache(Utf8ListStrategy)
+        w_list.strategy = strategy
+        w_list.lstorage = strategy.erase(
+            _ascii_with_lengths(self.unerase(w_list.lstorage)))
+
+    def switch_to_next_strategy(self, w_list, w_sample_item):
+        if type(w_sample_item) is W_UnicodeObject:
+            self.switch_to_utf8_strategy(w_list)
+        else:
+            w_list.switch_to_object_strategy()
+
+
+    _base_extend_from_list = _extend_from_list
+
+    def _extend_from_list(self, w_list, w_other):
+        if w_other.strategy is self.space.fromcache(Utf8ListStrategy):
+            self.switch_to_utf8_strategy(w_list)
+            w_list.extend(w_other)
+            return
+        return self._base_extend_from_list(w_list, w_other)
+
+
+    _base_setslice = setslice
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        if w_other.strategy is self.space.fromcache(Utf8ListStrategy):
+            self.switch_to_utf8_strategy(w_list)
+            w_list.setslice(start, step, slicelength, w_other)
+            return
+        return self._base_setslice(w_list, start, step, slicelength, w_other)
+
+
+def _with_codepoint_lengths(list_u):
+    return [(utf8, rutf8.codepoints_in_utf8(utf8)) for utf8 in list_u]
+
+def _ascii_with_lengths(list_u):
+    return [(ascii, len(ascii)) for ascii in list_u]
+
+
+class Utf8ListStrategy(ListStrategy):
+    """Lists of unicode strings, at least one of which was not ascii when
+    the strategy was picked.  Every item is stored as a tuple of its utf8
+    bytes and its number of codepoints, so that wrapping it again does not
+    have to count the codepoints."""
+    import_from_mixin(AbstractUnwrappedStrategy)
+
+    _none_value = ("", 0)
+
+    def wrap(self, item):
+        utf8, length = item
+        assert utf8 is not None
+        return self.space.newutf8(utf8, length)
+
+    def unwrap(self, w_string):
+        return self.space.utf8_len_w(w_string)
+
+    def _quick_cmp(self, a, b):
+        return a[0] is b[0]
+
+    erase, unerase = rerased.new_erasing_pair("utf8")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is W_UnicodeObject
+
+    def list_is_correct_type(self, w_list):
+        return w_list.strategy is self.space.fromcache(Utf8ListStrategy)
+
+    def sort(self, w_list, reverse):
+        l = self.unerase(w_list.lstorage)
+        sorter = Utf8Sort(l, len(l))
+        sorter.sort()
+        if reverse:
+            l.reverse()
+
+    def getitems_utf8(self, w_list):
+        return [utf8 for utf8, _ in self.unerase(w_list.lstorage)]
+
+
+    _base_extend_from_list = _extend_from_list
+
+    def _extend_from_list(self, w_list, w_other):
+        if w_other.strategy is self.space.fromcache(AsciiListStrategy):
+            l = self.unerase(w_list.lstorage)
+            l += _ascii_with_lengths(w_other.getitems_ascii())
+            return
+        return self._base_extend_from_list(w_list, w_other)
+
+
+    _base_setslice = setslice
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        if w_other.strategy is self.space.fromcache(AsciiListStrategy):
+            storage = self.erase(_ascii_with_lengths(w_other.getitems_ascii()))
+            w_other = W_ListObject.from_storage_and_strategy(
+                    self.space, storage, self)
+        return self._base_setslice(w_list, start, step, slicelength, w_other)
+
+
+class AbstractSharedStrategy(object):
+    """Copy-on-write lists.  Slices and copies covering most of a big list
+    of some unwrapped strategies don't copy the items: both the original
+    list and the new one switch to the corresponding shared strategy.  The
+    storage is a tuple (items, start, stop, tail): the list contains
+    items[start:stop] followed by the items of 'tail'.  'items' is the
+    storage of the original list and is never mutated; 'tail' belongs to a
+    single list.  Appending, popping and extending only touch the tail or
+    move 'stop', so they stay cheap for both lists; any other mutation
+    first gives the list its own copy of its items and switches it back to
+    base_strategy()."""
+
+    def base_strategy(self):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def unerase(storage):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def erase(obj):
+        raise NotImplementedError("abstract base class")
+
+    def share(self, w_list, start, stop):
+        """Makes w_list, which uses base_strategy(), share its items and
+        returns the storage for w_list[start:stop]."""
+        base = self.base_strategy()
+        assert w_list.strategy is base
+        items = base.unerase(w_list.lstorage)
+        w_list.strategy = self
+        w_list.lstorage = self.erase((items, 0, len(items), []))
+        return self.erase((items, start, stop, []))
+
+    def unshare(self, w_list):
+        w_list.strategy = self.base_strategy()
+        w_list.lstorage = self.base_strategy().erase(
+            self._getitems_copy_unwrapped(w_list))
+
+    def _temporarily_unshared(self, w_list):
+        base = self.base_strategy()
+        storage = base.erase(self._getitems_unwrapped(w_list))
+        return W_ListObject.from_storage_and_strategy(self.space, storage, base)
+
+    def wrap(self, item):
+        return self.base_strategy().wrap(item)
+
+    def init_from_list_w(self, w_list, list_w):
+        raise NotImplementedError
+
+    def getstorage_copy(self, w_list):
+        # only the tail needs to be copied
+        items, start, stop, tail = self.unerase(w_list.lstorage)
+        return self.erase((items, start, stop, tail[:]))
+
+    def clone(self, w_list):
+        return W_ListObject.from_storage_and_strategy(
+                self.space, self.getstorage_copy(w_list), self)
+
+    def copy_into(self, w_list, w_other):
+        w_other.strategy = self
+        w_other.lstorage = self.getstorage_copy(w_list)
+
+    def _resize_hint(self, w_list, hint):
+        _, start, stop, tail = self.unerase(w_list.lstorage)
+        hint -= stop - start
+        if hint >= len(tail):
+            resizelist_hint(tail, hint)
+
+    def find_or_count(self, w_list, w_obj, start, stop, count):
+        base = self.base_strategy()
+        if base.is_correct_type(w_obj):
+            items, base_start, base_stop, tail = self.unerase(w_list.lstorage)
+            if tail:
+                return base._safe_find_or_count(
+                    self._getitems_unwrapped(w_list), base.unwrap(w_obj),
+                    start, stop, count)
+            stop = min(stop, base_stop - base_start)
+            start = min(start, stop)
+            result = base._safe_find_or_count(
+                items, base.unwrap(w_obj), base_start + start,
+                base_start + stop, count)
+            if count:
+                return result
+            return result - base_start
+        return ListStrategy.find_or_count(
+            self, w_list, w_obj, start, stop, count)
+
+    def length(self, w_list):
+        _, start, stop, tail = self.unerase(w_list.lstorage)
+        return stop - start + len(tail)
+
+    def _getitem_unwrapped(self, w_list, index):
+        # 0 <= index, may raise IndexError
+        items, start, stop, tail = self.unerase(w_list.lstorage)
+        if index < stop - start:
+            return items[start + index]
+        try:
+            return tail[index - (stop - start)]
+        except IndexError:  # make RPython raise the exception
+            raise
+
+    def getitem(self, w_list, index):
+        if index < 0:
+            index += self.length(w_list)
+            if index < 0:
+                raise IndexError
+        return self.wrap(self._getitem_unwrapped(w_list, index))
+
+    def _getitems_unwrapped(self, w_list):
+        """The items of the list, as a list that must not be mutated."""
+        items, start, stop, tail = self.unerase(w_list.lstorage)
+        if not tail and start == 0 and stop == len(items):
+            return items
+        return self._getitems_copy_unwrapped(w_list)
+
+    def _getitems_copy_unwrapped(self, w_list):
+        items, start, stop, tail = self.unerase(w_list.lstorage)
+        assert start >= 0
+        assert stop >= 0
+        return items[start:stop] + tail
+
+    def getitems_copy(self, w_list):
+        items = self._getitems_unwrapped(w_list)
+        res = [None] * len(items)
+        for i in range(len(items)):
+            res[i] = self.wrap(items[i])
+        return res
+
+    getitems_unroll = jit.unroll_safe(
+            func_with_new_name(getitems_copy, "getitems_unroll"))
+
+    getitems_copy = jit.look_inside_iff(lambda self, w_list:
+            w_list._unrolling_heuristic())(getitems_copy)
+
+    @jit.look_inside_iff(lambda self, w_list:
+            w_list._unrolling_heuristic())
+    def getitems_fixedsize(self, w_list):
+        return self.getitems_unroll(w_list)
+
+    def getslice(self, w_list, start, stop, step, length):
+        items, base_start, base_stop, _ = self.unerase(w_list.lstorage)
+        if (step == 1 and base_start + stop <= base_stop and
+                _worth_sharing(length, len(items))):
+            storage = self.erase((items, base_start + start,
+                                  base_start + stop, []))
+            return W_ListObject.from_storage_and_strategy(
+                    self.space, storage, self)
+        base = self.base_strategy()
+        sublist = newlist_hint(length)
+        for i in range(length):
+            sublist.append(self._getitem_unwrapped(w_list, start))
+            start += step
+        return W_ListObject.from_storage_and_strategy(
+                self.space, base.erase(sublist), base)
+
+    def append(self, w_list, w_item):
+        base = self.base_strategy()
+        if base.is_correct_type(w_item):
+            _, _, _, tail = self.unerase(w_list.lstorage)
+            tail.append(base.unwrap(w_item))
+            return
+        self.unshare(w_list)
+        w_list.append(w_item)
+
+    def _extend_from_list(self, w_list, w_other):
+        base = self.base_strategy()
+        if base.list_is_correct_type(w_other):
+            _, _, _, tail = self.unerase(w_list.lstorage)
+            tail += base.unerase(w_other.lstorage)
+        elif not w_other.strategy.is_empty_strategy():
+            self.unshare(w_list)
+            w_list.extend(w_other)
+
+    def pop_end(self, w_list):
+        items, start, stop, tail = self.unerase(w_list.lstorage)
+        if tail:
+            return self.wrap(tail.pop())
+        stop -= 1
+        w_item = self.wrap(items[stop])
+        w_list.lstorage = self.erase((items, start, stop, tail))
+        if not _worth_sharing(stop - start, len(items)):
+            # stop keeping alive items that the list no longer contains
+            self.unshare(w_list)
+        return w_item
+
+    def pop(self, w_list, index):
+        if index == self.length(w_list) - 1:
+            return self.pop_end(w_list)
+        self.unshare(w_list)
+        return w_list.pop(index)
+
+    def setitem(self, w_list, index, w_item):
+        base = self.base_strategy()
+        _, start, stop, tail = self.unerase(w_list.lstorage)
+        if index < 0:
+            index += stop - start + len(tail)
+        if index >= stop - start and base.is_correct_type(w_item):
+            try:
+                tail[index - (stop - start)] = base.unwrap(w_item)
+            except IndexError:
+                raise
+            return
+        self.unshare(w_list)
+        w_list.setitem(index, w_item)
+
+    def insert(self, w_list, index, w_item):
+        self.unshare(w_list)
+        w_list.insert(index, w_item)
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        self.unshare(w_list)
+        w_list.setslice(start, step, slicelength, w_other)
+
+    def deleteslice(self, w_list, start, step, slicelength):
+        self.unshare(w_list)
+        w_list.deleteslice(start, step, slicelength)
+
+    def inplace_mul(self, w_list, times):
+        self.unshare(w_list)
+        w_list.inplace_mul(times)
+
+    def reverse(self, w_list):
+        self.unshare(w_list)
+        w_list.reverse()
+
+    def sort(self, w_list, reverse):
+        self.unshare(w_list)
+        w_list.sort(reverse)
+
+    def physical_size(self, w_list):
+        return self.length(w_list)
+
+
+class SharedIntegerListStrategy(ListStrategy):
+    import_from_mixin(AbstractSharedStrategy)
+
+    erase, unerase = rerased.new_erasing_pair("shared_integer")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def base_strategy(self):
+        return self.space.fromcache(IntegerListStrategy)
+
+    def getitems_int(self, w_list):
+        return self._getitems_unwrapped(w_list)
+
+
+class SharedFloatListStrategy(ListStrategy):
+    import_from_mixin(AbstractSharedStrategy)
+
+    erase, unerase = rerased.new_erasing_pair("shared_float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def base_strategy(self):
+        return self.space.fromcache(FloatListStrategy)
+
+    def getitems_float(self, w_list):
+        return self._getitems_unwrapped(w_list)
+
+
+class SharedBytesListStrategy(ListStrategy):
+    import_from_mixin(AbstractSharedStrategy)
+
+    erase, unerase = rerased.new_erasing_pair("shared_bytes")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def base_strategy(self):
+        return self.space.fromcache(BytesListStrategy)
+
+    def getitems_bytes(self, w_list):
+        return self._getitems_unwrapped(w_list)
+
+
+class AbstractTuplePairStrategy(object):
+    """Lists of 2-tuples whose items all have the same primitive types.  The
+    storage is one flat RPython list holding the two fields of the item at
+    index i at the positions 2*i and 2*i+1; tuples are only boxed again when
+    they are read out of the list, so reading an item gives a new tuple that
+    is equal, but not identical, to the one that was stored.  Everything
+    that does not keep that shape switches to ObjectListStrategy."""
+
+    @staticmethod
+    def unerase(storage):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def erase(obj):
+        raise NotImplementedError("abstract base class")
+
+    def wrap(self, a, b):
+        raise NotImplementedError("abstract base class")
+
+    def unwrap(self, w_tuple):
+        raise NotImplementedError("abstract base class")
+
+    def is_correct_type(self, w_obj):
+        raise NotImplementedError("abstract base class")
+
+    def _item_eq(self, a, b):
+        raise NotImplementedError("abstract base class")
+
+    def list_is_correct_type(self, w_list):
+        return w_list.strategy is self
+
+    @jit.look_inside_iff(lambda space, w_list, list_w:
+            jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
+    def init_from_list_w(self, w_list, list_w):
+        l = [self._none_value] * (2 * len(list_w))
+        for i in range(len(list_w)):
+            a, b = self.unwrap(list_w[i])
+            l[2 * i] = a
+            l[2 * i + 1] = b
+        w_list.lstorage = self.erase(l)
+
+    def get_empty_storage(self, sizehint):
+        if sizehint == -1:
+            return self.erase([])
+        return self.erase(newlist_hint(2 * sizehint))
+
+    def clone(self, w_list):
+        storage = self.getstorage_copy(w_list)
+        return W_ListObject.from_storage_and_strategy(
+                self.space, storage, self)
+
+    def _resize_hint(self, w_list, hint):
+        resizelist_hint(self.unerase(w_list.lstorage), 2 * hint)
+
+    def copy_into(self, w_list, w_other):
+        w_other.strategy = self
+        w_other.lstorage = self.getstorage_copy(w_list)
+
+    def getstorage_copy(self, w_list):
+        items = self.unerase(w_list.lstorage)[:]
+        return self.erase(items)
+
+    def find_or_count(self, w_list, w_obj, start, stop, count):
+        if not self.is_correct_type(w_obj):
+            return ListStrategy.find_or_count(
+                self, w_list, w_obj, start, stop, count)
+        a, b = self.unwrap(w_obj)
+        l = self.unerase(w_list.lstorage)
+        result = 0
+        for i in range(start, min(stop, len(l) >> 1)):
+            if self._item_eq(l[2 * i], a) and self._item_eq(l[2 * i + 1], b):
+                if count:
+                    result += 1
+                else:
+                    return i
+        if count:
+            return result
+        raise ValueError
+
+    def length(self, w_list):
+        return len(self.unerase(w_list.lstorage)) >> 1
+
+    def _check_index(self, w_list, index):
+        length = self.length(w_list)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError
+        return index
+
+    def getitem(self, w_list, index):
+        index = self._check_index(w_list, index)
+        l = self.unerase(w_list.lstorage)
+        return self.wrap(l[2 * index], l[2 * index + 1])
+
+    def getitems_copy(self, w_list):
+        l = self.unerase(w_list.lstorage)
+        length = len(l) >> 1
+        res = [None] * length
+        for i in range(length):
+            res[i] = self.wrap(l[2 * i], l[2 * i + 1])
+        return res
+
+    getitems_unroll = jit.unroll_safe(
+            func_with_new_name(getitems_copy, "getitems_unroll"))
+
+    getitems_copy = jit.look_inside_iff(lambda self, w_list:
+            w_list._unrolling_heuristic())(getitems_copy)
+
+    @jit.look_inside_iff(lambda self, w_list:
+            w_list._unrolling_heuristic())
+    def getitems_fixedsize(self, w_list):
+        return self.getitems_unroll(w_list)
+
+    def getslice(self, w_list, start, stop, step, length):
+        l = self.unerase(w_list.lstorage)
+        if step == 1 and 0 <= start <= stop:
+            assert start >= 0
+            assert stop >= 0
+            sublist = l[2 * start:2 * stop]
+        else:
+            sublist = [self._none_value] * (2 * length)
+            for i in range(length):
+                sublist[2 * i] = l[2 * start]
+                sublist[2 * i + 1] = l[2 * start + 1]
+                start += step
+        storage = self.erase(sublist)
+        return W_ListObject.from_storage_and_strategy(
+                self.space, storage, self)
+
+    def append(self, w_list, w_item):
+        if self.is_correct_type(w_item):
+            a, b = self.unwrap(w_item)
+            l = self.unerase(w_list.lstorage)
+            l.append(a)
+            l.append(b)
+            return
+        w_list.switch_to_object_strategy()
+        w_list.append(w_item)
+
+    def insert(self, w_list, index, w_item):
+        if self.is_correct_type(w_item):
+            a, b = self.unwrap(w_item)
+            l = self.unerase(w_list.lstorage)
+            l.insert(2 * index, b)
+            l.insert(2 * index, a)
+            return
+        w_list.switch_to_object_strategy()
+        w_list.insert(index, w_item)
+
+    def _extend_from_list(self, w_list, w_other):
+        if self.list_is_correct_type(w_other):
+            l = self.unerase(w_list.lstorage)
+            l += self.unerase(w_other.lstorage)
+            return
+        elif w_other.strategy.is_empty_strategy():
+            return
+        w_other = w_other._temporarily_as_objects()
+        w_list.switch_to_object_strategy()
+        w_list.extend(w_other)
+
+    def setitem(self, w_list, index, w_item):
+        if self.is_correct_type(w_item):
+            index = self._check_index(w_list, index)
+            a, b = self.unwrap(w_item)
+            l = self.unerase(w_list.lstorage)
+            l[2 * index] = a
+            l[2 * index + 1] = b
+            return
+        w_list.switch_to_object_strategy()
+        w_list.setitem(index, w_item)
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        w_list.switch_to_object_strategy()
+        w_list.setslice(start, step, slicelength, w_other)
+
+    def deleteslice(self, w_list, start, step, slicelength):
+        if slicelength == 0:
+            return
+        if step < 0:
+            start = start + step * (slicelength - 1)
+            step = -step
+        if step == 1:
+            assert start >= 0
+            l = self.unerase(w_list.lstorage)
+            del l[2 * start:2 * (start + slicelength)]
+            return
+        w_list.switch_to_object_strategy()
+        w_list.deleteslice(start, step, slicelength)
+
+    def pop_end(self, w_list):
+        l = self.unerase(w_list.lstorage)
+        b = l.pop()
+        a = l.pop()
+        return self.wrap(a, b)
+
+    def pop(self, w_list, index):
+        if index < 0:
+            raise IndexError
+        index = self._check_index(w_list, index)
+        l = self.unerase(w_list.lstorage)
+        assert index >= 0
+        w_item = self.wrap(l[2 * index], l[2 * index + 1])
+        del l[2 * index:2 * index + 2]
+        return w_item
+
+    def mul(self, w_list, times):
+        l = self.unerase(w_list.lstorage)
+        return W_ListObject.from_storage_and_strategy(
+            self.space, self.erase(l * times), self)
+
+    def inplace_mul(self, w_list, times):
+        l = self.unerase(w_list.lstorage)
+        l *= times
+
+    def _reverse_pairs(self, l):
+        lo = 0
+        hi = len(l) - 2
+        while lo < hi:
+            a = l[lo]
+            b = l[lo + 1]
+            l[lo] = l[hi]
+            l[lo + 1] = l[hi + 1]
+            l[hi] = a
+            l[hi + 1] = b
+            lo += 2
+            hi -= 2
+
+    def reverse(self, w_list):
+        self._reverse_pairs(self.unerase(w_list.lstorage))
+
+    def sort(self, w_list, reverse):
+        l = self.unerase(w_list.lstorage)
+        sorter = self._sort_class(l)
+        # Reverse sort stability achieved by initially reversing the list,
+        # applying a stable forward sort, then reversing the final result.
+        if reverse:
+            self._reverse_pairs(l)
+        sorter.sort()
+        if reverse:
+            self._reverse_pairs(l)
+
+    def physical_size(self, w_list):
+        from rpython.rlib.objectmodel import list_get_physical_size
+        l = self.unerase(w_list.lstorage)
+        return list_get_physical_size(l) >> 1
+
+    def _unrolling_heuristic(self, w_list):
+        storage = self.unerase(w_list.lstorage)
+        return jit.loop_unrolling_heuristic(storage, len(storage) >> 1,
+                                            UNROLL_CUTOFF)
+
+
+class IntPairListStrategy(ListStrategy):
+    import_from_mixin(AbstractTuplePairStrategy)
+
+    _none_value = 0
+
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, a, b):
+        return Cls_ii(self.space, a, b)
+
+    def unwrap(self, w_tuple):
+        assert isinstance(w_tuple, Cls_ii)
+        return w_tuple.value0, w_tuple.value1
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is Cls_ii
+
+    def _item_eq(self, a, b):
+        return a == b
+
+    def _sort_class(self, l):
+        return IntPairSort(l)
+
+
+class FloatPairListStrategy(ListStrategy):
+    import_from_mixin(AbstractTuplePairStrategy)
+
+    _none_value = 0.0
+
+    erase, unerase = rerased.new_erasing_pair("floatpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, a, b):
+        return Cls_ff(self.space, a, b)
+
+    def unwrap(self, w_tuple):
+        assert isinstance(w_tuple, Cls_ff)
+        return w_tuple.value0, w_tuple.value1
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is Cls_ff
+
+    def _item_eq(self, a, b):
+        # like the specialised tuples, NaNs with the same bits are equal
+        return (a == b or
+                longlong2float.float2longlong(a) ==
+                longlong2float.float2longlong(b))
+
+    def _sort_class(self, l):
+        return FloatPairSort(l)
+
+
 # _______________________________________________________
 
 init_signature = Signature(['sequence'], None, None)
@@ -2324,6 +3109,30 @@ FloatBaseTimSort = make_timsort_class()
 IntOrFloatBaseTimSort = make_timsort_class()
 
 
+@specialize.argtype(0)
+def _pair_getitem(l, i):
+    return (l[2 * i], l[2 * i + 1])
+
+@specialize.argtype(0)
+def _pair_setitem(l, i, pair):
+    l[2 * i] = pair[0]
+    l[2 * i + 1] = pair[1]
+
+@specialize.argtype(0)
+def _pair_length(l):
+    return len(l) >> 1
+
+@specialize.argtype(0)
+def _pair_getitem_slice(l, start, stop):
+    return l[2 * start:2 * stop]
+
+IntPairBaseTimSort = make_timsort_class(
+    _pair_getitem, _pair_setitem, _pair_length, _pair_getitem_slice)
+FloatPairBaseTimSort = make_timsort_class(
+    _pair_getitem, _pair_setitem, _pair_length, _pair_getitem_slice)
+Utf8BaseTimSort = make_timsort_class()
+
+
 class KeyContainer(W_Root):
     def __init__(self, w_key, w_item):
         self.w_key = w_key
@@ -2357,6 +3166,29 @@ class IntOrFloatSort(IntOrFloatBaseTimSort):
         return fa < fb
 
 
+class IntPairSort(IntPairBaseTimSort):
+    def lt(self, a, b):
+        if a[0] != b[0]:
+            return a[0] < b[0]
+        return a[1] < b[1]
+
+
+class Utf8Sort(Utf8BaseTimSort):
+    def lt(self, a, b):
+        # utf8 byte order is the same as codepoint order
+        return a[0] < b[0]
+
+
+class FloatPairSort(FloatPairBaseTimSort):
+    def lt(self, a, b):
+        # like comparing the tuples: the first items are equal if they
+        # are the same float (including NaNs with the same bits)
+        if (a[0] != b[0] and longlong2float.float2longlong(a[0]) !=
+                             longlong2float.float2longlong(b[0])):
+            return a[0] < b[0]
+        return a[1] < b[1]
+
+
 class CustomCompareSort(SimpleSort):
     def lt(self, a, b):
         space = self.space
@@ -1197,9 +1197,17 @@ class MapDictIteratorItems(BaseItemIterator):
 # ____________________________________________________________
 # Magic caching
 
+# Every LOAD_ATTR and LOOKUP_METHOD name of a code object has a small
+# polymorphic cache: a chain of at most POLYMORPHIC_CACHE_SIZE entries, the
+# most recently used one first.  Entries are kept per map and per kind
+# (attribute or method), so that call sites seeing a few different classes,
+# or doing both 'x.a' and 'x.a()', don't keep refilling a single entry.
+POLYMORPHIC_CACHE_SIZE = 4
+
 class CacheEntry(object):
     version_tag = None
     w_method = None # for callmethod
+    next = None     # the next entry of the polymorphic cache
     success_counter = 0
     failure_counter = 0
 
@@ -1226,18 +1234,83 @@ INVALID_CACHE_ENTRY = CacheEntry()
 INVALID_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
                                  # different from any real map ^^^
 
+class InlineCacheCounters(object):
+    """Counters of the polymorphic caches of LOAD_ATTR and LOOKUP_METHOD,
+    see __pypy__.inline_cache_counters().  Only the slow paths update
+    them."""
+
+    def __init__(self, space):
+        self.reset()
+
+    def reset(self):
+        self.polymorphic_hits = 0   # hits on an entry that is not the first
+        self.misses = 0             # the cache had to be filled
+        self.evictions = 0          # entries dropped from a full cache
+
 def init_mapdict_cache(pycode):
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
 
+def _move_to_front(pycode, nameindex, prev, entry):
+    # unlink 'entry', which follows 'prev' in the chain, and make it the
+    # first entry, the one that the fast paths check
+    prev.next = entry.next
+    entry.next = pycode._mapdict_caches[nameindex]
+    pycode._mapdict_caches[nameindex] = entry
+
+@jit.dont_look_inside
+def _find_cache_entry(pycode, nameindex, map, is_method):
+    # look for a valid entry of the given kind for 'map' in the chain,
+    # after the first entry that the caller checked already.  An entry
+    # that is found moves to the front of the chain
+    prev = pycode._mapdict_caches[nameindex]
+    entry = prev.next
+    while entry is not None:
+        if (entry.w_method is not None) == is_method:
+            if entry.is_valid_for_map(map):
+                if pycode.space._side_effects_ok():
+                    _move_to_front(pycode, nameindex, prev, entry)
+                return entry
+        prev = entry
+        entry = entry.next
+    return None
+
+def _evict_cache_entries(space, entry):
+    # cut the chain after POLYMORPHIC_CACHE_SIZE entries
+    for i in range(POLYMORPHIC_CACHE_SIZE - 1):
+        if entry.next is None:
+            return
+        entry = entry.next
+    if entry.next is not None:
+        entry.next = None
+        space.fromcache(InlineCacheCounters).evictions += 1
+
 @jit.dont_look_inside
 def _fill_cache(pycode, nameindex, map, version_tag, attr, w_method=None):
-    if not pycode.space._side_effects_ok():
+    space = pycode.space
+    if not space._side_effects_ok():
         return
-    entry = pycode._mapdict_caches[nameindex]
-    if entry is INVALID_CACHE_ENTRY:
+    space.fromcache(InlineCacheCounters).misses += 1
+    first = pycode._mapdict_caches[nameindex]
+    # reuse the entry for the same map and kind, if there is one, and
+    # move it to the front
+    is_method = w_method is not None
+    prev = None
+    entry = first
+    while entry is not None:
+        if ((entry.w_method is not None) == is_method and
+                entry.map_wref() is map):
+            break
+        prev = entry
+        entry = entry.next
+    if entry is None:
         entry = CacheEntry()
+        if first is not INVALID_CACHE_ENTRY:
+            entry.next = first
         pycode._mapdict_caches[nameindex] = entry
+    elif prev is not None:
+        _move_to_front(pycode, nameindex, prev, entry)
+    _evict_cache_entries(space, entry)
     entry.map_wref = weakref.ref(map)
     if attr:
         entry.attr_wref = weakref.ref(attr)
@@ -1265,6 +1338,13 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
     w_name = pycode.co_names_w[nameindex]
     if map is not None:
+        # the first entry of the cache was checked by LOAD_ATTR_caching
+        entry = _find_cache_entry(pycode, nameindex, map, False)
+        if entry is not None:
+            attr = entry.attr_wref()
+            if attr is not None:
+                space.fromcache(InlineCacheCounters).polymorphic_hits += 1
+                return attr._direct_read(w_obj)
         w_type = map.terminator.w_cls
         w_descr = w_type.getattribute_if_not_from_object()
         if w_descr is not None:
@@ -1319,6 +1399,14 @@ def LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
             f.pushvalue(w_method)
             f.pushvalue(w_obj)
             return True
+    if entry.next is not None:
+        entry = _find_cache_entry(pycode, nameindex,
+                                  w_obj._get_mapdict_map(), True)
+        if entry is not None:
+            pycode.space.fromcache(InlineCacheCounters).polymorphic_hits += 1
+            f.pushvalue(entry.w_method)
+            f.pushvalue(w_obj)
+            return True
     return False
 
 def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
@@ -1338,7 +1426,3 @@ def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
     if map is None or isinstance(map.terminator, DevolvedDictTerminator):
         return
     _fill_cache(pycode, nameindex, map, version_tag, None, w_method)
-
-# XXX fix me: if a function contains a loop with both LOAD_ATTR and
-# XXX LOOKUP_METHOD on the same attribute name, it keeps trashing and
-# XXX rebuilding the cache
@@ -267,9 +267,7 @@ def unmarshal_bytes(space, u, tc):
 
 @unmarshaller(TYPE_INTERNED)
 def unmarshal_interned(space, u, tc):
-    w_ret = space.new_interned_str(u.get_str())
-    u.stringtable_w.append(w_ret)
-    return w_ret
+    return u.add_interned(u.get_str())
 
 @unmarshaller(TYPE_STRINGREF)
 def unmarshal_stringref(space, u, tc):
@@ -346,7 +344,7 @@ def marshal_pycode(space, w_pycode, m):
     m.put_int(x.co_stacksize)
     m.put_int(x.co_flags)
     m.atom_str(TYPE_STRING, x.co_code)
-    m.put_tuple_w(TYPE_TUPLE, x.co_consts_w)
+    m.put_tuple_w(TYPE_TUPLE, x.get_consts_w())
     m.put_tuple_w(TYPE_TUPLE, x.co_names_w)
     _put_interned_str_list(space, m, x.co_varnames)
     _put_interned_str_list(space, m, x.co_freevars)
@@ -379,8 +377,7 @@ def unmarshal_pycode(space, u, tc):
     stacksize   = u.get_int()
     flags       = u.get_int()
     code        = unmarshal_str(u)
-    u.start(TYPE_TUPLE)
-    consts_w    = u.get_tuple_w()
+    consts_w    = u.get_consts_w()
     # copy in order not to merge it with anything else
     names       = unmarshal_strlist(u, TYPE_TUPLE)
     varnames    = unmarshal_strlist(u, TYPE_TUPLE)
@@ -321,7 +321,7 @@ class StdObjSpace(ObjSpace):
     def newlist_utf8(self, list_u, is_ascii):
         if is_ascii:
             return W_ListObject.newlist_ascii(self, list_u)
-        return ObjSpace.newlist_utf8(self, list_u, False)
+        return W_ListObject.newlist_utf8(self, list_u)
 
     def newlist_int(self, list_i):
         return W_ListObject.newlist_int(self, list_i)
@@ -548,6 +548,15 @@ class StdObjSpace(ObjSpace):
             return w_obj.getitems_ascii()
         return None
 
+    def listview_utf8(self, w_obj):
+        if type(w_obj) is W_ListObject:
+            return w_obj.getitems_utf8()
+        if type(w_obj) is W_SetObject or type(w_obj) is W_FrozensetObject:
+            return w_obj.listview_utf8()
+        if isinstance(w_obj, W_ListObject) and self._uses_list_iter(w_obj):
+            return w_obj.getitems_utf8()
+        return None
+
     def listview_int(self, w_obj):
         if type(w_obj) is W_ListObject:
             return w_obj.getitems_int()
@@ -1,17 +1,22 @@
+import math
+
 from pypy.interpreter import gateway
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
 from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.longobject import W_LongObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
 
 from rpython.rlib.objectmodel import r_dict
 from rpython.rlib.objectmodel import iterkeys_with_hash, contains_with_hash
 from rpython.rlib.objectmodel import setitem_with_hash, delitem_with_hash
-from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.rarithmetic import intmask, r_uint, int_between, LONG_BIT
+from rpython.rlib.rbigint import rbigint
 from rpython.rlib import rerased, jit, rutf8
 
 
@@ -90,6 +95,10 @@ class W_BaseSetObject(W_Root):
         """ If this is a unicode set return its contents as a list of uwnrapped unicodes. Otherwise return None. """
         return self.strategy.listview_ascii(self)
 
+    def listview_utf8(self):
+        """ If this is a unicode set return its contents as a list of utf8 strings. Otherwise return None. """
+        return self.strategy.listview_utf8(self)
+
     def listview_int(self):
         """ If this is an int set return its contents as a list of uwnrapped ints. Otherwise return None. """
         return self.strategy.listview_int(self)
@@ -727,6 +736,9 @@ class SetStrategy(object):
     def listview_ascii(self, w_set):
         return None
 
+    def listview_utf8(self, w_set):
+        return None
+
     def listview_int(self, w_set):
         return None
 
@@ -829,8 +841,13 @@ class EmptySetStrategy(SetStrategy):
             strategy = self.space.fromcache(IntegerSetStrategy)
         elif type(w_key) is W_BytesObject:
             strategy = self.space.fromcache(BytesSetStrategy)
-        elif type(w_key) is W_UnicodeObject and w_key.is_ascii():
-            strategy = self.space.fromcache(AsciiSetStrategy)
+        elif type(w_key) is W_UnicodeObject:
+            if w_key.is_ascii():
+                strategy = self.space.fromcache(AsciiSetStrategy)
+            else:
+                strategy = self.space.fromcache(Utf8SetStrategy)
+        elif is_plain_float(w_key):
+            strategy = self.space.fromcache(FloatSetStrategy)
         elif self.space.type(w_key).compares_by_identity():
             strategy = self.space.fromcache(IdentitySetStrategy)
         else:
@@ -912,6 +929,15 @@ class AbstractUnwrappedSetStrategy(object):
         """ Returns a wrapped version of the given unwrapped item. """
         raise NotImplementedError
 
+    def never_contains(self, w_key):
+        """ Checks whether a key that does not fit this strategy is known
+        to be unequal to all the elements of the set. """
+        return False
+
+    def switch_to_next_strategy(self, w_set, w_key):
+        """ Called before adding a key that does not fit this strategy. """
+        w_set.switch_to_object_strategy(self.space)
+
     @jit.look_inside_iff(lambda self, list_w:
             jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
     def get_storage_from_list(self, list_w):
@@ -948,12 +974,14 @@ class AbstractUnwrappedSetStrategy(object):
             d = self.unerase(w_set.sstorage)
             d[self.unwrap(w_key)] = None
         else:
-            w_set.switch_to_object_strategy(self.space)
+            self.switch_to_next_strategy(w_set, w_key)
             w_set.add(w_key)
 
     def remove(self, w_set, w_item):
         d = self.unerase(w_set.sstorage)
         if not self.is_correct_type(w_item):
+            if self.never_contains(w_item):
+                return False
             #XXX check type of w_item and immediately return False in some cases
             w_set.switch_to_object_strategy(self.space)
             return w_set.remove(w_item)
@@ -984,6 +1012,8 @@ class AbstractUnwrappedSetStrategy(object):
 
     def has_key(self, w_set, w_key):
         if not self.is_correct_type(w_key):
+            if self.never_contains(w_key):
+                return False
             #XXX check type of w_item and immediately return False in some cases
             w_set.switch_to_object_strategy(self.space)
             return w_set.has_key(w_key)
@@ -1278,6 +1308,8 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1311,12 +1343,21 @@ class AsciiSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def listview_ascii(self, w_set):
         return self.unerase(w_set.sstorage).keys()
 
+    def listview_utf8(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
     def is_correct_type(self, w_key):
         return type(w_key) is W_UnicodeObject and w_key.is_ascii()
 
+    def never_contains(self, w_key):
+        # a non-ascii unicode cannot be equal to an ascii one
+        return type(w_key) is W_UnicodeObject
+
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1332,6 +1373,90 @@ class AsciiSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return UnicodeIteratorImplementation(self.space, self, w_set)
 
+    def switch_to_utf8_strategy(self, w_set):
+        # ascii strings are valid utf8, the storage can be kept as it is
+        strategy = self.space.fromcache(Utf8SetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.erase(self.unerase(w_set.sstorage))
+
+    def switch_to_next_strategy(self, w_set, w_key):
+        if type(w_key) is W_UnicodeObject:
+            self.switch_to_utf8_strategy(w_set)
+        else:
+            w_set.switch_to_object_strategy(self.space)
+
+    def update(self, w_set, w_other):
+        if self is w_other.strategy:
+            d_set = self.unerase(w_set.sstorage)
+            d_other = self.unerase(w_other.sstorage)
+            d_set.update(d_other)
+            return
+        if w_other.length() == 0:
+            return
+        if w_other.strategy is self.space.fromcache(Utf8SetStrategy):
+            self.switch_to_utf8_strategy(w_set)
+        else:
+            w_set.switch_to_object_strategy(self.space)
+        w_set.update(w_other)
+
+
+class Utf8SetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    """Sets of unicode strings, some of which are not ascii.  The elements
+    are stored as utf8 strings; their length in codepoints is recomputed
+    when they are wrapped again."""
+    erase, unerase = rerased.new_erasing_pair("utf8")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(utf8).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def listview_utf8(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
+    def is_correct_type(self, w_key):
+        return type(w_key) is W_UnicodeObject
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(IntegerSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.utf8_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newutf8(item, rutf8.codepoints_in_utf8(item))
+
+    def iter(self, w_set):
+        return Utf8IteratorImplementation(self.space, self, w_set)
+
+    def update(self, w_set, w_other):
+        d_set = self.unerase(w_set.sstorage)
+        if self is w_other.strategy:
+            d_set.update(self.unerase(w_other.sstorage))
+            return
+        if w_other.strategy is self.space.fromcache(AsciiSetStrategy):
+            # the ascii set has the same unwrapped representation
+            d_set.update(AsciiSetStrategy.unerase(w_other.sstorage))
+            return
+        if w_other.length() == 0:
+            return
+        w_set.switch_to_object_strategy(self.space)
+        w_set.update(w_other)
+
 
 class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("integer")
@@ -1358,6 +1483,8 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         elif strategy is self.space.fromcache(AsciiSetStrategy):
             return False
+        elif strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1374,6 +1501,93 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
 
+def is_plain_float(w_obj):
+    # NaNs are not equal to themselves, they can only be found in a set by
+    # identity: keep them out of the unwrapped storage
+    return type(w_obj) is W_FloatObject and not math.isnan(w_obj.floatval)
+
+def int_key_as_float(w_key):
+    """'w_key' is a plain int or long.  Returns (True, f) if the float f
+    is equal to it, and (False, 0.0) if no float is."""
+    if type(w_key) is W_IntObject:
+        intval = w_key.intval
+        # (double-)floats have always at least 48 bits of precision
+        if LONG_BIT == 32 or int_between(-1, intval >> 48, 1):
+            return True, float(intval)
+        bigint = rbigint.fromint(intval)
+    else:
+        assert isinstance(w_key, W_LongObject)
+        bigint = w_key.num
+    try:
+        floatval = bigint.tofloat()
+    except OverflowError:
+        return False, 0.0
+    return rbigint.fromfloat(floatval).eq(bigint), floatval
+
+
+class FloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(float).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def is_correct_type(self, w_key):
+        return is_plain_float(w_key)
+
+    def never_contains(self, w_key):
+        # NaNs are never stored here
+        return type(w_key) is W_FloatObject
+
+    def has_key(self, w_set, w_key):
+        if type(w_key) is W_IntObject or type(w_key) is W_LongObject:
+            # look for the equal float instead of switching to objects
+            exact, key = int_key_as_float(w_key)
+            return exact and key in self.unerase(w_set.sstorage)
+        return AbstractUnwrappedSetStrategy.has_key(self, w_set, w_key)
+
+    def remove(self, w_set, w_item):
+        if type(w_item) is W_IntObject or type(w_item) is W_LongObject:
+            exact, key = int_key_as_float(w_item)
+            if not exact:
+                return False
+            try:
+                del self.unerase(w_set.sstorage)[key]
+                return True
+            except KeyError:
+                return False
+        return AbstractUnwrappedSetStrategy.remove(self, w_set, w_item)
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(AsciiSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.float_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newfloat(item)
+
+    def iter(self, w_set):
+        return FloatIteratorImplementation(self.space, self, w_set)
+
+
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
     erase = staticmethod(erase)
@@ -1449,6 +1663,10 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(AsciiSetStrategy):
             return False
+        if strategy is self.space.fromcache(Utf8SetStrategy):
+            return False
+        if strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         return True
 
     def unwrap(self, w_item):
@@ -1536,6 +1754,19 @@ class UnicodeIteratorImplementation(IteratorImplementation):
             return None
 
 
+class Utf8IteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return self.space.newutf8(key, rutf8.codepoints_in_utf8(key))
+        else:
+            return None
+
+
 class IntegerIteratorImplementation(IteratorImplementation):
     #XXX same implementation in dictmultiobject on dictstrategy-branch
     def __init__(self, space, strategy, w_set):
@@ -1550,6 +1781,18 @@ class IntegerIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class FloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return self.space.newfloat(key)
+        else:
+            return None
+
 class IdentityIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1634,6 +1877,13 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(unicodelist)
         return
 
+    utf8list = space.listview_utf8(w_iterable)
+    if utf8list is not None:
+        strategy = space.fromcache(Utf8SetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(utf8list)
+        return
+
     intlist = space.listview_int(w_iterable)
     if intlist is not None:
         strategy = space.fromcache(IntegerSetStrategy)
@@ -1641,6 +1891,13 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
         return
 
+    floatlist = space.listview_float(w_iterable)
+    if floatlist is not None and not _contains_nan(floatlist):
+        strategy = space.fromcache(FloatSetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(floatlist)
+        return
+
     length_hint = space.length_hint(w_iterable, 0)
 
     if jit.isconstant(length_hint) and length_hint:
@@ -1651,6 +1908,12 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
     _update_from_iterable(space, w_set, w_iterable)
 
 
+def _contains_nan(floatlist):
+    for f in floatlist:
+        if math.isnan(f):
+            return True
+    return False
+
 @jit.unroll_safe
 def _pick_correct_strategy_unroll(space, w_set, w_iterable):
 
@@ -1674,11 +1937,26 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         return
 
     # check for unicode
+    all_ascii = True
+    for w_item in iterable_w:
+        if type(w_item) is not W_UnicodeObject:
+            break
+        if all_ascii and not w_item.is_ascii():
+            all_ascii = False
+    else:
+        if all_ascii:
+            w_set.strategy = space.fromcache(AsciiSetStrategy)
+        else:
+            w_set.strategy = space.fromcache(Utf8SetStrategy)
+        w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
+        return
+
+    # check for floats
     for w_item in iterable_w:
-        if type(w_item) is not W_UnicodeObject or not w_item.is_ascii():
+        if not is_plain_float(w_item):
             break
     else:
-        w_set.strategy = space.fromcache(AsciiSetStrategy)
+        w_set.strategy = space.fromcache(FloatSetStrategy)
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
 
@@ -2,7 +2,7 @@ from pypy.interpreter.error import oefmt
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.util import negate
 from rpython.rlib import jit
-from rpython.rlib.objectmodel import specialize
+from rpython.rlib.objectmodel import newlist_hint, specialize
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.unroll import unrolling_iterable
 from rpython.tool.sourcetools import func_with_new_name
@@ -181,9 +181,18 @@ def makespecialisedtuple2(space, w_arg1, w_arg2):
 # faster to move the decision out of the loop.
 
 @specialize.arg(1)
-def _build_zipped_spec(space, Cls, lst1, lst2):
+def _build_zipped_pairs(space, strategy_cls, lst1, lst2):
+    # builds the flat storage of the pair list strategies directly,
+    # without ever boxing the tuples
+    from pypy.objspace.std.listobject import W_ListObject
     length = min(len(lst1), len(lst2))
-    return [Cls(space, lst1[i], lst2[i]) for i in range(length)]
+    flat = newlist_hint(2 * length)
+    for i in range(length):
+        flat.append(lst1[i])
+        flat.append(lst2[i])
+    strategy = space.fromcache(strategy_cls)
+    return W_ListObject.from_storage_and_strategy(
+        space, strategy.erase(flat), strategy)
 
 def _build_zipped_spec_oo(space, w_list1, w_list2):
     strat1 = w_list1.strategy
@@ -205,21 +214,21 @@ def specialized_zip_2_lists(space, w_list1, w_list2):
         raise oefmt(space.w_TypeError, "expected two exact lists")
 
     if space.config.objspace.std.withspecialisedtuple:
+        from pypy.objspace.std.listobject import (
+            IntPairListStrategy, FloatPairListStrategy)
         intlist1 = w_list1.getitems_int()
         if intlist1 is not None:
             intlist2 = w_list2.getitems_int()
             if intlist2 is not None:
-                lst_w = _build_zipped_spec(
-                        space, Cls_ii, intlist1, intlist2)
-                return space.newlist(lst_w)
+                return _build_zipped_pairs(
+                        space, IntPairListStrategy, intlist1, intlist2)
         else:
             floatlist1 = w_list1.getitems_float()
             if floatlist1 is not None:
                 floatlist2 = w_list2.getitems_float()
                 if floatlist2 is not None:
-                    lst_w = _build_zipped_spec(
-                        space, Cls_ff, floatlist1, floatlist2)
-                    return space.newlist(lst_w)
+                    return _build_zipped_pairs(
+                        space, FloatPairListStrategy, floatlist1, floatlist2)
 
         lst_w = _build_zipped_spec_oo(space, w_list1, w_list2)
         return space.newlist(lst_w)
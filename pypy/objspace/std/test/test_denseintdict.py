@@ -0,0 +1,162 @@
+import py, sys
+from pypy.objspace.std.denseintdict import DenseIntDictStrategy
+from pypy.objspace.std.dictmultiobject import IntDictStrategy, W_DictObject
+
+
+class TestDenseIntDict(object):
+    def new_dict(self, keys):
+        space = self.space
+        w_d = W_DictObject.allocate_and_init_instance(space)
+        for key in keys:
+            w_d.setitem(space.newint(key), space.newint(key * 10))
+        return w_d
+
+    def test_strategy(self):
+        space = self.space
+        w_d = self.new_dict([0, 1, 2, 5])
+        assert w_d.get_strategy() is space.fromcache(DenseIntDictStrategy)
+        assert w_d.length() == 4
+        assert space.listview_int(w_d) == [0, 1, 2, 5]
+        assert space.int_w(w_d.getitem(space.newint(5))) == 50
+        assert w_d.getitem(space.newint(3)) is None
+        assert w_d.getitem(space.newint(-1)) is None
+        assert w_d.getitem(space.newint(1000)) is None
+        storage = DenseIntDictStrategy.unerase(w_d.dstorage)
+        assert len(storage.values_w) == 6
+
+    def test_large_first_key(self):
+        w_d = self.new_dict([10000])
+        assert w_d.get_strategy() is self.space.fromcache(IntDictStrategy)
+        w_d = self.new_dict([-1])
+        assert w_d.get_strategy() is self.space.fromcache(IntDictStrategy)
+
+    def test_maxint_key(self):
+        space = self.space
+        w_d = self.new_dict([])
+        w_d.setitem(space.newint(sys.maxint), space.w_None)
+        assert w_d.get_strategy() is space.fromcache(IntDictStrategy)
+        w_d = self.new_dict([0, 1, 2])
+        w_d.setitem(space.newint(sys.maxint), space.w_None)
+        assert w_d.get_strategy() is space.fromcache(IntDictStrategy)
+        assert sorted(space.listview_int(w_d)) == [0, 1, 2, sys.maxint]
+
+    def test_devolve(self):
+        # note that untranslated, IntDictStrategy does not keep the
+        # insertion order
+        space = self.space
+        w_d = self.new_dict([0, 1, 2, 3])
+        w_d.delitem(space.newint(1))
+        w_d.setitem(space.newint(1), space.newint(10))
+        assert w_d.get_strategy() is space.fromcache(IntDictStrategy)
+        assert sorted(space.listview_int(w_d)) == [0, 1, 2, 3]
+        #
+        w_d = self.new_dict([0, 1])
+        w_d.setitem(space.newint(10000), space.w_None)
+        assert w_d.get_strategy() is space.fromcache(IntDictStrategy)
+        assert sorted(space.listview_int(w_d)) == [0, 1, 10000]
+
+    def test_delete_trims_and_devolves(self):
+        space = self.space
+        w_d = self.new_dict(range(100))
+        for i in range(99, 49, -1):
+            w_d.delitem(space.newint(i))
+        assert w_d.get_strategy() is space.fromcache(DenseIntDictStrategy)
+        storage = DenseIntDictStrategy.unerase(w_d.dstorage)
+        assert len(storage.values_w) == 50
+        for i in range(49):
+            w_d.delitem(space.newint(i))
+        assert w_d.get_strategy() is space.fromcache(IntDictStrategy)
+        assert space.listview_int(w_d) == [49]
+
+
+class AppTestDenseIntDict(object):
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() needed")
+
+    def test_basic(self):
+        from __pypy__ import strategy
+        d = {}
+        for i in range(20):
+            d[i] = str(i)
+        assert strategy(d) == "DenseIntDictStrategy"
+        assert len(d) == 20
+        assert d[3] == "3"
+        assert 25 not in d
+        assert "a" not in d
+        assert d.get(-2, 42) == 42
+        assert d.keys() == range(20)
+        assert d.values() == [str(i) for i in range(20)]
+        assert d.items() == [(i, str(i)) for i in range(20)]
+        assert list(d.iteritems()) == d.items()
+        assert strategy(d) == "DenseIntDictStrategy"
+        assert d[3L] == "3"
+        assert d[True] == "1"
+        assert d[3.0] == "3"
+
+    def test_modify(self):
+        from __pypy__ import strategy
+        d = {0: 'a', 1: 'b', 4: 'c'}
+        assert strategy(d) == "DenseIntDictStrategy"
+        d[1] = 'B'
+        assert d.setdefault(4, 'x') == 'c'
+        assert d.setdefault(5, 'd') == 'd'
+        del d[5]
+        assert d.pop(4) == 'c'
+        assert d.pop(4, None) is None
+        raises(KeyError, d.pop, 4)
+        raises(KeyError, "del d[3]")
+        raises(KeyError, "del d['x']")
+        assert d.popitem() == (1, 'B')
+        assert strategy(d) == "DenseIntDictStrategy"
+        assert d == {0: 'a'}
+        d2 = d.copy()
+        d2[1] = 'z'
+        assert strategy(d2) == "DenseIntDictStrategy"
+        assert d == {0: 'a'}
+        d.clear()
+        assert d == {}
+
+    def test_large_keys(self):
+        import sys
+        from __pypy__ import strategy
+        d = {}
+        d[sys.maxint] = 1
+        assert strategy(d) == "IntDictStrategy"
+        assert d == {sys.maxint: 1}
+        d = {0: 0, 1: 1}
+        d[sys.maxint] = 2
+        assert strategy(d) == "IntDictStrategy"
+        assert d == {0: 0, 1: 1, sys.maxint: 2}
+        d = {0: 0, 1: 1}
+        d[10**6] = 3
+        assert strategy(d) == "IntDictStrategy"
+        assert d[10**6] == 3
+
+    def test_out_of_order(self):
+        from __pypy__ import strategy
+        d = {}
+        d[0] = 0
+        d[2] = 2
+        d[1] = 1
+        assert strategy(d) == "IntDictStrategy"
+        assert d == {0: 0, 1: 1, 2: 2}
+        d = {0: 0, 1: 1, 2: 2}
+        del d[0]
+        d[0] = 0
+        assert strategy(d) == "IntDictStrategy"
+        assert d == {0: 0, 1: 1, 2: 2}
+
+    def test_other_keys(self):
+        from __pypy__ import strategy
+        d = {0: 0, 1: 1}
+        d[1.5] = 2
+        assert strategy(d) == "ObjectDictStrategy"
+        assert d == {0: 0, 1: 1, 1.5: 2}
+        d = {0: 0, 1: 1}
+        d.update({2: 2, 3: 3})
+        assert strategy(d) == "DenseIntDictStrategy"
+        assert d.keys() == [0, 1, 2, 3]
+        d2 = {10: 1}
+        d2.update(d)
+        assert d2 == {10: 1, 0: 0, 1: 1, 2: 2, 3: 3}
@@ -143,12 +143,41 @@ class TestW_DictObject(object):
         w_d.initialize_content([(wb("a"), w(1)), (wb("b"), w(2))])
         assert self.space.listview_bytes(w_d) == ["a", "b"]
 
-    @py.test.mark.skip("possible re-enable later?")
     def test_listview_unicode_dict(self):
         w = self.space.wrap
         w_d = self.space.newdict()
         w_d.initialize_content([(w(u"a"), w(1)), (w(u"b"), w(2))])
         assert self.space.listview_ascii(w_d) == ["a", "b"]
+        w_d.setitem(w(u"\xe4"), w(3))
+        assert self.space.listview_ascii(w_d) is None
+
+    def test_keys_on_unicode_dict(self):
+        from pypy.objspace.std.listobject import AsciiListStrategy
+        w = self.space.wrap
+        w_d = self.space.newdict()
+        w_d.initialize_content([(w(u"a"), w(1)), (w(u"b"), w(2))])
+        w_l = self.space.call_method(w_d, "keys")
+        assert isinstance(w_l.strategy, AsciiListStrategy)
+        assert self.space.listview_ascii(w_l) == ["a", "b"]
+        w_d.setitem(w(u"\xe4"), w(3))
+        w_l = self.space.call_method(w_d, "keys")
+        assert [self.space.utf8_w(w_key) for w_key in w_l.getitems()] == [
+            "a", "b", "\xc3\xa4"]
+
+    def test_switch_to_object_reuses_hashes(self):
+        # untranslated, setitem_with_hash() checks that the reused hashes
+        # are the ones that ObjectDictStrategy would compute
+        from pypy.objspace.std.dictmultiobject import ObjectDictStrategy
+        space = self.space
+        w = space.wrap
+        wb = space.newbytes
+        for w_key1, w_key2 in [(wb("a"), wb("b")), (w(u"a"), w(u"\xe4"))]:
+            w_d = space.newdict()
+            w_d.initialize_content([(w_key1, w(1)), (w_key2, w(2))])
+            w_d.get_strategy().switch_to_object_strategy(w_d)
+            assert isinstance(w_d.get_strategy(), ObjectDictStrategy)
+            assert space.eq_w(w_d.getitem(w_key1), w(1))
+            assert space.eq_w(w_d.getitem(w_key2), w(2))
 
     def test_listview_int_dict(self):
         w = self.space.wrap
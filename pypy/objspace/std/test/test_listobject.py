@@ -1543,6 +1543,29 @@ class AppTestListObject(object):
         l1 = list(u'\u1234\u2345')
         assert l1 == [u'\u1234', u'\u2345']
 
+    def test_non_ascii_unicode(self):
+        l = [u'a', u'\xe4\xf6', u'\u1234']
+        assert l[1] == u'\xe4\xf6' and len(l[1]) == 2
+        assert u'\u1234' in l
+        assert l.index(u'\u1234') == 2
+        assert l.count(u'x') == 0
+        l.append(u'b')
+        l.extend([u'c', u'\U00012345'])
+        assert l == [u'a', u'\xe4\xf6', u'\u1234', u'b', u'c', u'\U00012345']
+        l.sort()
+        assert l == [u'a', u'b', u'c', u'\xe4\xf6', u'\u1234', u'\U00012345']
+        l[1:3] = [u'x']
+        assert l == [u'a', u'x', u'\xe4\xf6', u'\u1234', u'\U00012345']
+        assert [len(x) for x in l] == [1, 1, 2, 1, 1]
+        l2 = [u'x', u'y']
+        l2[1:1] = l[2:]
+        assert l2 == [u'x', u'\xe4\xf6', u'\u1234', u'\U00012345', u'y']
+        assert u'-'.join(l2) == u'x-\xe4\xf6-\u1234-\U00012345-y'
+        l2.append(5)
+        assert l2[-1] == 5
+        assert u'\xe4\nb\r\n'.splitlines() == [u'\xe4', u'b']
+        assert u'\xe4\nb\r\n'.splitlines(True) == [u'\xe4\n', u'b\r\n']
+
     def test_list_from_set(self):
         l = ['a']
         l.__init__(set('b'))
@@ -1913,6 +1936,137 @@ class AppTestRangeListForcing:
         assert r == [1, 2, 3, 4, 5, 6, 7]
 
 
+class AppTestTuplePairList:
+    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+
+    def test_int_pairs(self):
+        l = [(3, 1), (1, 2), (2, 0), (1, 1)]
+        assert len(l) == 4
+        assert l[1] == (1, 2)
+        assert l[-1] == (1, 1)
+        assert (2, 0) in l
+        assert (2.0, 0) in l
+        assert (2, 5) not in l
+        assert l.index((1, 1)) == 3
+        assert l.count((3, 1)) == 1
+        assert sorted(l) == [(1, 1), (1, 2), (2, 0), (3, 1)]
+        assert sorted(l, reverse=True) == [(3, 1), (2, 0), (1, 2), (1, 1)]
+        assert l[::-1] == [(1, 1), (2, 0), (1, 2), (3, 1)]
+        assert l[1:3] == [(1, 2), (2, 0)]
+        assert l * 2 == l + l
+        l.reverse()
+        assert l == [(1, 1), (2, 0), (1, 2), (3, 1)]
+        l[1:3] = [(5, 5)]
+        assert l == [(1, 1), (5, 5), (3, 1)]
+        l.append("x")
+        assert l == [(1, 1), (5, 5), (3, 1), "x"]
+
+    def test_float_pairs(self):
+        l = [(1.5, 2.0), (0.5, 3.0)]
+        l.sort()
+        assert l == [(0.5, 3.0), (1.5, 2.0)]
+        l.extend([(4.0, 4.0)])
+        assert l.pop() == (4.0, 4.0)
+        del l[0]
+        assert l == [(1.5, 2.0)]
+        l.insert(0, (1, 2))
+        assert l == [(1, 2), (1.5, 2.0)]
+
+    def test_boxed_on_read(self):
+        # the tuples are built again when read, see cpython_differences
+        for t in [(1, 2), (1.5, 2.5)]:
+            l = [t]
+            assert l[0] == t
+            assert l[0] is not t
+            assert t in l
+            assert l.index(t) == 0
+            l.remove(t)
+            assert l == []
+
+    def test_sort_nan(self):
+        # the first items are the same NaN, so the tuples are ordered by
+        # their second items, as with the object strategy
+        N = float('nan')
+        for reverse in [False, True]:
+            items = [(N, 3.0), (N, 1.0), (N, 2.0), (N, N)]
+            expected = sorted(items + ["x"], reverse=reverse)
+            expected.remove("x")
+            l = items[:]
+            l.sort(reverse=reverse)
+            assert repr(l) == repr(expected)
+        l = [(N, 3.0), (N, 1.0), (N, 2.0)]
+        l.sort()
+        assert repr(l) == "[(nan, 1.0), (nan, 2.0), (nan, 3.0)]"
+
+    def test_zip(self):
+        l = zip([1, 2, 3], [4, 5, 6])
+        assert l == [(1, 4), (2, 5), (3, 6)]
+        l.append((7, 8))
+        assert l[-1] == (7, 8)
+        assert zip([1.5, 2.5], [3.5]) == [(1.5, 3.5)]
+
+
+class AppTestSharedSlices:
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() needed")
+
+    def test_slice_is_copy_on_write(self):
+        from __pypy__ import strategy
+        l = range(1000)
+        l.append(1000)
+        assert strategy(l[10:100]) == "IntegerListStrategy"
+        l2 = l[10:900]
+        l3 = l[:]
+        l4 = list(l2)
+        assert strategy(l) == "SharedIntegerListStrategy"
+        assert strategy(l2) == "SharedIntegerListStrategy"
+        assert strategy(l4) == "SharedIntegerListStrategy"
+        assert l2 == range(10, 900)
+        assert 20 in l2 and 5 not in l2 and "x" not in l2
+        assert l2.index(20) == 10
+        assert l2.count(20) == 1
+        assert l2[::200] == [10, 210, 410, 610, 810]
+        assert sum(l2) == sum(range(10, 900))
+        l2[0] = "x"
+        assert strategy(l2) == "ObjectListStrategy"
+        assert l[10] == 10 and l4[0] == 10
+        del l3[:]
+        assert l3 == []
+        l.append(1001)
+        assert l.pop() == 1001
+        assert strategy(l) == "SharedIntegerListStrategy"
+        assert len(l) == 1001
+        l.sort(reverse=True)
+        assert l[0] == 1000
+        assert l4 == range(10, 900)
+        l4.extend(l4)
+        assert l4 == range(10, 900) * 2
+        l4.append(5)
+        assert l4[-1] == 5 and l4[-2] == 899 and len(l4) == 1781
+        assert l4[1780:] == [5]
+
+    def test_float_and_bytes(self):
+        from __pypy__ import strategy
+        l = [i * 0.5 for i in range(100)]
+        l2 = l[1:]
+        assert strategy(l2) == "SharedFloatListStrategy"
+        assert 0.5 in l2 and 0.0 not in l2 and 1 in l2
+        l2 += [1.5]
+        assert strategy(l2) == "SharedFloatListStrategy"
+        assert l2[-1] == l2[2] == 1.5
+        l2[0] = 2.5
+        assert strategy(l2) == "FloatListStrategy"
+        assert l2[0] == 2.5 and l[1] == 0.5
+        assert len(l) == 100
+        l = [str(i) for i in range(100)]
+        l2 = l[:]
+        assert strategy(l2) == "SharedBytesListStrategy"
+        l.reverse()
+        assert l2[0] == "0" and l[0] == "99"
+        assert "".join(l2[:3]) == "012"
+
+
 class AppTestWithoutStrategies:
     spaceconfig = {"objspace.std.withliststrategies": False}
 
@@ -4,7 +4,9 @@ from pypy.objspace.std.listobject import (
     W_ListObject, EmptyListStrategy, ObjectListStrategy, IntegerListStrategy,
     FloatListStrategy, BytesListStrategy, RangeListStrategy,
     SimpleRangeListStrategy, make_range_list, AsciiListStrategy,
-    IntOrFloatListStrategy)
+    Utf8ListStrategy, IntOrFloatListStrategy, IntPairListStrategy,
+    FloatPairListStrategy, SharedIntegerListStrategy, SharedFloatListStrategy,
+    SharedBytesListStrategy, COW_SLICE_CUTOFF)
 from pypy.objspace.std import listobject
 from pypy.objspace.std.test.test_listobject import TestW_ListObject
 
@@ -605,6 +607,58 @@ class TestW_ListStrategies(TestW_ListObject):
         l3 = W_ListObject(self.space, [self.space.newbytes("eins"), self.space.newutf8("zwei", 4)])
         assert isinstance(l3.strategy, ObjectListStrategy)
 
+    def test_utf8(self):
+        space = self.space
+        w_a = space.newutf8("a", 1)
+        w_u = space.newutf8("\xc3\xa4\xc3\xb6", 2)
+        l = W_ListObject(space, [w_a, w_u])
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.getitems_utf8() == ["a", "\xc3\xa4\xc3\xb6"]
+        # the codepoint lengths are stored next to the utf8 bytes
+        assert l.strategy.unerase(l.lstorage) == [
+            ("a", 1), ("\xc3\xa4\xc3\xb6", 2)]
+        assert space.len_w(l.getitem(1)) == 2
+        l.append(space.newbytes("b"))
+        assert isinstance(l.strategy, ObjectListStrategy)
+
+        l = W_ListObject(space, [])
+        l.append(w_u)
+        assert isinstance(l.strategy, Utf8ListStrategy)
+
+        l = W_ListObject(space, [w_a, space.newutf8("b", 1)])
+        assert isinstance(l.strategy, AsciiListStrategy)
+        l.append(w_u)
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.strategy.unerase(l.lstorage) == [
+            ("a", 1), ("b", 1), ("\xc3\xa4\xc3\xb6", 2)]
+
+        l = W_ListObject(space, [w_a])
+        l.extend(W_ListObject(space, [w_u]))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.getitems_utf8() == ["a", "\xc3\xa4\xc3\xb6"]
+
+        l = W_ListObject(space, [w_u])
+        l.extend(W_ListObject(space, [w_a]))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        l.setslice(0, 1, 1, W_ListObject(space, [w_a, w_a]))
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        assert l.getitems_utf8() == ["a", "a", "a"]
+
+    def test_utf8_sort(self):
+        space = self.space
+        items = [u"\u1234", u"b", u"\xe4", u"a", u"\U00012345"]
+        l = W_ListObject(space, [space.newutf8(u.encode("utf-8"), len(u))
+                                 for u in items])
+        assert isinstance(l.strategy, Utf8ListStrategy)
+        l.sort(False)
+        assert l.getitems_utf8() == [u.encode("utf-8") for u in sorted(items)]
+
+    def test_listview_utf8(self):
+        space = self.space
+        assert space.listview_utf8(space.wrap(1)) == None
+        w_l = W_ListObject(space, [space.newutf8("\xc3\xa4", 1)])
+        assert space.listview_utf8(w_l) == ["\xc3\xa4"]
+
     def test_listview_bytes(self):
         space = self.space
         assert space.listview_bytes(space.wrap(1)) == None
@@ -680,6 +734,29 @@ class TestW_ListStrategies(TestW_ListObject):
         assert space.listview_ascii(w_l3) == [u"a", u"b", u"c"]
         assert space.listview_ascii(w_l4) == [u"a", u"b", u"c"]
 
+    def test_unicode_uses_newlist_utf8(self):
+        space = self.space
+        w_u = space.newutf8("a \xc3\xa4\nc", 5)
+        space.newlist = None
+        try:
+            w_l = space.call_method(w_u, "split")
+            w_l2 = space.call_method(w_u, "rsplit", space.wrap(" "))
+            w_l3 = space.call_method(w_u, "splitlines")
+        finally:
+            del space.newlist
+        assert space.listview_utf8(w_l) == ["a", "\xc3\xa4", "c"]
+        assert space.listview_utf8(w_l2) == ["a", "\xc3\xa4\nc"]
+        assert space.listview_utf8(w_l3) == ["a \xc3\xa4", "c"]
+
+    def test_unicode_join_uses_listview_utf8(self):
+        space = self.space
+        w_l = W_ListObject(space, [space.newutf8("\xc3\xa4", 1),
+                                   space.newutf8("b", 1)])
+        w_l.getitems = None
+        w_res = space.call_method(space.newutf8("\xc3\xb6", 1), "join", w_l)
+        assert space.utf8_w(w_res) == "\xc3\xa4\xc3\xb6b"
+        assert space.len_w(w_res) == 3
+
     def test_pop_without_argument_is_fast(self):
         space = self.space
         w_l = W_ListObject(space, [space.wrap(1), space.wrap(2), space.wrap(3)])
@@ -1050,6 +1127,229 @@ class TestW_ListStrategies(TestW_ListObject):
         w_item = l.getitem(0)
         assert isinstance(w_item, space.StringObjectCls)
 
+    def test_shared_slice(self):
+        space = self.space
+        n = COW_SLICE_CUTOFF * 2
+        w_l = W_ListObject(space, [space.wrap(i) for i in range(n)])
+        w_l2 = w_l.getslice(10, n, 1, n - 10)
+        assert isinstance(w_l.strategy, SharedIntegerListStrategy)
+        assert isinstance(w_l2.strategy, SharedIntegerListStrategy)
+        items = w_l.getitems_int()
+        assert w_l2.strategy.unerase(w_l2.lstorage)[0] is items
+        assert w_l2.length() == n - 10
+        assert space.int_w(w_l2.getitem(0)) == 10
+        assert space.int_w(w_l2.getitem(-1)) == n - 1
+        py.test.raises(IndexError, w_l2.getitem, n - 10)
+        assert w_l2.find_or_count(space.wrap(12)) == 2
+        assert w_l2.find_or_count(space.wrap(12), 2) == 2
+        py.test.raises(ValueError, w_l2.find_or_count, space.wrap(12), 3)
+        assert w_l2.find_or_count(space.wrap(12), 0, 100, True) == 1
+        py.test.raises(ValueError, w_l2.find_or_count, space.wrap(5))
+        # slices of slices are shared too, short ones are copied
+        w_l3 = w_l2.getslice(0, COW_SLICE_CUTOFF, 1, COW_SLICE_CUTOFF)
+        assert isinstance(w_l3.strategy, SharedIntegerListStrategy)
+        w_l4 = w_l2.getslice(0, 10, 2, 5)
+        assert isinstance(w_l4.strategy, IntegerListStrategy)
+        assert space.unwrap(w_l4) == [10, 12, 14, 16, 18]
+        # mutating a list gives it its own copy
+        w_l2.setitem(0, space.wrap(-1))
+        assert isinstance(w_l2.strategy, IntegerListStrategy)
+        assert space.int_w(w_l.getitem(10)) == 10
+        assert space.int_w(w_l3.getitem(0)) == 10
+        w_l.append(space.wrap(n))
+        assert space.unwrap(w_l) == range(n + 1)
+        assert space.unwrap(w_l3) == range(10, 10 + COW_SLICE_CUTOFF)
+        w_l.insert(0, space.wrap(-1))
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        assert space.unwrap(w_l) == [-1] + range(n + 1)
+        assert space.unwrap(w_l3) == range(10, 10 + COW_SLICE_CUTOFF)
+
+    def test_shared_slice_source_append_pop(self):
+        space = self.space
+        n = COW_SLICE_CUTOFF * 4
+        w_l = W_ListObject(space, [space.wrap(i) for i in range(n)])
+        w_l2 = w_l.getslice(1, n, 1, n - 1)
+        items = w_l.getitems_int()
+        # appending to and popping from the source after slicing must not
+        # copy its items
+        for i in range(n):
+            w_l.append(space.wrap(n + i))
+        w_l.setitem(-1, space.wrap(-5))
+        assert space.int_w(w_l.getitem(2 * n - 1)) == -5
+        for i in range(n + 10):
+            w_l.pop_end()
+        w_l.extend(w_l2)
+        assert isinstance(w_l.strategy, SharedIntegerListStrategy)
+        assert w_l.strategy.unerase(w_l.lstorage)[0] is items
+        assert space.unwrap(w_l) == range(n - 10) + range(1, n)
+        assert space.unwrap(w_l2) == range(1, n)
+        w_l.pop(0)
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        assert space.unwrap(w_l) == range(1, n - 10) + range(1, n)
+        assert space.unwrap(w_l2) == range(1, n)
+        # once it gets too short the slice stops keeping 'items' alive
+        while w_l2.length() * 2 >= n:
+            assert isinstance(w_l2.strategy, SharedIntegerListStrategy)
+            w_l2.pop_end()
+        assert isinstance(w_l2.strategy, IntegerListStrategy)
+        assert space.unwrap(w_l2) == range(1, n // 2)
+
+    def test_shared_slice_only_big_slices(self):
+        space = self.space
+        n = COW_SLICE_CUTOFF * 4
+        w_l = W_ListObject(space, [space.wrap(i) for i in range(n)])
+        # a sliding window over a growing list never shares
+        for i in range(n):
+            w_l.append(space.wrap(n + i))
+            length = w_l.length()
+            w_window = w_l.getslice(length - COW_SLICE_CUTOFF, length, 1,
+                                    COW_SLICE_CUTOFF)
+            assert isinstance(w_window.strategy, IntegerListStrategy)
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        w_half = w_l.getslice(0, n, 1, n)
+        assert isinstance(w_half.strategy, SharedIntegerListStrategy)
+        # neither are small slices of a shared list
+        w_small = w_half.getslice(0, n // 2 - 1, 1, n // 2 - 1)
+        assert isinstance(w_small.strategy, IntegerListStrategy)
+
+    def test_shared_slice_short(self):
+        space = self.space
+        w_l = W_ListObject(space, [space.wrap(i) for i in range(10)])
+        w_l2 = w_l.getslice(0, 10, 1, 10)
+        assert isinstance(w_l.strategy, IntegerListStrategy)
+        assert isinstance(w_l2.strategy, IntegerListStrategy)
+
+    def test_shared_copy(self):
+        space = self.space
+        n = COW_SLICE_CUTOFF
+        w_l = W_ListObject(space, [space.newbytes(str(i)) for i in range(n)])
+        w_l2 = W_ListObject(space, [])
+        w_l2.extend(w_l)
+        assert isinstance(w_l.strategy, SharedBytesListStrategy)
+        assert isinstance(w_l2.strategy, SharedBytesListStrategy)
+        w_l2.pop_end()
+        assert w_l.length() == n
+        assert w_l2.length() == n - 1
+        assert isinstance(w_l2.strategy, BytesListStrategy)
+        #
+        w_l = W_ListObject(space, [space.wrap(i + 0.5) for i in range(n)])
+        w_l2 = W_ListObject(space, [])
+        w_l2.extend(w_l)
+        assert isinstance(w_l2.strategy, SharedFloatListStrategy)
+        w_l3 = W_ListObject(space, [space.wrap(1)])
+        w_l3.extend(w_l2)
+        assert isinstance(w_l3.strategy, IntOrFloatListStrategy)
+        assert space.unwrap(w_l3) == [1] + [i + 0.5 for i in range(n)]
+        w_l4 = W_ListObject(space, [space.wrap(1.5)] * 3)
+        w_l4.setslice(0, 1, 1, w_l)
+        assert isinstance(w_l4.strategy, FloatListStrategy)
+        # the argument lists keep sharing their items
+        assert isinstance(w_l.strategy, SharedFloatListStrategy)
+        assert isinstance(w_l2.strategy, SharedFloatListStrategy)
+        assert w_l4.length() == n + 2
+        assert space.listview_float(w_l) == [i + 0.5 for i in range(n)]
+
+
+class TestW_ListStrategiesTuplePairs:
+    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+
+    def test_check_strategy(self):
+        space = self.space
+        w = space.wrap
+        w_l = W_ListObject(space, [w((1, 2)), w((3, 4))])
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+        assert w_l.strategy.unerase(w_l.lstorage) == [1, 2, 3, 4]
+        w_l = W_ListObject(space, [w((1.5, 2.5)), w((3.5, 4.5))])
+        assert isinstance(w_l.strategy, FloatPairListStrategy)
+        w_l = W_ListObject(space, [w((1, 2)), w((3.5, 4.5))])
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+        w_l = W_ListObject(space, [w((1, 2)), w((1, 2, 3))])
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+
+    def test_empty_to_pair(self):
+        space = self.space
+        w_l = W_ListObject(space, [])
+        w_l.append(space.wrap((1, 2)))
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+        w_l = W_ListObject(space, [])
+        w_l.append(space.wrap((1.0, 2.0)))
+        assert isinstance(w_l.strategy, FloatPairListStrategy)
+
+    def test_pair_to_object(self):
+        space = self.space
+        w = space.wrap
+        w_l = W_ListObject(space, [w((1, 2)), w((3, 4))])
+        w_l.append(w((5, 6)))
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+        w_l.append(w((5.5, 6)))
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+        assert space.unwrap(w_l) == [(1, 2), (3, 4), (5, 6), (5.5, 6)]
+
+        w_l = W_ListObject(space, [w((1, 2)), w((3, 4))])
+        w_l.setitem(0, w(1))
+        assert isinstance(w_l.strategy, ObjectListStrategy)
+        assert space.unwrap(w_l) == [1, (3, 4)]
+
+    def test_getitem_setitem(self):
+        space = self.space
+        w = space.wrap
+        w_l = W_ListObject(space, [w((1, 2)), w((3, 4))])
+        assert space.unwrap(w_l.getitem(-1)) == (3, 4)
+        w_l.setitem(-2, w((5, 6)))
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+        assert space.unwrap(w_l) == [(5, 6), (3, 4)]
+        py.test.raises(IndexError, w_l.getitem, 2)
+        py.test.raises(IndexError, w_l.getitem, -3)
+        py.test.raises(IndexError, w_l.setitem, 2, w((1, 1)))
+
+    def test_slice_pop_insert(self):
+        space = self.space
+        w = space.wrap
+        w_l = W_ListObject(space, [w((i, -i)) for i in range(6)])
+        w_s = w_l.getslice(1, 5, 2, 2)
+        assert isinstance(w_s.strategy, IntPairListStrategy)
+        assert space.unwrap(w_s) == [(1, -1), (3, -3)]
+        assert space.unwrap(w_l.pop(1)) == (1, -1)
+        assert space.unwrap(w_l.pop_end()) == (5, -5)
+        w_l.insert(0, w((7, 8)))
+        w_l.deleteslice(1, 1, 2)
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+        assert space.unwrap(w_l) == [(7, 8), (3, -3), (4, -4)]
+
+    def test_sort_reverse(self):
+        space = self.space
+        w = space.wrap
+        w_l = W_ListObject(space, [w((2, 1)), w((1, 5)), w((1, 2)),
+                                   w((0, 9))])
+        w_l.sort(False)
+        assert space.unwrap(w_l) == [(0, 9), (1, 2), (1, 5), (2, 1)]
+        w_l.sort(True)
+        assert space.unwrap(w_l) == [(2, 1), (1, 5), (1, 2), (0, 9)]
+        w_l.reverse()
+        assert space.unwrap(w_l) == [(0, 9), (1, 2), (1, 5), (2, 1)]
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+
+    def test_find_float_nan(self):
+        space = self.space
+        w = space.wrap
+        nan = float('nan')
+        w_l = W_ListObject(space, [w((1.0, nan)), w((0.0, 2.0))])
+        assert w_l.find_or_count(w((1.0, nan))) == 0
+        assert w_l.find_or_count(w((-0.0, 2.0))) == 1
+        assert w_l.find_or_count(w((0, 2))) == 1
+
+    def test_zip_builds_pair_list(self):
+        from pypy.objspace.std.specialisedtupleobject import (
+            specialized_zip_2_lists)
+        space = self.space
+        w_l = specialized_zip_2_lists(space, space.wrap([1, 2, 3]),
+                                      space.wrap([4, 5]))
+        assert isinstance(w_l.strategy, IntPairListStrategy)
+        assert space.unwrap(w_l) == [(1, 4), (2, 5)]
+        w_l = specialized_zip_2_lists(space, space.wrap([1.5]),
+                                      space.wrap([4.5]))
+        assert isinstance(w_l.strategy, FloatPairListStrategy)
+
 
 class TestW_ListStrategiesDisabled:
     spaceconfig = {"objspace.std.withliststrategies": False}
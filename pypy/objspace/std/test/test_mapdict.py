@@ -1682,14 +1682,21 @@ class AppTestGlobalCaching(AppTestWithMapDict):
             class C(object):
                 def f(self):
                     return 44
-            l = [A(), B(), C()] * 10
+            class D(object):
+                def f(self):
+                    return 45
+            class E(object):
+                def f(self):
+                    return 46
+            # more classes than the per-call-site cache can hold
+            l = [A(), B(), C(), D(), E()] * 10
             __pypy__.reset_method_cache_counter()
             # 'exec' to make sure that a.f() is compiled with CALL_METHOD
             exec """for i, a in enumerate(l):
-                        assert a.f() == 42 + i % 3
+                        assert a.f() == 42 + i % 5
             """ in locals()
             cache_counter = __pypy__.mapdict_cache_counter("f")
-            if cache_counter == (27, 3):
+            if cache_counter == (45, 5):
                 break
             # keep them alive, to make sure that on the
             # next try they have difference addresses
@@ -1710,12 +1717,19 @@ class AppTestGlobalCaching(AppTestWithMapDict):
             class C(object):
                 def __init__(self):
                     self.x = 44
-            l = [A(), B(), C()] * 10
+            class D(object):
+                def __init__(self):
+                    self.x = 45
+            class E(object):
+                def __init__(self):
+                    self.x = 46
+            # more classes than the per-call-site cache can hold
+            l = [A(), B(), C(), D(), E()] * 10
             __pypy__.reset_method_cache_counter()
             for i, a in enumerate(l):
-                assert a.x == 42 + i % 3
+                assert a.x == 42 + i % 5
             cache_counter = __pypy__.mapdict_cache_counter("x")
-            if cache_counter == (27, 3):
+            if cache_counter == (45, 5):
                 break
             # keep them alive, to make sure that on the
             # next try they have difference addresses
@@ -1723,6 +1737,136 @@ class AppTestGlobalCaching(AppTestWithMapDict):
         else:
             assert 0, "failed: got %r" % ([got[1] for got in seen],)
 
+class AppTestPolymorphicCaching(AppTestWithMapDict):
+
+    def setup_class(cls):
+        from pypy.interpreter import gateway
+        #
+        def chain_length(space, w_func, name):
+            w_code = space.getattr(w_func, space.wrap('func_code'))
+            nameindex = map(space.str_w, w_code.co_names_w).index(name)
+            entry = w_code._mapdict_caches[nameindex]
+            length = 0
+            while entry is not None:
+                length += 1
+                entry = entry.next
+            return space.wrap(length)
+        chain_length.unwrap_spec = [gateway.ObjSpace, gateway.W_Root, 'text']
+        cls.w_chain_length = cls.space.wrap(gateway.interp2app(chain_length))
+
+    def test_polymorphic_attribute(self):
+        import __pypy__
+        class A(object):
+            def __init__(self):
+                self.x = 42
+        class B(object):
+            def __init__(self):
+                self.y = 0
+                self.x = 43
+        l = [A(), B()] * 10
+        def f(l):
+            res = 0
+            for a in l:
+                res += a.x
+            return res
+        __pypy__.reset_inline_cache_counters()
+        assert f(l) == 850
+        # the entry of the other class is always the second one, and moves
+        # to the front when it is used
+        assert __pypy__.inline_cache_counters() == (18, 2, 0)
+
+    def test_polymorphic_method(self):
+        import __pypy__
+        class A(object):
+            def f(self):
+                return 1
+        class B(object):
+            def f(self):
+                return 2
+        class C(object):
+            def f(self):
+                return 3
+        l = [A(), B(), C()] * 10
+        # 'exec' to make sure that a.f() is compiled with CALL_METHOD
+        d = {'l': l}
+        exec """def g(l):
+            res = 0
+            for a in l:
+                res += a.f()
+            return res
+        """ in d
+        __pypy__.reset_inline_cache_counters()
+        assert d['g'](l) == 60
+        assert __pypy__.inline_cache_counters() == (27, 3, 0)
+
+    def test_used_entry_moves_to_front(self):
+        import __pypy__
+        class A(object):
+            def __init__(self):
+                self.x = 42
+        class B(object):
+            def __init__(self):
+                self.x = 43
+        l = [A(), B()] + [A()] * 10
+        def f(l):
+            res = 0
+            for a in l:
+                res += a.x
+            return res
+        __pypy__.reset_inline_cache_counters()
+        assert f(l) == 505
+        # only the first lookup on A() after B() goes past the first entry
+        assert __pypy__.inline_cache_counters() == (1, 2, 0)
+        assert self.chain_length(f, "x") == 2
+
+    def test_attribute_and_method(self):
+        import __pypy__
+        class A(object):
+            def f(self):
+                return 1
+        a = A()
+        def g():
+            res = 0
+            for i in range(10):
+                res += a.f()
+                res += a.f.__name__ == "f"
+            return res
+        __pypy__.reset_inline_cache_counters()
+        assert g() == 20
+        polymorphic_hits, misses, evictions = (
+            __pypy__.inline_cache_counters())
+        # the LOAD_ATTR of 'a.f' and the LOOKUP_METHOD of 'a.f()' don't
+        # keep refilling the cache
+        assert misses <= 2
+
+    def test_megamorphic(self):
+        import __pypy__
+        classes = [type("A%d" % i, (object,), {}) for i in range(6)]
+        l = []
+        for cls in classes:
+            a = cls()
+            a.x = 1
+            l.append(a)
+        def f(l):
+            res = 0
+            for a in l:
+                res += a.x
+            return res
+        __pypy__.reset_inline_cache_counters()
+        assert f(l * 3) == 18
+        polymorphic_hits, misses, evictions = (
+            __pypy__.inline_cache_counters())
+        assert misses == 18
+        assert evictions == 14
+        assert self.chain_length(f, "x") == 4
+        # refilling an entry of the chain doesn't make it longer
+        classes[2].y = 5
+        __pypy__.reset_inline_cache_counters()
+        assert f(l[-4:]) == 4
+        assert __pypy__.inline_cache_counters()[1] == 1
+        assert self.chain_length(f, "x") == 4
+
+
 class TestDictSubclassShortcutBug(object):
     spaceconfig = {"objspace.std.withmethodcachecounter": True}
 
@@ -36,14 +36,21 @@ class AppTestMethodCaching(test_typeobject.AppTestTypeObject):
             class C(object):
                 def f(self):
                     return 44
-            l = [A(), B(), C()] * 10
+            class D(object):
+                def f(self):
+                    return 45
+            class E(object):
+                def f(self):
+                    return 46
+            # more classes than the mapdict cache of the call site can hold
+            l = [A(), B(), C(), D(), E()] * 10
             __pypy__.reset_method_cache_counter()
             for i, a in enumerate(l):
-                assert a.f() == 42 + i % 3
+                assert a.f() == 42 + i % 5
             cache_counter = __pypy__.method_cache_counter("f")
-            assert cache_counter[0] >= 15
-            assert cache_counter[1] >= 3 # should be (27, 3)
-            assert sum(cache_counter) == 30
+            assert cache_counter[0] >= 25
+            assert cache_counter[1] >= 5 # should be (45, 5)
+            assert sum(cache_counter) == 50
 
     def test_class_that_cannot_be_cached(self):
         @self.retry
@@ -63,14 +70,23 @@ class AppTestMethodCaching(test_typeobject.AppTestTypeObject):
             class C(object):
                 def f(self):
                     return 44
-            l = [A(), B(), C()] * 10
+            class D(object):
+                def f(self):
+                    return 45
+            class E(object):
+                def f(self):
+                    return 46
+            class F(object):
+                def f(self):
+                    return 47
+            l = [A(), B(), C(), D(), E(), F()] * 10
             __pypy__.reset_method_cache_counter()
             for i, a in enumerate(l):
-                assert a.f() == 42 + i % 3
+                assert a.f() == 42 + i % 6
             cache_counter = __pypy__.method_cache_counter("f")
-            assert cache_counter[0] >= 9
-            assert cache_counter[1] >= 2 # should be (18, 2)
-            assert sum(cache_counter) == 20
+            assert cache_counter[0] >= 25
+            assert cache_counter[1] >= 5 # should be (45, 5)
+            assert sum(cache_counter) == 50
 
     def test_subclasses(self):
         @self.retry
@@ -84,14 +100,18 @@ class AppTestMethodCaching(test_typeobject.AppTestTypeObject):
                     return 43
             class C(A):
                 pass
-            l = [A(), B(), C()] * 10
+            class D(B):
+                pass
+            class E(C):
+                pass
+            l = [A(), B(), C(), D(), E()] * 10
             __pypy__.reset_method_cache_counter()
             for i, a in enumerate(l):
-                assert a.f() == 42 + (i % 3 == 1)
+                assert a.f() == 42 + (i % 5 in (1, 3))
             cache_counter = __pypy__.method_cache_counter("f")
-            assert cache_counter[0] >= 15
-            assert cache_counter[1] >= 3 # should be (27, 3)
-            assert sum(cache_counter) == 30
+            assert cache_counter[0] >= 25
+            assert cache_counter[1] >= 5 # should be (45, 5)
+            assert sum(cache_counter) == 50
 
     def test_many_names(self):
         @self.retry
@@ -199,3 +219,79 @@ class AppTestMethodCaching(test_typeobject.AppTestTypeObject):
                 setattr(a, "a%s" % i, i)
             cache_counter = __pypy__.method_cache_counter("x")
             assert cache_counter[0] == 0 # 0 hits, because all the attributes are new
+
+
+class TestMethodCacheResize:
+    def test_resize_keeps_entries(self):
+        from pypy.objspace.std.typeobject import MethodCache
+        space = self.space
+        cache = space.fromcache(MethodCache)
+        w_type = space.appexec([], """():
+            class A(object):
+                def f(self):
+                    pass
+            return A
+        """)
+        version_tag = w_type.version_tag()
+        w_type._pure_lookup_where_with_method_cache("f", version_tag)
+        cache.resize(cache.size_exp + 1)
+        hits = cache.num_hits
+        w_type._pure_lookup_where_with_method_cache("f", version_tag)
+        assert cache.num_hits == hits + 1
+        cache.resize(cache.size_exp - 1)
+
+    def test_grow_on_collisions(self):
+        from pypy.objspace.std.typeobject import MethodCache, VersionTag
+        space = self.space
+        cache = space.fromcache(MethodCache)
+        old_size_exp = cache.size_exp
+        cache.resize(4)
+        try:
+            # fill the same slot again and again
+            for i in range(16):
+                cache.store(0, VersionTag(), "f", (None, None))
+            assert cache.size_exp == 5
+            for i in range(32):
+                cache.store(i, VersionTag(), "f", (None, None))
+            # no collisions since the resize: no growth
+            assert cache.size_exp == 5
+        finally:
+            cache.resize(old_size_exp)
+
+
+class AppTestMethodCacheStats:
+    def test_stats(self):
+        import __pypy__
+        class A(object):
+            x = 42
+        a = A()
+        __pypy__.reset_method_cache_stats()
+        for i in range(10):
+            a.x
+        hits, misses, collisions, size = __pypy__.method_cache_stats()
+        assert hits >= 9
+        assert misses >= 1
+        assert size >= 2048
+        for i in range(1000):
+            a.x
+        assert __pypy__.method_cache_stats()[0] >= 1000
+        __pypy__.reset_method_cache_stats()
+        assert __pypy__.method_cache_stats()[0] < 1000
+
+    def test_set_size(self):
+        import __pypy__
+        old_size = __pypy__.method_cache_stats()[3]
+        __pypy__.set_method_cache_size(64)
+        try:
+            assert __pypy__.method_cache_stats()[3] == 64
+            class A(object):
+                def f(self):
+                    return 42
+            assert A().f() == 42
+        finally:
+            __pypy__.set_method_cache_size(old_size)
+        assert __pypy__.method_cache_stats()[3] == old_size
+        raises(ValueError, __pypy__.set_method_cache_size, 100)
+        raises(ValueError, __pypy__.set_method_cache_size, 2)
+        raises(ValueError, __pypy__.set_method_cache_size, 1 << 40)
+        raises(ValueError, __pypy__.set_method_cache_size, -4)
@@ -81,6 +81,7 @@ class TestW_SetObject:
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
         from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy
+        from pypy.objspace.std.setobject import FloatSetStrategy
         from pypy.objspace.std.floatobject import W_FloatObject
 
         w = self.space.wrap
@@ -116,6 +117,13 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        for item in w_set.strategy.unerase(w_set.sstorage):
+            assert isinstance(item, float)
+
+        w_list = W_ListObject(self.space, [w(1.0), w(float('nan'))])
+        w_set = W_SetObject(self.space)
+        _initialize_set(self.space, w_set, w_list)
         assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
         for item in w_set.strategy.unerase(w_set.sstorage):
             assert isinstance(item, W_FloatObject)
@@ -1038,6 +1046,74 @@ class AppTestAppSetTest:
         # operands when the first set is larger than the second
         assert type(frozenset([1, 2]) & set([2])) is frozenset
 
+    def test_non_ascii_unicode_strategy(self):
+        from __pypy__ import strategy
+        s = set([u'a', u'\xe4'])
+        assert strategy(s) == "Utf8SetStrategy"
+        assert u'\xe4' in s and u'a' in s and u'b' not in s
+        assert sorted(s) == [u'a', u'\xe4']
+        assert [len(x) for x in s] == [1, 1]
+        s2 = set([u'a', u'b'])
+        assert strategy(s2) == "AsciiSetStrategy"
+        assert u'\xe4' not in s2
+        s2.discard(u'\u1234')
+        assert strategy(s2) == "AsciiSetStrategy"
+        assert s & s2 == set([u'a'])
+        assert s - s2 == set([u'\xe4'])
+        s2 |= s
+        assert strategy(s2) == "Utf8SetStrategy"
+        assert s2 == set([u'a', u'b', u'\xe4'])
+        s2.add(1)
+        assert strategy(s2) == "ObjectSetStrategy"
+        assert s2 == set([u'a', u'b', u'\xe4', 1])
+
+    def test_float_strategy(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5, 0.0])
+        assert strategy(s) == "FloatSetStrategy"
+        assert -0.0 in s and 1.5 in s and 3.5 not in s
+        assert float('nan') not in s
+        s2 = set([2.5, 3.5])
+        assert s & s2 == set([2.5])
+        assert s | s2 == set([0.0, 1.5, 2.5, 3.5])
+        assert strategy(s | s2) == "FloatSetStrategy"
+        assert s - s2 == set([0.0, 1.5])
+        assert set([1.0, 2.0]) == set([1, 2])
+        assert set([1.0, 2.0]) & set([2, 3]) == set([2])
+        nan = float('nan')
+        s2.add(nan)
+        assert strategy(s2) == "ObjectSetStrategy"
+        assert nan in s2
+        s3 = set([nan, 1.5])
+        assert strategy(s3) == "ObjectSetStrategy"
+        assert len(s3) == 2
+        assert 0 in s
+
+    def test_float_strategy_int_keys(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5, 4.0, float(2**53), 1e300])
+        assert 0 not in s and 1 not in s and 2**53 + 1 not in s
+        assert 4 in s and 4L in s and 2**53 in s and long(1e300) in s
+        assert 10**400 not in s
+        assert strategy(s) == "FloatSetStrategy"
+        s.discard(4)
+        s.discard(2**53 + 1)
+        s.remove(long(1e300))
+        raises(KeyError, s.remove, 3)
+        assert s == set([1.5, 2.5, float(2**53)])
+        assert strategy(s) == "FloatSetStrategy"
+        assert True in set([1.0])
+
+    def test_tuples_keep_identity(self):
+        t = (1, 2)
+        u = (1.5, 2.5)
+        s = set([t, u, (3, 4)])
+        for s2 in [s, s.copy(), frozenset(s), s | set([(5, 6)]),
+                   s & set([t, u]), s - set([(3, 4)])]:
+            assert [x for x in s2 if x is t] == [t]
+            assert [x for x in s2 if x is u] == [u]
+        assert set([t]).pop() is t
+
     def test_update_bug_strategy(self):
         from __pypy__ import strategy
         s = set([1, 2, 3])
@@ -2,7 +2,8 @@ from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
     IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
-    UnicodeIteratorImplementation, AsciiSetStrategy)
+    UnicodeIteratorImplementation, AsciiSetStrategy, Utf8SetStrategy,
+    FloatSetStrategy)
 from pypy.objspace.std.listobject import W_ListObject
 
 class TestW_SetStrategies:
@@ -44,6 +45,58 @@ class TestW_SetStrategies:
         s.add(self.space.wrap(u"six"))
         assert s.strategy is self.space.fromcache(AsciiSetStrategy)
 
+    def test_switch_to_utf8(self):
+        space = self.space
+        w_u = space.newutf8("\xc3\xa4", 1)
+        s = W_SetObject(space, self.wrapped([]))
+        s.add(w_u)
+        assert s.strategy is space.fromcache(Utf8SetStrategy)
+
+        s = W_SetObject(space, self.wrapped([u"a", u"b"]))
+        # looking up a non-ascii unicode does not change the strategy
+        assert not s.has_key(w_u)
+        assert not s.remove(w_u)
+        assert s.strategy is space.fromcache(AsciiSetStrategy)
+        s.add(w_u)
+        assert s.strategy is space.fromcache(Utf8SetStrategy)
+        assert s.has_key(space.wrap(u"a"))
+        assert s.has_key(w_u)
+        assert sorted(space.listview_utf8(s)) == ["a", "b", "\xc3\xa4"]
+
+        s1 = W_SetObject(space, W_ListObject(space, [w_u]))
+        assert s1.strategy is space.fromcache(Utf8SetStrategy)
+        s1.update(W_SetObject(space, self.wrapped([u"c"])))
+        assert s1.strategy is space.fromcache(Utf8SetStrategy)
+        s2 = W_SetObject(space, self.wrapped([u"d"]))
+        s2.update(s1)
+        assert s2.strategy is space.fromcache(Utf8SetStrategy)
+        assert sorted(space.listview_utf8(s2)) == ["c", "d", "\xc3\xa4"]
+        it = s1.iter()
+        assert space.len_w(it.next()) == 1
+        assert space.len_w(it.next()) == 1
+
+    def test_float(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([1.5, 2.5, -0.0]))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.has_key(space.wrap(0.0))
+        assert not s.has_key(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        s.add(space.wrap(3.5))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        assert s.length() == 4
+        #
+        s = W_SetObject(space, self.wrapped([1.5, float('nan')]))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        s = W_SetObject(space, self.wrapped([]))
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        s = W_SetObject(space, self.wrapped([1.5]))
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        s = W_SetObject(space, self.wrapped([1.0]))
+        assert s.has_key(space.wrap(1))
+
     def test_symmetric_difference(self):
         s1 = W_SetObject(self.space, self.wrapped([1,2,3,4,5]))
         s2 = W_SetObject(self.space, self.wrapped(["six", "seven"]))
@@ -53,6 +53,37 @@ class TestUnicodeObject:
         assert space.eq_w(w_char1, w_uni._getitem_result(space, 0))
         assert space.eq_w(w_char2, w_uni._getitem_result(space, 1))
 
+    def test_find_does_not_build_index(self):
+        space = self.space
+        u = u"\xe4" * 1000 + u"x" + u"\xe4" * 1000
+        w_u = space.newutf8(u.encode("utf-8"), len(u))
+        w_x = space.newutf8("x", 1)
+        assert space.int_w(space.call_method(w_u, "find", w_x)) == 1000
+        assert space.int_w(space.call_method(w_u, "rfind", w_x)) == 1000
+        assert not w_u._index_storage
+        w_res = space.call_method(w_u, "find", w_x, space.newint(10))
+        assert space.int_w(w_res) == 1000
+        assert space.int_w(space.call_method(w_u, "count", w_x)) == 1
+        w_res = space.call_method(w_u, "rfind", w_x, space.newint(5),
+                                  space.newint(1500))
+        assert space.int_w(w_res) == 1000
+        w_res = space.call_method(w_u, "rindex", w_x, space.newint(1000),
+                                  space.newint(1001))
+        assert space.int_w(w_res) == 1000
+
+    def test_index_storage_is_incremental(self):
+        space = self.space
+        u = u"\xe4" * 10000
+        w_u = space.newutf8(u.encode("utf-8"), len(u))
+        w_char = w_u._getitem_result(space, 5)
+        assert space.utf8_w(w_char) == u"\xe4".encode("utf-8")
+        storage = w_u._index_storage
+        assert len(storage) < 10000 // 64
+        w_u._getitem_result(space, 6)
+        assert w_u._index_storage is storage
+        w_u._getitem_result(space, 9999)
+        assert len(w_u._index_storage) == len(u) // 64 + 1
+
 
     if HAS_HYPOTHESIS:
         @given(strategies.text(), strategies.integers(min_value=0, max_value=10),
@@ -68,21 +68,98 @@ def write_cell(space, w_cell, w_value):
 class VersionTag(object):
     pass
 
+# limits of the size of the method cache, as a power of two
+MIN_METHOD_CACHE_SIZE_EXP = 4
+MAX_METHOD_CACHE_SIZE_EXP = 20
+
 class MethodCache(object):
 
     def __init__(self, space):
-        # Note: these attributes never change which object they contain,
-        # so reading 'cache.versions' for example is constant-folded.
-        # The actual list in 'cache.versions' is not a constant, of
-        # course.
-        SIZE = 1 << space.config.objspace.std.methodcachesizeexp
-        self.versions = [None] * SIZE
-        self.names = [None] * SIZE
-        self.lookup_where = [(None, None)] * SIZE
+        # the cache starts with 2 ** methodcachesizeexp entries; it grows
+        # by itself up to 2 ** methodcachemaxsizeexp entries when too many
+        # misses overwrite other entries, and it can be resized from
+        # app-level with __pypy__.set_method_cache_size()
+        self.max_size_exp = space.config.objspace.std.methodcachemaxsizeexp
+        self._allocate(space.config.objspace.std.methodcachesizeexp)
+        self.reset_stats()
         if space.config.objspace.std.withmethodcachecounter:
             self.hits = {}
             self.misses = {}
 
+    def _allocate(self, size_exp):
+        SIZE = 1 << size_exp
+        self.size_exp = size_exp
+        self.shift2 = r_uint.BITS - size_exp
+        self.versions = [None] * SIZE
+        self.names = [None] * SIZE
+        self.lookup_where = [(None, None)] * SIZE
+        self.misses_since_resize = 0
+        self.collisions_since_resize = 0
+
+    def reset_stats(self):
+        # always-on counters, see __pypy__.method_cache_stats()
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_collisions = 0
+
+    def method_hash(self, version_tag, name):
+        SHIFT2 = self.shift2
+        SHIFT1 = SHIFT2 - 5
+        version_tag_as_int = current_object_addr_as_int(version_tag)
+        # ^^^Note: if the version_tag object is moved by a moving GC, the
+        # existing method cache entries won't be found any more; new
+        # entries will be created based on the new address.  The
+        # assumption is that the version_tag object won't keep moving all
+        # the time - so using the fast current_object_addr_as_int() instead
+        # of a slower solution like hash() is still a good trade-off.
+        hash_name = compute_hash(name)
+        product = intmask(version_tag_as_int * hash_name)
+        return intmask(
+            (r_uint(product) ^ (r_uint(product) << SHIFT1)) >> SHIFT2)
+        # ^^^Note2: we used to just take product>>SHIFT2, but on 64-bit
+        # platforms SHIFT2 is really large, and we loose too much information
+        # that way (as shown by failures of the tests that typically have
+        # method names like 'f' who hash to a number that has only ~33 bits).
+
+    def store(self, method_hash, version_tag, name, tup):
+        self.num_misses += 1
+        self.misses_since_resize += 1
+        if self.versions[method_hash] is not None:
+            self.num_collisions += 1
+            self.collisions_since_resize += 1
+        self.versions[method_hash] = version_tag
+        self.names[method_hash] = name
+        self.lookup_where[method_hash] = tup
+        if self.misses_since_resize >= len(self.versions):
+            self._maybe_grow()
+
+    def _maybe_grow(self):
+        # grow if more than half of the misses since the last resize
+        # replaced another entry
+        if (self.collisions_since_resize * 2 > self.misses_since_resize and
+                self.size_exp < self.max_size_exp):
+            self.resize(self.size_exp + 1)
+        else:
+            self.misses_since_resize = 0
+            self.collisions_since_resize = 0
+
+    def resize(self, size_exp):
+        """Change the size of the cache to 2 ** size_exp entries, keeping
+        the current entries as far as they fit."""
+        versions = self.versions
+        names = self.names
+        lookup_where = self.lookup_where
+        self._allocate(size_exp)
+        for i in range(len(versions)):
+            version_tag = versions[i]
+            if version_tag is not None:
+                name = names[i]
+                assert name is not None
+                method_hash = self.method_hash(version_tag, name)
+                self.versions[method_hash] = version_tag
+                self.names[method_hash] = name
+                self.lookup_where[method_hash] = lookup_where[i]
+
     def clear(self):
         None_None = (None, None)
         for i in range(len(self.versions)):
@@ -446,36 +523,20 @@ class W_TypeObject(W_Root):
     def _pure_lookup_where_with_method_cache(self, name, version_tag):
         space = self.space
         cache = space.fromcache(MethodCache)
-        SHIFT2 = r_uint.BITS - space.config.objspace.std.methodcachesizeexp
-        SHIFT1 = SHIFT2 - 5
-        version_tag_as_int = current_object_addr_as_int(version_tag)
-        # ^^^Note: if the version_tag object is moved by a moving GC, the
-        # existing method cache entries won't be found any more; new
-        # entries will be created based on the new address.  The
-        # assumption is that the version_tag object won't keep moving all
-        # the time - so using the fast current_object_addr_as_int() instead
-        # of a slower solution like hash() is still a good trade-off.
-        hash_name = compute_hash(name)
-        product = intmask(version_tag_as_int * hash_name)
-        method_hash = (r_uint(product) ^ (r_uint(product) << SHIFT1)) >> SHIFT2
-        # ^^^Note2: we used to just take product>>SHIFT2, but on 64-bit
-        # platforms SHIFT2 is really large, and we loose too much information
-        # that way (as shown by failures of the tests that typically have
-        # method names like 'f' who hash to a number that has only ~33 bits).
+        method_hash = cache.method_hash(version_tag, name)
         cached_version_tag = cache.versions[method_hash]
         if cached_version_tag is version_tag:
             cached_name = cache.names[method_hash]
             if cached_name is name:
                 tup = cache.lookup_where[method_hash]
+                cache.num_hits += 1
                 if space.config.objspace.std.withmethodcachecounter:
                     cache.hits[name] = cache.hits.get(name, 0) + 1
 #                print "hit", self, name
                 return tup
         tup = self._lookup_where_all_typeobjects(name)
         if space._side_effects_ok():
-            cache.versions[method_hash] = version_tag
-            cache.names[method_hash] = name
-            cache.lookup_where[method_hash] = tup
+            cache.store(method_hash, version_tag, name, tup)
             if space.config.objspace.std.withmethodcachecounter:
                 cache.misses[name] = cache.misses.get(name, 0) + 1
 #        print "miss", self, name
@@ -488,6 +488,12 @@ class W_UnicodeObject(W_Root):
                 return space.newutf8(l[0], len(l[0]))
             s = self._utf8.join(l)
             return space.newutf8(s, len(s))
+        l = space.listview_utf8(w_list)
+        if l is not None:
+            if len(l) == 1:
+                return space.newutf8(l[0], rutf8.codepoints_in_utf8(l[0]))
+            s = self._utf8.join(l)
+            return space.newutf8(s, rutf8.codepoints_in_utf8(s))
         return self._StringMethods_descr_join(space, w_list)
 
     def _join_return_one(self, space, w_obj):
@@ -631,31 +637,26 @@ class W_UnicodeObject(W_Root):
     def descr_splitlines(self, space, keepends=False):
         value = self._utf8
         length = len(value)
-        strs_w = []
+        strs = []
         pos = 0
         while pos < length:
             sol = pos
-            lgt = 0
             while pos < length and not self._islinebreak(rutf8.codepoint_at_pos(value, pos)):
                 pos = rutf8.next_codepoint_pos(value, pos)
-                lgt += 1
             eol = pos
             if pos < length:
                 # read CRLF as one line break
                 if (value[pos] == '\r' and pos + 1 < length
                                        and value[pos + 1] == '\n'):
                     pos += 2
-                    line_end_chars = 2
                 else:
                     pos = rutf8.next_codepoint_pos(value, pos)
-                    line_end_chars = 1
                 if keepends:
                     eol = pos
-                    lgt += line_end_chars
             assert eol >= 0
             assert sol >= 0
-            strs_w.append(W_UnicodeObject(value[sol:eol], lgt))
-        return space.newlist(strs_w)
+            strs.append(value[sol:eol])
+        return space.newlist_utf8(strs, self.is_ascii())
 
     def descr_upper(self, space):
         if self.is_ascii():
@@ -770,8 +771,6 @@ class W_UnicodeObject(W_Root):
             return self._unicode_sliced(space, start, stop)
 
     def _unicode_sliced(self, space, start, stop):
-        # XXX maybe some heuristic, like first slice does not create
-        #     full index, but second does?
         assert start >= 0
         assert stop >= 0
         byte_start = self._index_to_byte(start)
@@ -922,12 +921,18 @@ class W_UnicodeObject(W_Root):
 
     descr_rmul = descr_mul
 
-    def _get_index_storage(self):
-        return jit.conditional_call_elidable(self._index_storage,
-                    W_UnicodeObject._compute_index_storage, self)
-
-    def _compute_index_storage(self):
-        storage = rutf8.create_utf8_index_storage(self._utf8, self._length)
+    def _get_index_storage(self, index):
+        # the index storage is built incrementally, only as far as the
+        # characters that are actually accessed
+        storage = self._index_storage
+        if storage and (index >> 6) >= len(storage):
+            storage = rutf8.null_storage()
+        return jit.conditional_call_elidable(storage,
+                    W_UnicodeObject._grow_index_storage, self, index)
+
+    def _grow_index_storage(self, index):
+        storage = rutf8.grow_utf8_index_storage(
+            self._utf8, self._length, self._index_storage, index)
         self._index_storage = storage
         return storage
 
@@ -979,7 +984,7 @@ class W_UnicodeObject(W_Root):
             assert index >= 0
             return index
         return rutf8.codepoint_position_at_index(
-            self._utf8, self._get_index_storage(), index)
+            self._utf8, self._get_index_storage(index), index)
 
     def _codepoints_in_utf8(self, start, end):
         if self.is_ascii():
@@ -993,7 +998,8 @@ class W_UnicodeObject(W_Root):
         if self.is_ascii():
             return bytepos
         return rutf8.codepoint_index_at_byte_position(
-            self._utf8, self._get_index_storage(), bytepos, self._len())
+            self._utf8, self._get_index_storage(self._length), bytepos,
+            self._len())
 
     def next_codepoint_pos_dont_look_inside(self, pos):
         if self.is_ascii():
@@ -1029,18 +1035,19 @@ class W_UnicodeObject(W_Root):
 
         if forward:
             res_index = self._utf8.find(w_sub._utf8, start_index, end_index)
-            if res_index < 0:
-                return None
-            res = self._byte_to_index(res_index)
-            assert res >= 0
-            return space.newint(res)
         else:
             res_index = self._utf8.rfind(w_sub._utf8, start_index, end_index)
-            if res_index < 0:
-                return None
-            res = self._byte_to_index(res_index)
-            assert res >= 0
-            return space.newint(res)
+        if res_index < 0:
+            return None
+        # count the characters instead of building the index storage, on
+        # the side of the match that the search went over: from the start
+        # for find() and back from the end for rfind()
+        if forward:
+            res = start + self._codepoints_in_utf8(start_index, res_index)
+        else:
+            res = end - self._codepoints_in_utf8(res_index, end_index)
+        assert res >= 0
+        return space.newint(res)
 
     def _unwrap_and_compute_idx_params(self, space, w_start, w_end):
         # unwrap start and stop indices, optimized for the case where
@@ -66,11 +66,13 @@ class Bytecode:
         if hasattr(co, "co_consts"):
             return [repr(c) for c in co.co_consts]
 
+        # the real code objects, not the placeholders of lazy pyc files
+        consts_w = co.get_consts_w()
         if space is None:
-            return [repr(c) for c in co.co_consts_w]
+            return [repr(c) for c in consts_w]
         
         r = lambda x: space.str_w(space.repr(x))
-        return [r(c) for c in co.co_consts_w]
+        return [r(c) for c in consts_w]
 
     def repr_with_space(self, space):
         return self.name + self.reprargstring(space)
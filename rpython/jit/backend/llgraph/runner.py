@@ -24,6 +24,8 @@ from rpython.rlib.rarithmetic import ovfcheck, r_uint, r_ulonglong, intmask
 from rpython.rlib.objectmodel import Symbolic, compute_hash
 
 class LLAsmInfo(object):
+    asmlen = 0     # no machine code
+
     def __init__(self, lltrace):
         self.ops_offset = None
         self.lltrace = lltrace
@@ -5,7 +5,7 @@ from rpython.rtyper.annlowlevel import (
 from rpython.rlib.objectmodel import we_are_translated
 from rpython.rlib.debug import (
     debug_start, debug_stop, debug_print, have_debug_prints)
-from rpython.rlib.rarithmetic import r_uint, intmask
+from rpython.rlib.rarithmetic import r_uint, intmask, LONG_BIT
 from rpython.rlib import rstack
 from rpython.rlib.jit import JitDebugInfo, Counters, dont_look_inside
 from rpython.rlib.rjitlog import rjitlog as jl
@@ -497,6 +497,38 @@ def forget_optimization_info(lst, reset_values=False):
         if reset_values:
             item.reset_value()
 
+def estimate_code_size(asminfo, operations):
+    """Return the number of bytes of machine code and resume data used by
+    a new loop or bridge, as accounted by the memory manager.  The size of
+    the resume data is only an estimate; a numbering prefix shared by
+    several guards is counted once."""
+    size = 0
+    if asminfo is not None:
+        size += asminfo.asmlen
+    seen_prefixes = []     # few distinct ones, each shared by many guards
+    for op in operations:
+        if op.is_guard():
+            descr = op.getdescr()
+            if isinstance(descr, ResumeGuardDescr):
+                if descr.rd_numb:
+                    size += len(descr.rd_numb.code)
+                    prefix = descr.rd_numb.prefix
+                    if prefix and not _contains_numbering(seen_prefixes,
+                                                          prefix):
+                        seen_prefixes.append(prefix)
+                        size += len(prefix.code)
+                if descr.rd_consts is not None:
+                    size += len(descr.rd_consts) * (LONG_BIT // 8)
+                if descr.rd_virtuals is not None:
+                    size += len(descr.rd_virtuals) * (LONG_BIT // 8)
+    return size
+
+def _contains_numbering(numberings, numb):
+    for x in numberings:
+        if x == numb:
+            return True
+    return False
+
 def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
                          orig_inpargs, memo):
     forget_optimization_info(loop.operations)
@@ -557,7 +589,10 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type,
                                       name=loopname)
     #
     if metainterp_sd.warmrunnerdesc is not None:    # for tests
-        metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(original_jitcell_token)
+        memory_manager = metainterp_sd.warmrunnerdesc.memory_manager
+        memory_manager.record_code_size(original_jitcell_token,
+                                        estimate_code_size(asminfo, operations))
+        memory_manager.keep_loop_alive(original_jitcell_token)
 
 def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
                            operations, original_loop_token, memo):
@@ -604,6 +639,9 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
     metainterp_sd.logger_ops.log_bridge(inputargs, operations, None, faildescr,
                                         ops_offset, memo=memo)
     #
+    if metainterp_sd.warmrunnerdesc is not None:    # for tests
+        metainterp_sd.warmrunnerdesc.memory_manager.record_code_size(
+            original_loop_token, estimate_code_size(asminfo, operations))
     #if metainterp_sd.warmrunnerdesc is not None:    # for tests
     #    metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(
     #        original_loop_token)
@@ -697,7 +735,7 @@ class AbstractResumeGuardDescr(ResumeDescr):
                 self._trace_and_compile_from_bridge(deadframe, metainterp_sd,
                                                     jitdriver_sd)
             finally:
-                self.done_compiling()
+                self.done_compiling(metainterp_sd)
         else:
             from rpython.jit.metainterp.blackhole import resume_in_blackhole
             if isinstance(self, ResumeGuardCopiedDescr):
@@ -772,18 +810,26 @@ class AbstractResumeGuardDescr(ResumeDescr):
                           intval * 1442968193)
         #
         increment = jitdriver_sd.warmstate.increment_trace_eagerness
-        return jitcounter.tick(hash, increment)
+        if not jitcounter.tick(hash, increment):
+            return False
+        if not jitcounter.may_start_compiling():
+            # too soon after the previous compilation: try again after
+            # a few more failures
+            jitcounter.change_current_fraction(hash, 0.98)
+            return False
+        return True
 
     def start_compiling(self):
         # start tracing and compiling from this guard.
         self.status |= self.ST_BUSY_FLAG
 
-    def done_compiling(self):
+    def done_compiling(self, metainterp_sd):
         # done tracing and compiling from this guard.  Note that if the
         # bridge has not been successfully compiled, the jitcounter for
         # it was reset to 0 already by jitcounter.tick() and not
         # incremented at all as long as ST_BUSY_FLAG was set.
         self.status &= ~self.ST_BUSY_FLAG
+        metainterp_sd.warmrunnerdesc.jitcounter.compilation_done()
 
     def compile_and_attach(self, metainterp, new_loop, orig_inputargs):
         # We managed to create a bridge.  Attach the new operations
@@ -883,6 +929,18 @@ class ResumeGuardCopiedExcDescr(ResumeGuardCopiedDescr):
 class ResumeAtPositionDescr(ResumeGuardDescr):
     pass
 
+class ResumeGuardTierUpDescr(ResumeGuardDescr):
+    """The guard that leaves a loop compiled by the baseline tier when its
+    iteration counter runs out.  It is never compiled as a bridge: the
+    interpreter traces the loop again with the full optimizer instead."""
+    def must_compile(self, deadframe, metainterp_sd, jitdriver_sd):
+        return False
+
+    def clone(self):
+        cloned = ResumeGuardTierUpDescr()
+        cloned.copy_all_attributes_from(self)
+        return cloned
+
 class CompileLoopVersionDescr(ResumeGuardDescr):
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
         assert 0, "this guard must never fail"
@@ -1,4 +1,5 @@
 from rpython.rlib.rarithmetic import r_singlefloat, r_uint
+from rpython.rlib.rtime import monotonic
 from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.translator.tool.cbuild import ExternalCompilationInfo
 
@@ -59,13 +60,21 @@ class JitCounter:
     'reset(hash)', 'change_current_fraction(hash, new_time_value)'
     change the time value associated with a hash.  The former resets
     it to zero, and the latter changes it to the given value (which
-    should be a value close to 1.0).
+    should be a value close to 1.0).  'get_current_fraction(hash)'
+    returns it; together with change_current_fraction(), this is used
+    to save the warm counters of a process and pre-seed another one.
 
     'set_decay(decay)', 'decay_all_counters()' is used to globally
     reduce all the stored time values.  They all get multiplied by
     a fraction close to (but smaller than) 1.0, computed from the
     'decay' parameter.
 
+    'set_compile_interval(ms)' sets a minimum delay between the end of
+    one compilation and the start of the next one, for loops and bridges
+    together.  'may_start_compiling()' tells if this delay has passed,
+    and 'compilation_done()' restarts it.  This spreads the compilations
+    over time instead of having them all in a burst.
+
     'install_new_cell(hash, newcell)' adds the new JitCell to the
     celltable, at the index given by 'hash' (bits 21:32).  Unlike
     the timetable, the celltable stores a linked list of JitCells
@@ -98,6 +107,8 @@ class JitCounter:
                                        flavor='raw', zero=True,
                                        track_allocation=False)
         self._nexthash = r_uint(0)
+        self.compile_interval = 0.0
+        self.next_compile_time = 0.0
         #
         # The table of JitCell entries, recording already-compiled loops
         self.celltable = [None] * size
@@ -229,6 +240,17 @@ class JitCounter:
         p_entry.subhashes[0] = rffi.cast(rffi.USHORT, subhash)
         p_entry.times[0]     = r_singlefloat(new_fraction)
 
+    def get_current_fraction(self, hash):
+        """Return the value stored for 'hash', between 0.0 and 1.0, or 0.0
+        if there is none.
+        """
+        p_entry = self.timetable[self._get_index(hash)]
+        subhash = self._get_subhash(hash)
+        for i in range(5):
+            if p_entry.subhashes[i] == subhash:
+                return float(p_entry.times[i])
+        return 0.0
+
     def reset(self, hash):
         p_entry = self.timetable[self._get_index(hash)]
         subhash = self._get_subhash(hash)
@@ -255,6 +277,23 @@ class JitCounter:
             cell = nextcell
         self.celltable[index] = keep
 
+    def set_compile_interval(self, ms):
+        """Set the minimum delay between two compilations, in
+        milliseconds (0 for none)."""
+        if ms < 0:
+            ms = 0
+        self.compile_interval = ms * 0.001
+        self.next_compile_time = 0.0
+
+    def may_start_compiling(self):
+        if self.compile_interval == 0.0:
+            return True
+        return monotonic() >= self.next_compile_time
+
+    def compilation_done(self):
+        if self.compile_interval != 0.0:
+            self.next_compile_time = monotonic() + self.compile_interval
+
     def set_decay(self, decay):
         """Set the decay, from 0 (none) to 1000 (max)."""
         if decay < 0:
@@ -414,6 +414,10 @@ def rd_hash(ref):
 # The JitCellToken class is the root of a tree of traces.  Each branch ends
 # in a jump which goes to a LABEL operation; or it ends in a FINISH.
 
+# the iteration counter of the loops compiled by the baseline tier, see
+# MetaInterp.count_baseline_iteration()
+TIER_UP_COUNTER = lltype.GcArray(lltype.Signed)
+
 class JitCellToken(AbstractDescr):
     """Used for rop.JUMP, giving the target of the jump.
     This is different from TreeLoop: the TreeLoop class contains the
@@ -427,10 +431,14 @@ class JitCellToken(AbstractDescr):
     failed_states = None
     retraced_count = 0
     invalidated = False
+    is_baseline = False     # compiled by the baseline tier, see warmstate
+    tier_up_counter = lltype.nullptr(TIER_UP_COUNTER)   # if is_baseline
     outermost_jitdriver_sd = None
     # and more data specified by the backend when the loop is compiled
     number = -1
     generation = r_int64(0)
+    # bytes of machine code and resume data of the loop and its bridges
+    code_size = 0
     # one purpose of LoopToken is to keep alive the CompiledLoopToken
     # returned by the backend.  When the LoopToken goes away, the
     # CompiledLoopToken has its __del__ called, which frees the assembler
@@ -2,6 +2,7 @@ import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
 from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.listsort import make_timsort_class
 
 #
 # Logic to decide which loops are old and not used any more.
@@ -19,6 +20,18 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Independently, if a maximum number of bytes is set, then the size of
+# the machine code and the resume data of each loop and its bridges is
+# recorded in 'looptoken.code_size', and their sum over 'alive_loops' is
+# kept up to date in 'resident_bytes'.  Every time we are about to compile
+# something new, if the loops in 'alive_loops' use more than that, the
+# least recently used ones are removed until they fit again.
+#
+
+def _generation_lt(looptoken1, looptoken2):
+    return looptoken1.generation < looptoken2.generation
+
+LoopTokenGenerationSort = make_timsort_class(lt=_generation_lt)
 
 class MemoryManager(object):
 
@@ -38,6 +51,9 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.resident_bytes = 0
+        self.max_bytes = 0
+        self.num_evicted = 0
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,16 +65,62 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_bytes(self, max_bytes):
+        if max_bytes < 0:
+            max_bytes = 0
+        self.max_bytes = max_bytes
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
+        if self.max_bytes > 0:
+            self._evict_least_recently_used()
 
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            if looptoken not in self.alive_loops:
+                self.alive_loops[looptoken] = None
+                self.resident_bytes += looptoken.code_size
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.resident_bytes -= looptoken.code_size
+
+    def record_code_size(self, looptoken, size):
+        """Account 'size' more bytes of machine code and resume data to
+        'looptoken', for a new loop or for a bridge attached to it."""
+        looptoken.code_size += size
+        if looptoken in self.alive_loops:
+            self.resident_bytes += size
+
+    def get_resident_size(self):
+        return self.resident_bytes
+
+    def _evict_least_recently_used(self):
+        if self.resident_bytes <= self.max_bytes:
+            return
+        debug_start("jit-mem-evict")
+        debug_print("Resident bytes before:", self.resident_bytes)
+        looptokens = self.alive_loops.keys()
+        LoopTokenGenerationSort(looptokens).sort()
+        # never evict the loops that were used or compiled since the
+        # previous generation
+        min_generation = self.current_generation - 1
+        evicted = 0
+        for looptoken in looptokens:
+            if self.resident_bytes <= self.max_bytes:
+                break
+            if looptoken.generation >= min_generation:
+                break
+            self._forget_loop(looptoken)
+            evicted += 1
+        self.num_evicted += evicted
+        debug_print("Loop tokens evicted:", evicted)
+        debug_print("Resident bytes after:", self.resident_bytes)
+        debug_stop("jit-mem-evict")
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,7 +132,7 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
@@ -86,4 +148,5 @@ class MemoryManager(object):
         debug_start("jit-mem-releaseall")
         debug_print("Loop tokens cleared:", len(self.alive_loops))
         self.alive_loops.clear()
+        self.resident_bytes = 0
         debug_stop("jit-mem-releaseall")
@@ -307,6 +307,7 @@ class Trace(BaseTrace):
         self._pos = self._start
         self.inputargs = inputargs
         self.tag_overflow = False
+        self.tier_up_resume_position = -1
 
     def append(self, v):
         model = get_model(self)
@@ -493,6 +494,12 @@ class Trace(BaseTrace):
     def _encode_cast(self, i):
         return rffi.cast(get_model(self).STORAGE_TP, self._encode(i))
 
+    def mark_tier_up_guard(self):
+        """ The guard whose snapshot was captured last leaves a loop of
+        the baseline tier, see MetaInterp.count_baseline_iteration()
+        """
+        self.tier_up_resume_position = len(self._snapshots) - 1
+
     def create_top_snapshot(self, jitcode, pc, frame, vable_boxes, vref_boxes, after_residual_call=False):
         self._total_snapshots += 1
         array = frame.get_list_of_active_boxes(False, self.new_array, self._encode_cast,
@@ -622,6 +622,14 @@ class Optimizer(Optimization):
             # recompile the same bytecodes again and again. see
             # test_bug_segmented_trace_makes_no_progress
             self._last_guard_op = None
+        if (guard_op.rd_resume_position >= 0 and guard_op.rd_resume_position ==
+                self.trace.trace.tier_up_resume_position):
+            # the guard counting the iterations of a baseline loop gets its
+            # own descr, and no other guard may share it
+            guard_op.setdescr(compile.ResumeGuardTierUpDescr())
+            op = self.store_final_boxes_in_guard(guard_op, pendingfields)
+            self._last_guard_op = None
+            return op
         #
         if (self._last_guard_op and guard_op.getdescr() is None):
             self.metainterp_sd.profiler.count_ops(opnum,
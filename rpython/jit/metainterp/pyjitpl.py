@@ -2131,6 +2131,8 @@ class MetaInterpStaticData(object):
         self.setup_indirectcalltargets(asm.indirectcalltargets)
         self.setup_list_of_addr2name(asm.list_of_addr2name)
         self.liveness_info = "".join(asm.all_liveness)
+        self.tier_up_counter_descr = self.cpu.arraydescrof(
+            history.TIER_UP_COUNTER)
         #
         self.jitdrivers_sd = codewriter.callcontrol.jitdrivers_sd
         self.virtualref_info = codewriter.callcontrol.virtualref_info
@@ -2249,8 +2251,10 @@ class MetaInterp(object):
     exported_state = None
     last_exc_box = None
     _last_op = None
+    tier_up_counter = lltype.nullptr(history.TIER_UP_COUNTER)
 
-    def __init__(self, staticdata, jitdriver_sd, force_finish_trace=False):
+    def __init__(self, staticdata, jitdriver_sd, force_finish_trace=False,
+                 baseline_tier=False, tier_up_token=None):
         self.staticdata = staticdata
         self.cpu = staticdata.cpu
         self.jitdriver_sd = jitdriver_sd
@@ -2278,6 +2282,16 @@ class MetaInterp(object):
         # with a GUARD_ALWAYS_FAILS (and an unreachable finish that raises
         # AssertionError)
         self.force_finish_trace = force_finish_trace
+        # set to true to compile the loop with the baseline tier, i.e.
+        # without unrolling (see the 'tier_up_threshold' parameter)
+        self.baseline_tier = baseline_tier
+        if baseline_tier:
+            self.tier_up_counter = lltype.malloc(history.TIER_UP_COUNTER, 1)
+            self.tier_up_counter[0] = (
+                jitdriver_sd.warmstate.tier_up_threshold)
+        # the loop of the baseline tier that we are tracing again with the
+        # full optimizer: we must not close the new trace into it
+        self.tier_up_token = tier_up_token
 
     def retrace_needed(self, trace, exported_state):
         self.partial_trace = trace
@@ -2855,7 +2869,8 @@ class MetaInterp(object):
         # we end now.
 
         can_use_unroll = (self.staticdata.cpu.supports_guard_gc_type and
-            'unroll' in self.jitdriver_sd.warmstate.enable_opts)
+            'unroll' in self.jitdriver_sd.warmstate.enable_opts and
+            not self.baseline_tier)
         for j in range(len(self.current_merge_points)-1, -1, -1):
             original_boxes, start = self.current_merge_points[j]
             assert len(original_boxes) == len(live_arg_boxes)
@@ -2866,6 +2881,8 @@ class MetaInterp(object):
                     raise SwitchToBlackhole(Counters.ABORT_BAD_LOOP) # For now
             # Found!  Compile it as a loop.
             # raises in case it works -- which is the common case
+            if self.baseline_tier:
+                baseline_cut = self.count_baseline_iteration()
             self.history.trace.tracing_done()
             if self.partial_trace:
                 target_token = self.compile_retrace(
@@ -2893,6 +2910,8 @@ class MetaInterp(object):
                     #
                     self.staticdata.log('cancelled too many times!')
                     raise SwitchToBlackhole(Counters.ABORT_BAD_LOOP)
+            if self.baseline_tier:
+                self.cancel_baseline_iteration(baseline_cut)
             self.exported_state = None
             self.staticdata.log('cancelled, tracing more...')
 
@@ -2900,6 +2919,40 @@ class MetaInterp(object):
         start = self.history.get_trace_position()
         self.current_merge_points.append((live_arg_boxes, start))
 
+    def count_baseline_iteration(self):
+        """Record, at the end of a loop compiled by the baseline tier,
+        operations that decrement its iteration counter and leave the loop
+        when it becomes negative.  The interpreter then traces the loop
+        again with the full optimizer (see maybe_compile_and_run() in
+        warmstate.py), even if the loop is never left otherwise.  Returns
+        the position to give to cancel_baseline_iteration()."""
+        cut_at = self.history.get_trace_position()
+        descr = self.staticdata.tier_up_counter_descr
+        box_counter = ConstPtr(lltype.cast_opaque_ptr(llmemory.GCREF,
+                                                      self.tier_up_counter))
+        box_count = self.execute_and_record(rop.GETARRAYITEM_GC_I, descr,
+                                            box_counter, ConstInt(0))
+        box_count = self.execute_and_record(rop.INT_SUB, None, box_count,
+                                            ConstInt(1))
+        self.execute_and_record(rop.SETARRAYITEM_GC, descr, box_counter,
+                                ConstInt(0), box_count)
+        box_cond = self.execute_and_record(rop.INT_GE, None, box_count,
+                                           ConstInt(0))
+        assert box_cond.getint()
+        self.history.record1(rop.GUARD_TRUE, box_cond, None)
+        self.capture_resumedata(-1)
+        self.history.trace.mark_tier_up_guard()
+        return cut_at
+
+    def cancel_baseline_iteration(self, cut_at):
+        """The loop was not compiled and tracing goes on: remove the
+        operations recorded by count_baseline_iteration(), and undo the
+        decrement of the counter done while recording them."""
+        self.history.cut(cut_at)
+        self.history.trace.tier_up_resume_position = -1
+        self.heapcache.reset()
+        self.tier_up_counter[0] += 1
+
     def _unpack_boxes(self, boxes, start, stop):
         ints = []; refs = []; floats = []
         for i in range(start, stop):
@@ -3010,7 +3063,10 @@ class MetaInterp(object):
         cell = JitCell.get_jit_cell_at_key(greenkey)
         if cell is None:
             return None
-        return cell.get_procedure_token()
+        token = cell.get_procedure_token()
+        if token is not None and token is self.tier_up_token:
+            return None
+        return token
 
     def compile_loop(self, original_boxes, live_arg_boxes, start, use_unroll):
         num_green_args = self.jitdriver_sd.num_green_args
@@ -3025,6 +3081,10 @@ class MetaInterp(object):
             live_arg_boxes[num_green_args:], use_unroll=use_unroll)
         if target_token is not None:
             assert isinstance(target_token, TargetToken)
+            if self.baseline_tier:
+                jitcell_token = target_token.targeting_jitcell_token
+                jitcell_token.is_baseline = True
+                jitcell_token.tier_up_counter = self.tier_up_counter
             self.jitdriver_sd.warmstate.attach_procedure_to_interp(
                 greenkey, target_token.targeting_jitcell_token)
             self.staticdata.stats.add_jitcell_token(
@@ -182,6 +182,8 @@ class ResumeDataLoopMemo(object):
         self.refs = new_ref_dict()
         self.cached_boxes = {}
         self.cached_virtuals = {}
+        # the encoded prefixes of the numberings, see resumecode.py
+        self.shared_prefixes = {}
 
         self.nvirtuals = 0
         self.nvholes = 0
@@ -275,7 +277,12 @@ class ResumeDataLoopMemo(object):
 
         self._number_boxes(snapshot_iter, arr, numb_state)
 
-        for snapshot in snapshot_iter.framestack:
+        framestack = snapshot_iter.framestack
+        for i in range(len(framestack)):
+            snapshot = framestack[i]
+            if i == len(framestack) - 1:
+                # everything before the innermost frame can be shared
+                numb_state.mark_prefix_end()
             jitcode_index, pc = snapshot_iter.unpack_jitcode_pc(snapshot)
             numb_state.append_int(jitcode_index)
             numb_state.append_int(pc)
@@ -470,7 +477,8 @@ class ResumeDataVirtualAdder(VirtualVisitor):
         numb_state.patch(1, len(liveboxes))
 
         self._add_optimizer_sections(numb_state, liveboxes, liveboxes_from_env)
-        storage.rd_numb = numb_state.create_numbering()
+        storage.rd_numb = numb_state.create_numbering(
+            self.memo.shared_prefixes)
         storage.rd_consts = self.memo.consts
         return liveboxes[:]
 
@@ -20,6 +20,13 @@
 
   # ----- optimization section
   <more code>                                      further sections according to bridgeopt.py
+
+The virtualizable, the virtualrefs and all frames but the innermost one
+are often the same for many guards of a loop.  When the bytes encoding
+them are identical to the ones of an earlier guard compiled with the same
+ResumeDataLoopMemo, they are stored only once, in a separate numbering
+pointed to by the 'prefix' field.  Its content is logically inserted
+after the first two items (the sizes); the Reader takes care of that.
 """
 
 from rpython.rtyper.lltypesystem import rffi, lltype
@@ -27,10 +34,16 @@ from rpython.rlib import objectmodel
 
 NUMBERINGP = lltype.Ptr(lltype.GcForwardReference())
 NUMBERING = lltype.GcStruct('Numbering',
+                            ('prefix', NUMBERINGP),
                             ('code', lltype.Array(rffi.UCHAR)))
 NUMBERINGP.TO.become(NUMBERING)
 NULL_NUMBER = lltype.nullptr(NUMBERING)
 
+# number of items before the shared prefix, if any
+PREFIX_POSITION = 2
+# below that many bytes, sharing the prefix is not worth a separate object
+MIN_SHARED_PREFIX = 16
+
 def append_numbering(lst, item):
     item = rffi.cast(lltype.Signed, item)
     item *= 2
@@ -72,17 +85,42 @@ def numb_next_n_items(numb, size, index):
         _, index = numb_next_item(numb, index)
     return index
 
-def unpack_numbering(numb):
-    l = []
-    i = 0
-    while i < len(numb.code):
+def _unpack_range(numb, start, stop, l):
+    i = start
+    while i < stop:
         next, i = numb_next_item(numb, i)
         l.append(next)
+
+def unpack_numbering(numb):
+    l = []
+    if numb.prefix:
+        header_end = numb_next_n_items(numb, PREFIX_POSITION, 0)
+        _unpack_range(numb, 0, header_end, l)
+        _unpack_range(numb.prefix, 0, len(numb.prefix.code), l)
+        _unpack_range(numb, header_end, len(numb.code), l)
+    else:
+        _unpack_range(numb, 0, len(numb.code), l)
     return l
 
+def _encode_items(items, start, stop):
+    final = objectmodel.newlist_hint((stop - start) * 3)
+    for i in range(start, stop):
+        append_numbering(final, items[i])
+    return final
+
+def _make_numbering(final, prefix=NULL_NUMBER):
+    numb = lltype.malloc(NUMBERING, len(final))
+    numb.prefix = prefix
+    for i, elt in enumerate(final):
+        numb.code[i] = elt
+    return numb
+
 class Writer(object):
     def __init__(self, size=0):
         self.current = objectmodel.newlist_hint(size)
+        # the items between PREFIX_POSITION and this index may be shared
+        # with other numberings, see create_numbering()
+        self.prefix_end = 0
 
     def append_short(self, item):
         self.current.append(item)
@@ -92,14 +130,32 @@ class Writer(object):
         assert rffi.cast(lltype.Signed, short) == item
         return self.append_short(short)
 
-    def create_numbering(self):
-        final = objectmodel.newlist_hint(len(self.current) * 3)
-        for item in self.current:
-            append_numbering(final, item)
-        numb = lltype.malloc(NUMBERING, len(final))
-        for i, elt in enumerate(final):
-            numb.code[i] = elt
-        return numb
+    def mark_prefix_end(self):
+        self.prefix_end = len(self.current)
+
+    def create_numbering(self, shared_prefixes=None):
+        """Build the NUMBERING.  If 'shared_prefixes' is a dict, it is
+        used to look up and record the prefixes (as strings of encoded
+        bytes) seen so far: a prefix is shared from the second time it
+        is seen on."""
+        current = self.current
+        if (shared_prefixes is not None and
+                self.prefix_end > PREFIX_POSITION):
+            header = _encode_items(current, 0, PREFIX_POSITION)
+            prefix = _encode_items(current, PREFIX_POSITION, self.prefix_end)
+            if len(prefix) >= MIN_SHARED_PREFIX:
+                key = ''.join([chr(rffi.cast(lltype.Signed, c))
+                               for c in prefix])
+                if key in shared_prefixes:
+                    shared = shared_prefixes[key]
+                    if not shared:
+                        shared = _make_numbering(prefix)
+                        shared_prefixes[key] = shared
+                    final = header + _encode_items(current, self.prefix_end,
+                                                   len(current))
+                    return _make_numbering(final, shared)
+                shared_prefixes[key] = NULL_NUMBER
+        return _make_numbering(_encode_items(current, 0, len(current)))
 
     def patch_current_size(self, index):
         self.patch(index, len(self.current))
@@ -116,27 +172,47 @@ def create_numbering(l):
 
 class Reader(object):
     def __init__(self, code):
-        self.code = code
+        self.numb = code
+        self.code = code # the numbering being read: 'numb' or its prefix
         self.cur_pos = 0 # index into the code
         self.items_read = 0 # number of items read
+        self.resume_pos = -1
+        self.stop_pos = len(code.code)
+        if code.prefix:
+            # first read the header of 'numb', then its prefix, and then
+            # continue with the rest of 'numb' from 'resume_pos'
+            self.resume_pos = numb_next_n_items(code, PREFIX_POSITION, 0)
+            self.stop_pos = self.resume_pos
+
+    def _next_segment(self):
+        if self.code is self.numb:
+            self.code = self.numb.prefix
+            self.cur_pos = 0
+            self.stop_pos = len(self.code.code)
+        else:
+            self.code = self.numb
+            self.cur_pos = self.resume_pos
+            self.stop_pos = len(self.code.code)
+            self.resume_pos = -1
 
     def next_item(self):
+        if self.cur_pos == self.stop_pos and self.resume_pos >= 0:
+            self._next_segment()
         result, self.cur_pos = numb_next_item(self.code, self.cur_pos)
         self.items_read += 1
         return result
 
     def peek(self):
+        if self.cur_pos == self.stop_pos and self.resume_pos >= 0:
+            self._next_segment()
         result, _ = numb_next_item(self.code, self.cur_pos)
         return result
 
     def jump(self, size):
         """ jump n items forward without returning anything """
-        index = self.cur_pos
         for i in range(size):
-            _, index = numb_next_item(self.code, index)
-        self.items_read += size
-        self.cur_pos = index
+            self.next_item()
 
     def unpack(self):
         # mainly for debugging
-        return unpack_numbering(self.code)
+        return unpack_numbering(self.numb)
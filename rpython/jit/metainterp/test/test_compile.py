@@ -171,3 +171,24 @@ def test_compile_tmp_callback():
         assert lltype.cast_opaque_ptr(lltype.Ptr(EXC), e.value) == llexc
     else:
         assert 0, "should have raised"
+
+def test_estimate_code_size_shared_prefix():
+    from rpython.jit.metainterp.resoperation import ResOperation, rop
+    from rpython.jit.metainterp.resumecode import _make_numbering, NULL_NUMBER
+    from rpython.rtyper.lltypesystem import rffi
+    def numbering(size, prefix=NULL_NUMBER):
+        return _make_numbering([rffi.cast(rffi.UCHAR, 2)] * size, prefix)
+    class asminfo:
+        asmlen = 100
+    prefix = numbering(20)
+    operations = []
+    for size in [5, 6, 7]:
+        descr = compile.ResumeGuardDescr()
+        descr.rd_numb = numbering(size, prefix)
+        operations.append(ResOperation(rop.GUARD_TRUE, [ConstInt(1)], descr))
+    descr = compile.ResumeGuardDescr()
+    descr.rd_numb = numbering(3)
+    operations.append(ResOperation(rop.GUARD_FALSE, [ConstInt(0)], descr))
+    # the prefix shared by the first three guards is counted once
+    assert compile.estimate_code_size(asminfo, operations) == (
+        100 + 5 + 6 + 7 + 20 + 3)
@@ -108,6 +108,29 @@ def test_install_new_chain():
     assert d4.next is None
 
 
+def test_get_current_fraction():
+    jc = JitCounter()
+    incr = jc.compute_threshold(4)
+    assert jc.get_current_fraction(index2hash(jc, 104)) == 0.0
+    jc.tick(index2hash(jc, 104), incr)
+    assert 0.24 < jc.get_current_fraction(index2hash(jc, 104)) < 0.26
+    assert jc.get_current_fraction(index2hash(jc, 104, 1)) == 0.0
+    jc.change_current_fraction(index2hash(jc, 104, 1), 0.5)
+    assert jc.get_current_fraction(index2hash(jc, 104, 1)) == 0.5
+    assert 0.24 < jc.get_current_fraction(index2hash(jc, 104)) < 0.26
+
+def test_compile_interval():
+    jc = JitCounter()
+    assert jc.may_start_compiling()
+    jc.compilation_done()
+    assert jc.may_start_compiling()
+    jc.set_compile_interval(3600 * 1000)
+    assert jc.may_start_compiling()
+    jc.compilation_done()
+    assert not jc.may_start_compiling()
+    jc.set_compile_interval(0)
+    assert jc.may_start_compiling()
+
 def test_change_current_fraction():
     jc = JitCounter()
     incr = jc.compute_threshold(8)
@@ -1,6 +1,7 @@
 
 import py
 from rpython.rlib.jit import JitDriver, JitHookInterface, Counters, dont_look_inside
+from rpython.rlib.jit import set_param
 from rpython.rlib import jit_hooks
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.codewriter.policy import JitPolicy
@@ -202,6 +203,52 @@ class JitHookInterfaceTests(object):
         self.meta_interp(main, [5])
         self.check_jitcell_token_count(2)
 
+    def test_counter_fraction(self):
+        driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
+
+        def loop(i, s):
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                i -= 1
+
+        def main(s):
+            assert jit_hooks.get_counter_fraction("jit", s) == 0.0
+            loop(2, s)
+            fraction = jit_hooks.get_counter_fraction("jit", s)
+            assert 0.0 < fraction < 1.0
+            loop(30, s)
+            assert jit_hooks.get_counter_fraction("jit", s) == 1.0
+            # pre-seed a cold greenkey: it is traced much sooner
+            jit_hooks.set_counter_fraction("jit", 0.98, s + 1)
+            assert jit_hooks.get_counter_fraction("jit", s + 1) > 0.9
+            loop(3, s + 1)
+            assert jit_hooks.get_jitcell_at_key("jit", s + 1)
+
+        self.meta_interp(main, [5])
+        self.check_jitcell_token_count(2)
+
+    def test_compile_interval(self):
+        driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
+
+        def loop(i, s):
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                i -= 1
+
+        def main(s):
+            set_param(None, 'compile_interval', 3600 * 1000)
+            loop(30, s)
+            assert jit_hooks.get_jitcell_at_key("jit", s)
+            # too soon: the second loop is not compiled
+            loop(30, s + 1)
+            assert not jit_hooks.get_jitcell_at_key("jit", s + 1)
+            set_param(None, 'compile_interval', 0)
+            loop(30, s + 1)
+            assert jit_hooks.get_jitcell_at_key("jit", s + 1)
+
+        self.meta_interp(main, [5])
+        self.check_jitcell_token_count(2)
+
     def test_dont_trace_here(self):
         driver = JitDriver(greens = ['s'], reds = ['i', 'k'], name='jit')
 
@@ -349,6 +396,29 @@ class JitHookInterfaceTests(object):
                                no_stats_history=True)
         assert res == 42
 
+    def test_memmgr_stats(self):
+        driver = JitDriver(greens = ['k'], reds = ['i'])
+        def loop(i, k):
+            while i > 0:
+                driver.jit_merge_point(i=i, k=k)
+                i -= 1
+        def main():
+            loop(30, 1)
+            if jit_hooks.stats_memmgr_alive_loops(None) != 1:
+                return 1000 + jit_hooks.stats_memmgr_alive_loops(None)
+            if jit_hooks.stats_memmgr_resident_bytes(None) <= 0:
+                return 1500
+            loop(30, 2)
+            loop(30, 3)
+            if jit_hooks.stats_memmgr_alive_loops(None) != 3:
+                return 2000 + jit_hooks.stats_memmgr_alive_loops(None)
+            if jit_hooks.stats_memmgr_evicted_loops(None) != 0:
+                return 2500
+            return 42
+
+        res = self.meta_interp(main, [], no_stats_history=True)
+        assert res == 42
+
 
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
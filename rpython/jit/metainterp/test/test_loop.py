@@ -1232,6 +1232,102 @@ class LoopTest(object):
         self.meta_interp(main, [False])
         self.check_trace_count_at_most(10)
 
+    def test_tier_up(self):
+        myjitdriver = JitDriver(greens = [], reds = ['n', 'x'])
+        def f(n):
+            x = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, x=x)
+                x += n
+                n -= 1
+            return x
+        def main(k):
+            set_param(myjitdriver, 'tier_up_threshold', 3)
+            total = 0
+            for i in range(k):
+                total += f(20)
+            return total
+        res = self.meta_interp(main, [10])
+        assert res == 2100
+        # first compiled without unrolling, then again with the full
+        # optimizer once the baseline loop has been entered a few times
+        tokens = [wref() for wref in get_stats().jitcell_token_wrefs]
+        assert [token.is_baseline for token in tokens] == [True, False]
+        self.check_jitcell_token_count(2)
+
+    def test_tier_up_single_loop(self):
+        myjitdriver = JitDriver(greens = [], reds = ['n', 'x'])
+        def f(n):
+            set_param(myjitdriver, 'tier_up_threshold', 50)
+            x = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, x=x)
+                x += n
+                n -= 1
+            return x
+        # the loop is entered only once, but left after 50 iterations
+        # to be compiled again with the full optimizer
+        res = self.meta_interp(f, [500])
+        assert res == 125250
+        tokens = [wref() for wref in get_stats().jitcell_token_wrefs]
+        assert [token.is_baseline for token in tokens] == [True, False]
+        self.check_jitcell_token_count(2)
+
+    def test_baseline_threshold(self):
+        myjitdriver = JitDriver(greens = [], reds = ['n', 'x'])
+        def f(n):
+            set_param(myjitdriver, 'threshold', 1000)
+            set_param(myjitdriver, 'tier_up_threshold', 1000)
+            set_param(myjitdriver, 'baseline_threshold', 5)
+            x = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, x=x)
+                x += n
+                n -= 1
+            return x
+        # the loop is warm, not hot: it only gets compiled by the
+        # baseline tier
+        res = self.meta_interp(f, [50])
+        assert res == 1275
+        tokens = [wref() for wref in get_stats().jitcell_token_wrefs]
+        assert [token.is_baseline for token in tokens] == [True]
+
+    def test_tier_up_cancelled_compilation(self, monkeypatch):
+        from rpython.jit.metainterp import compile
+        myjitdriver = JitDriver(greens = [], reds = ['n', 'x'])
+        def f(n):
+            set_param(myjitdriver, 'tier_up_threshold', 1000)
+            set_param(myjitdriver, 'max_unroll_loops', 1)
+            x = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, x=x)
+                x += n
+                n -= 1
+            return x
+        def get_counter():
+            [wref] = get_stats().jitcell_token_wrefs
+            return wref().tier_up_counter[0]
+        res = self.meta_interp(f, [100])
+        assert res == 5050
+        counter = get_counter()
+        #
+        original_compile_loop = compile.compile_loop
+        calls = []
+        def compile_loop(*args, **kwds):
+            calls.append(None)
+            if len(calls) == 1:
+                return None     # cancelled, tracing more
+            return original_compile_loop(*args, **kwds)
+        monkeypatch.setattr(compile, 'compile_loop', compile_loop)
+        res = self.meta_interp(f, [100])
+        assert res == 5050
+        assert len(calls) == 2
+        # the operations counting the iterations were recorded only once,
+        # and the cancelled attempt didn't decrement the counter: the loop
+        # was traced over one more iteration, so it ran one less
+        self.check_resops(setarrayitem_gc=1, getarrayitem_gc_i=1)
+        assert get_counter() == counter + 1
+
 
 class TestLLtype(LoopTest, LLJitMixin):
     pass
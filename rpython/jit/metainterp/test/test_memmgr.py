@@ -21,6 +21,7 @@ from rpython.rlib import rgc
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    code_size = 0
 
 
 class _TestMemoryManager:
@@ -78,6 +79,71 @@ class _TestMemoryManager:
             else:
                 assert tokens[i] in memmgr.alive_loops
 
+    def test_max_bytes(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_bytes(250)
+        tokens = [FakeLoopToken() for i in range(10)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.record_code_size(token, 100)
+            memmgr.next_generation()
+        # the two most recent loops are never evicted
+        assert memmgr.alive_loops == dict.fromkeys(tokens[8:])
+        assert memmgr.get_resident_size() == 200
+        assert memmgr.num_evicted == 8
+
+    def test_max_bytes_lru(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        tokens = [FakeLoopToken() for i in range(5)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.record_code_size(token, 100)
+            memmgr.next_generation()
+        assert memmgr.get_resident_size() == 500
+        memmgr.keep_loop_alive(tokens[0])
+        memmgr.keep_loop_alive(tokens[2])
+        memmgr.next_generation()
+        memmgr.next_generation()
+        memmgr.set_max_bytes(250)
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {tokens[0]: None, tokens[2]: None}
+        assert memmgr.num_evicted == 3
+
+    def test_max_bytes_bridges(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(0)
+        memmgr.set_max_bytes(1000)
+        tokens = [FakeLoopToken() for i in range(3)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.record_code_size(token, 100)
+            memmgr.next_generation()
+        memmgr.record_code_size(tokens[0], 900)    # a bridge
+        memmgr.next_generation()
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {tokens[1]: None, tokens[2]: None}
+
+    def test_resident_size(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(3, 1)
+        token = FakeLoopToken()
+        memmgr.keep_loop_alive(token)
+        memmgr.record_code_size(token, 100)
+        memmgr.keep_loop_alive(token)
+        assert memmgr.get_resident_size() == 100
+        for i in range(3):
+            memmgr.next_generation()
+        assert memmgr.alive_loops == {}
+        assert memmgr.get_resident_size() == 0
+        memmgr.record_code_size(token, 50)     # a bridge of a freed loop
+        assert memmgr.get_resident_size() == 0
+        memmgr.keep_loop_alive(token)
+        assert memmgr.get_resident_size() == 150
+        memmgr.release_all_loops()
+        assert memmgr.get_resident_size() == 0
+
 
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
@@ -709,6 +709,34 @@ def test_ResumeDataLoopMemo_number():
         2, 1, tag(3, TAGINT), tag(0, TAGVIRTUAL), tag(0, TAGBOX), tag(3, TAGINT)
         ] + [0, 0]
 
+def test_ResumeDataLoopMemo_shared_prefix():
+    boxes = [IntFrontendOp(i) for i in range(12)]
+    metainterp_sd = FakeMetaInterpStaticData()
+    t = Trace(boxes, metainterp_sd)
+    snap = t.create_snapshot(FakeJitCode("jitcode", 0), 0, Frame(boxes),
+                             False)
+    for i in range(3):
+        t.append(0)
+        snapi = t.create_top_snapshot(FakeJitCode("jitcode", 0), 2 + i,
+                                      Frame(boxes[i:i + 2]), [], [])
+        snapi.prev = snap
+
+    memo = ResumeDataLoopMemo(metainterp_sd)
+    iter = t.get_iter()
+    numbs = []
+    for i in range(3):
+        numb_state = memo.number(i, iter)
+        numbs.append(numb_state.create_numbering(memo.shared_prefixes))
+    outer = [0, 0, 0, 0] + [tag(j, TAGBOX) for j in range(12)]
+    for i in range(3):
+        assert unpack_numbering(numbs[i]) == ([22, 0] + outer +
+            [0, 2 + i, tag(i, TAGBOX), tag(i + 1, TAGBOX)])
+    # the outer frame is stored only once for the second and third guards
+    assert not numbs[0].prefix
+    assert numbs[1].prefix
+    assert numbs[2].prefix == numbs[1].prefix
+    assert len(numbs[1].code) < len(numbs[0].code)
+
 @given(strategies.lists(
     strategies.builds(IntFrontendOp, strategies.just(0)) | intconsts,
     min_size=1))
@@ -1,5 +1,5 @@
 from rpython.jit.metainterp.resumecode import create_numbering,\
-    unpack_numbering, Reader, Writer
+    unpack_numbering, Reader, Writer, MIN_SHARED_PREFIX
 from rpython.rtyper.lltypesystem import lltype
 
 from hypothesis import strategies, given, example
@@ -60,3 +60,39 @@ def test_patch(l):
         n = w.create_numbering()
         assert unpack_numbering(n)[1:] == l
         assert unpack_numbering(n)[0] == middle + 1
+
+@hypothesis_and_examples
+def test_shared_prefix(l):
+    shared_prefixes = {}
+    numbs = []
+    for tail in [[], [5, -6], [700, 8, 9]]:
+        w = Writer()
+        w.append_int(len(l) + len(tail) + 2)
+        w.append_int(len(tail))
+        for num in l:
+            w.append_int(num)
+        w.mark_prefix_end()
+        for num in tail:
+            w.append_int(num)
+        n = w.create_numbering(shared_prefixes)
+        expected = [len(l) + len(tail) + 2, len(tail)] + l + tail
+        assert unpack_numbering(n) == expected
+        r = Reader(n)
+        for i, elt in enumerate(expected):
+            assert r.items_read == i
+            assert r.peek() == elt
+            assert r.next_item() == elt
+        for i in range(len(expected)):
+            r = Reader(n)
+            r.jump(i)
+            assert r.next_item() == expected[i]
+        numbs.append(n)
+    # the first numbering has its own copy, the next ones share it
+    assert not numbs[0].prefix
+    if len(create_numbering(l).code) >= MIN_SHARED_PREFIX:
+        assert numbs[1].prefix
+        assert numbs[2].prefix == numbs[1].prefix
+        assert len(numbs[1].code) < len(numbs[0].code)
+    else:
+        assert not numbs[1].prefix
+        assert not numbs[2].prefix
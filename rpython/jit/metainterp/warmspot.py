@@ -695,7 +695,8 @@ class WarmRunnerDesc(object):
                 jitdrivers_by_name[name] = jd
         m = _find_jit_markers(self.translator.graphs,
                               ('get_jitcell_at_key', 'trace_next_iteration',
-                               'dont_trace_here', 'trace_next_iteration_hash', 'mark_as_being_traced'))
+                               'dont_trace_here', 'trace_next_iteration_hash', 'mark_as_being_traced',
+                               'get_counter_fraction', 'set_counter_fraction'))
         accessors = {}
 
         def get_accessor(name, jitdriver_name, function, ARGS, green_arg_spec):
@@ -707,10 +708,13 @@ class WarmRunnerDesc(object):
                  'lltype': lltype}
             arg_spec = ", ".join([("arg%d" % i) for i in range(len(ARGS))])
             arg_converters = []
+            # set_counter_fraction() takes the fraction before the greenkey
+            first_green = int(name == 'set_counter_fraction')
             for i, spec in enumerate(green_arg_spec):
                 if isinstance(spec, lltype.Ptr):
-                    arg_converters.append("arg%d = lltype.cast_opaque_ptr(type%d, arg%d)" % (i, i, i))
-                    d['type%d' % i] = spec
+                    j = i + first_green
+                    arg_converters.append("arg%d = lltype.cast_opaque_ptr(type%d, arg%d)" % (j, j, j))
+                    d['type%d' % j] = spec
             convert = ";".join(arg_converters)
             if name == 'get_jitcell_at_key':
                 exec py.code.Source("""
@@ -719,6 +723,13 @@ class WarmRunnerDesc(object):
                     return cast_instance_to_gcref(function(%s))
                 """ % (arg_spec, convert, arg_spec)).compile() in d
                 FUNC = lltype.Ptr(lltype.FuncType(ARGS, llmemory.GCREF))
+            elif name == 'get_counter_fraction':
+                exec py.code.Source("""
+                def accessor(%s):
+                    %s
+                    return function(%s)
+                """ % (arg_spec, convert, arg_spec)).compile() in d
+                FUNC = lltype.Ptr(lltype.FuncType(ARGS, lltype.Float))
             elif name == "trace_next_iteration_hash":
                 exec py.code.Source("""
                 def accessor(arg0):
@@ -751,6 +762,10 @@ class WarmRunnerDesc(object):
                 func = JitCell.mark_as_being_traced
             elif op.args[0].value == 'trace_next_iteration_hash':
                 func = JitCell.trace_next_iteration_hash
+            elif op.args[0].value == 'get_counter_fraction':
+                func = JitCell.get_counter_fraction
+            elif op.args[0].value == 'set_counter_fraction':
+                func = JitCell.set_counter_fraction
             else:
                 func = JitCell._trace_next_iteration
             argspec = jitdrivers_by_name[jitdriver_name]._green_args_spec
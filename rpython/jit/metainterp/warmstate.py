@@ -138,6 +138,7 @@ JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
 JC_FORCE_FINISH    = 0x10
+JC_FULL_TIER       = 0x20
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -188,6 +189,10 @@ class BaseJitCell(object):
         JC_FORCE_FINISH: when from a cell with that flag set, if the trace
         becomes too long, "segment" it, ie finish it with a guard_always_fails.
         this prevents re-tracing and failing this again and again.
+
+        JC_FULL_TIER: with 'tier_up_threshold', the loop compiled by the
+        baseline tier for this greenkey got hot, so trace it again with
+        the full optimizer.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -234,6 +239,11 @@ class BaseJitCell(object):
 
 
 class WarmEnterState(object):
+    # the parameters used by _update_increment_threshold(), until they
+    # are all set
+    threshold = 0
+    baseline_tier = False
+    baseline_threshold = 0
 
     def __init__(self, warmrunnerdesc, jitdriver_sd):
         "NOT_RPYTHON"
@@ -256,7 +266,8 @@ class WarmEnterState(object):
         return self.warmrunnerdesc.jitcounter.compute_threshold(threshold)
 
     def set_param_threshold(self, threshold):
-        self.increment_threshold = self._compute_threshold(threshold)
+        self.threshold = threshold
+        self._update_increment_threshold()
 
     def set_param_function_threshold(self, threshold):
         self.increment_function_threshold = self._compute_threshold(threshold)
@@ -274,6 +285,30 @@ class WarmEnterState(object):
     def set_param_decay(self, decay):
         self.warmrunnerdesc.jitcounter.set_decay(decay)
 
+    def set_param_compile_interval(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        self.warmrunnerdesc.jitcounter.set_compile_interval(value)
+
+    def set_param_tier_up_threshold(self, value):
+        self.baseline_tier = value > 0
+        self.tier_up_threshold = value
+        self._update_increment_threshold()
+
+    def set_param_baseline_threshold(self, value):
+        self.baseline_threshold = value
+        self._update_increment_threshold()
+
+    def _update_increment_threshold(self):
+        # with the baseline tier, loops are compiled quickly when they
+        # reach the lower 'baseline_threshold'; the full optimizer only
+        # runs on those that then stay hot for 'tier_up_threshold' more
+        # iterations
+        threshold = self.threshold
+        if (self.baseline_tier and
+                0 < self.baseline_threshold < threshold):
+            threshold = self.baseline_threshold
+        self.increment_threshold = self._compute_threshold(threshold)
+
     def set_param_inlining(self, value):
         self.inlining = value
 
@@ -301,6 +336,12 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_code_cache_limit(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_max_bytes(value * 1024)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -388,6 +429,7 @@ class WarmEnterState(object):
         cpu = self.cpu
         jitcounter = self.warmrunnerdesc.jitcounter
         result_type = jitdriver_sd.result_type
+        warmstate = self
 
         def execute_assembler(loop_token, *args):
             # Call the backend to run the 'looptoken' with the given
@@ -431,6 +473,11 @@ class WarmEnterState(object):
             from rpython.jit.metainterp.pyjitpl import MetaInterp
             if not confirm_enter_jit(*args):
                 return
+            if not jitcounter.may_start_compiling():
+                # too soon after the previous compilation: try again
+                # in a few iterations
+                jitcounter.change_current_fraction(hash, 0.98)
+                return
             jitcounter.decay_all_counters()
             if rstack.stack_almost_full():
                 return
@@ -438,15 +485,27 @@ class WarmEnterState(object):
             if cell is None:
                 cell = JitCell(*greenargs)
                 jitcounter.install_new_cell(hash, cell)
+            tier_up_token = None
+            if cell.flags & JC_FULL_TIER:
+                # the loop of the baseline tier, if any, stays attached to
+                # the cell until the new loop replaces it; the tracer is
+                # told not to close the new trace into it
+                procedure_token = cell.get_procedure_token()
+                if procedure_token is not None and procedure_token.is_baseline:
+                    tier_up_token = procedure_token
             # start tracing
             metainterp = MetaInterp(
                 metainterp_sd, jitdriver_sd,
-                force_finish_trace=bool(cell.flags & JC_FORCE_FINISH))
+                force_finish_trace=bool(cell.flags & JC_FORCE_FINISH),
+                baseline_tier=(warmstate.baseline_tier and
+                               not (cell.flags & JC_FULL_TIER)),
+                tier_up_token=tier_up_token)
             cell.flags |= JC_TRACING | JC_TRACING_OCCURRED
             try:
                 metainterp.compile_and_run_once(jitdriver_sd, *args)
             finally:
                 cell.flags &= ~JC_TRACING
+                jitcounter.compilation_done()
 
         def maybe_compile_and_run(increment_threshold, *args):
             """Entry point to the JIT.  Called at the point with the
@@ -503,6 +562,17 @@ class WarmEnterState(object):
                 # has been freed
                 jitcounter.cleanup_chain(hash)
                 return
+            if (procedure_token.is_baseline and
+                    procedure_token.tier_up_counter[0] < 0):
+                # the loop compiled by the baseline tier ran enough
+                # iterations and left (see count_baseline_iteration() in
+                # pyjitpl.py): trace it again with the full optimizer.  It
+                # runs for another round of iterations if that fails.
+                procedure_token.tier_up_counter[0] = (
+                    warmstate.tier_up_threshold)
+                cell.flags |= JC_FULL_TIER
+                bound_reached(hash, cell, *args)
+                return
             if not confirm_enter_jit(*args):
                 return
             # extract and unspecialize the red arguments to pass to
@@ -623,6 +693,33 @@ class WarmEnterState(object):
                 hash = JitCell.get_uhash(*greenargs)
                 jitcounter.change_current_fraction(hash, 0.98)
 
+            @staticmethod
+            def get_counter_fraction(*greenargs):
+                """Return how close these greenargs are to being traced,
+                between 0.0 and 1.0; 1.0 if they were already compiled."""
+                hash = JitCell.get_uhash(*greenargs)
+                cell = jitcounter.lookup_chain(hash)
+                while cell is not None:
+                    if (isinstance(cell, JitCell) and
+                            cell.comparekey(*greenargs)):
+                        if cell.get_procedure_token() is not None:
+                            return 1.0
+                        break
+                    cell = cell.next
+                return jitcounter.get_current_fraction(hash)
+
+            @staticmethod
+            def set_counter_fraction(fraction, *greenargs):
+                """Pre-seed the counter of these greenargs, e.g. with a
+                value saved by get_counter_fraction() in another process.
+                Like all counters, it decays if not reached soon."""
+                if fraction > 0.98:
+                    fraction = 0.98     # like trace_next_iteration()
+                elif fraction < 0.0:
+                    fraction = 0.0
+                hash = JitCell.get_uhash(*greenargs)
+                jitcounter.change_current_fraction(hash, fraction)
+
             @staticmethod
             def trace_next_iteration_hash(hash):
                 jitcounter.change_current_fraction(hash, 0.98)
@@ -568,8 +568,12 @@ PARAMETER_DOCS = {
     'trace_eagerness': 'number of times a guard has to fail before we start compiling a bridge',
     'decay': 'amount to regularly decay counters by (0=none, 1000=max)',
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
+    'compile_interval': 'minimum number of milliseconds between the end of a compilation and the start of the next one, to avoid bursts of compilation (0=none)',
     'inlining': 'inline python functions or not (1/0)',
+    'tier_up_threshold': 'if not 0, loops are first compiled quickly without unrolling, and compiled again with the full optimizer after having run this many iterations',
+    'baseline_threshold': 'with tier_up_threshold, number of times a loop has to run for it to be compiled quickly, instead of threshold',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'code_cache_limit': 'if not 0, the maximum number of kilobytes of machine code and resume data kept; the least recently used loops are freed beyond that, an estimate',
     'retrace_limit': 'how many times we can try retracing before giving up',
     'pureop_historylength': 'how many pure operations the optimizer should remember for CSE (internal)',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
@@ -590,8 +594,12 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'trace_eagerness': 200,
               'decay': 40,
               'trace_limit': 6000,
+              'compile_interval': 0,
               'inlining': 1,
+              'tier_up_threshold': 0,
+              'baseline_threshold': 131,
               'loop_longevity': 1000,
+              'code_cache_limit': 0,
               'retrace_limit': 0,
               'pureop_historylength': 16,
               'max_retrace_guards': 15,
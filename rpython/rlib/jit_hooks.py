@@ -128,6 +128,18 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_alive_loops(warmrunnerdesc):
+    return len(warmrunnerdesc.memory_manager.alive_loops)
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_resident_bytes(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.get_resident_size()
+
+@register_helper(annmodel.SomeInteger())
+def stats_memmgr_evicted_loops(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.num_evicted
+
 @register_helper(None)
 def stats_memmgr_release_all(warmrunnerdesc):
     warmrunnerdesc.memory_manager.release_all_loops()
@@ -162,3 +174,6 @@ trace_next_iteration = _new_hook('trace_next_iteration', None)
 dont_trace_here = _new_hook('dont_trace_here', None)
 mark_as_being_traced = _new_hook('mark_as_being_traced', None)
 trace_next_iteration_hash = _new_hook('trace_next_iteration_hash', None)
+get_counter_fraction = _new_hook('get_counter_fraction', annmodel.SomeFloat())
+# set_counter_fraction(name, fraction, *greenkey)
+set_counter_fraction = _new_hook('set_counter_fraction', None)
@@ -258,6 +258,20 @@ def clock():
                   decode_timeval(a.c_ru_stime))
     return result
 
+def monotonic():
+    """Return the time in seconds from a clock that never goes backward,
+    unlike time.time().  Only the difference between two results makes
+    sense.  This falls back to time.time() on platforms where
+    clock_gettime() is not used (OS/X)."""
+    if _WIN32:
+        return win_perf_counter()
+    elif HAS_CLOCK_GETTIME:
+        with lltype.scoped_alloc(TIMESPEC) as a:
+            if c_clock_gettime(CLOCK_MONOTONIC, a) == 0:
+                return (float(rffi.getintfield(a, 'c_tv_sec')) +
+                        float(rffi.getintfield(a, 'c_tv_nsec')) * 0.000000001)
+    return time()
+
 # _______________________________________________________________
 # time.sleep()
 
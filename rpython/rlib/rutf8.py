@@ -519,8 +519,13 @@ def create_utf8_index_storage(utf8, utf8len):
     """
     arraysize = utf8len // 64 + 1
     storage = lltype.malloc(UTF8_INDEX_STORAGE, arraysize)
-    baseindex = 0
-    current = 0
+    _fill_utf8_index_storage(utf8, storage, 0, 0, utf8len)
+    return storage
+
+def _fill_utf8_index_storage(utf8, storage, current, baseindex, utf8len):
+    # fill the entries of 'storage' from 'current' onwards; 'baseindex' is
+    # the byte position of the character 64 * current, and 'utf8len' the
+    # number of characters left from there
     while True:
         storage[current].baseindex = baseindex
         next = baseindex
@@ -540,9 +545,56 @@ def create_utf8_index_storage(utf8, utf8len):
         else:
             current += 1
             baseindex = next
+            if current == len(storage):
+                break     # partial storage, see grow_utf8_index_storage()
             continue
         break
-    return storage
+
+UTF8_INDEX_STORAGE_MIN_ENTRIES = 4
+
+def grow_utf8_index_storage(utf8, utf8len, storage, index):
+    """ Return an index storage that can be used to look up the character
+    'index' (0 <= index <= utf8len).  'storage' is a storage returned by
+    an earlier call, or null_storage(); the entries it already contains are
+    reused and not computed again.
+
+    Instead of indexing the whole string at once, only a prefix of it is
+    indexed, and the size of that prefix at least doubles at every call.
+    Accessing the start of a long string thus only costs memory and time
+    in proportion to the position accessed, and a sequential scan still
+    costs amortized O(n).  When more than half of the string would be
+    indexed anyway, the whole string is.  A prefix storage is also
+    accepted by codepoint_index_at_byte_position(), which is slower for
+    byte positions past the end of the prefix but still correct.
+    """
+    fullsize = utf8len // 64 + 1
+    oldsize = 0
+    if storage:
+        oldsize = len(storage)
+    needed = (index >> 6) + 1
+    if needed <= oldsize:
+        return storage
+    newsize = max(needed, oldsize * 2, UTF8_INDEX_STORAGE_MIN_ENTRIES)
+    if newsize * 2 >= fullsize:
+        newsize = fullsize
+    newstorage = lltype.malloc(UTF8_INDEX_STORAGE, newsize)
+    if oldsize == 0:
+        baseindex = 0
+    else:
+        for i in range(oldsize):
+            newstorage[i].baseindex = storage[i].baseindex
+            for j in range(16):
+                newstorage[i].ofs[j] = storage[i].ofs[j]
+        # the last entry of a partial storage points to the character
+        # 64 * oldsize - 3; the next entry starts three characters later
+        last = storage[oldsize - 1]
+        baseindex = last.baseindex + ord(last.ofs[15])
+        baseindex = next_codepoint_pos(utf8, baseindex)
+        baseindex = next_codepoint_pos(utf8, baseindex)
+        baseindex = next_codepoint_pos(utf8, baseindex)
+    _fill_utf8_index_storage(utf8, newstorage, oldsize, baseindex,
+                             utf8len - (oldsize << 6))
+    return newstorage
 
 @jit.elidable
 def codepoint_position_at_index(utf8, storage, index):
@@ -620,7 +672,8 @@ def codepoint_index_at_byte_position(utf8, storage, bytepos, num_codepoints):
     # use ofs to get closer to the correct character index
     result = index_min << 6
     bytepos1 = baseindex
-    if index_min == len(storage) - 1:
+    if index_min == len(storage) - 1 and (len(storage) << 6) > num_codepoints:
+        # the last entry of a complete storage
         maxindex = ((num_codepoints - 1) >> 2) & 0x0F
     else:
         maxindex = 16
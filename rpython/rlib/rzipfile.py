@@ -186,7 +186,8 @@ class RZipInfo(object):
         self.external_attr = 0          # External file attributes
         # Other attributes are set by class ZipFile:
         # header_offset         Byte offset to the file header
-        # file_offset           Byte offset to the start of the file data
+        # file_offset           Byte offset to the start of the file data,
+        #                       or -1 if the file header was not read yet
         # CRC                   CRC-32 of the uncompressed file
         # compress_size         Size of the compressed file
         # file_size             Size of the uncompressed file
@@ -238,7 +239,8 @@ class RZipFile(object):
                      + centdir[_CD_EXTRA_FIELD_LENGTH]
                      + centdir[_CD_COMMENT_LENGTH])
             x.header_offset = centdir[_CD_LOCAL_HEADER_OFFSET] + concat
-            # file_offset must be computed below...
+            # file_offset is computed by _read_file_header(), when needed
+            x.file_offset = -1
             (x.create_version, x.create_system, x.extract_version, x.reserved,
                 x.flag_bits, x.compress_type, t, d,
                 crc, x.compress_size, x.file_size) = centdir[1:12]
@@ -251,25 +253,40 @@ class RZipFile(object):
                                      t>>11, (t>>5)&0x3F, (t&0x1F) * 2 )
             self.filelist.append(x)
             self.NameToInfo[x.filename] = x
-        for data in self.filelist:
-            fp.seek(data.header_offset, 0)
-            fheader = fp.read(30)
-            if fheader[0:4] != stringFileHeader:
-                raise BadZipfile("Bad magic number for file header")
-            fheader = runpack(structFileHeader, fheader)
-            # file_offset is computed here, since the extra field for
-            # the central directory and for the local file header
-            # refer to different fields, and they can have different
-            # lengths
-            data.file_offset = (data.header_offset + 30
-                                + fheader[_FH_FILENAME_LENGTH]
-                                + fheader[_FH_EXTRA_FIELD_LENGTH])
-            fname = fp.read(fheader[_FH_FILENAME_LENGTH])
-            if fname != data.orig_filename:
-                raise BadZipfile('File name in directory "%s" and '
-                    'header "%s" differ.' % (data.orig_filename, fname))
         fp.seek(self.start_dir, 0)
 
+    def _read_file_header(self, fp, zinfo):
+        # The local file headers are only read when the corresponding
+        # file is read, instead of all of them when opening the archive:
+        # this saves a seek and a read per member of big archives.
+        if zinfo.file_offset >= 0:
+            return
+        fp.seek(zinfo.header_offset, 0)
+        fheader = fp.read(30)
+        if fheader[0:4] != stringFileHeader:
+            raise BadZipfile("Bad magic number for file header")
+        fheader = runpack(structFileHeader, fheader)
+        # the extra field for the central directory and for the local
+        # file header refer to different fields, and they can have
+        # different lengths
+        fname = fp.read(fheader[_FH_FILENAME_LENGTH])
+        if fname != zinfo.orig_filename:
+            raise BadZipfile('File name in directory "%s" and '
+                'header "%s" differ.' % (zinfo.orig_filename, fname))
+        zinfo.file_offset = (zinfo.header_offset + 30
+                             + fheader[_FH_FILENAME_LENGTH]
+                             + fheader[_FH_EXTRA_FIELD_LENGTH])
+
+    def read_file_headers(self):
+        """Compute the file_offset of all the files whose header was not
+        read yet, opening the archive only once."""
+        fp = self.get_fp()
+        try:
+            for zinfo in self.filelist:
+                self._read_file_header(fp, zinfo)
+        finally:
+            fp.close()
+
     def getinfo(self, filename):
         """Return the instance of ZipInfo given 'filename'."""
         return self.NameToInfo[filename]
@@ -279,6 +296,7 @@ class RZipFile(object):
         fp = self.get_fp()
         try:
             filepos = fp.tell()
+            self._read_file_header(fp, zinfo)
             fp.seek(zinfo.file_offset, 0)
             bytes = fp.read(intmask(zinfo.compress_size))
             fp.seek(filepos, 0)
@@ -56,6 +56,14 @@ class TestTime(BaseRtypingTest):
         assert t0 <= t1
         assert t1 - t0 >= 0.15
 
+    def test_monotonic(self):
+        def f():
+            t1 = rtime.monotonic()
+            time.sleep(0.02)
+            return rtime.monotonic() - t1
+        res = self.interpret(f, [])
+        assert 0.015 <= res <= 9.0
+
     def test_clock_gettime(self):
         if not rtime.HAS_CLOCK_GETTIME:
             py.test.skip("no clock_gettime()")
@@ -144,6 +144,46 @@ def test_codepoint_index_at_byte_position(u):
         assert rutf8.codepoint_index_at_byte_position(
                        b, storage, bytepos, len(u)) == i
 
+@given(strategies.text(), strategies.lists(strategies.integers(0, 2000)))
+@example(u'x\xe4' * 600, [0, 64, 256, 257, 1199, 1200])
+@example(u'\u1234' * 64 * 9, [0, 300, 64 * 9])
+def test_grow_utf8_index_storage(u, indexes):
+    b = u.encode('utf8')
+    storage = rutf8.null_storage()
+    for index in indexes:
+        index = min(index, len(u))
+        storage = rutf8.grow_utf8_index_storage(b, len(u), storage, index)
+        assert (index >> 6) < len(storage)
+        for i in range(min(len(u) + 1, len(storage) << 6)):
+            assert (rutf8.codepoint_position_at_index(b, storage, i) ==
+                    len(u[:i].encode('utf8')))
+        # partial storages give correct results past their end, too
+        for i in range(len(u) + 1):
+            bytepos = len(u[:i].encode('utf8'))
+            assert rutf8.codepoint_index_at_byte_position(
+                           b, storage, bytepos, len(u)) == i
+    full = rutf8.grow_utf8_index_storage(b, len(u), storage, len(u))
+    assert len(full) == len(u) // 64 + 1
+    expected = rutf8.create_utf8_index_storage(b, len(u))
+    assert len(full) == len(expected)
+    for i in range(len(full)):
+        assert full[i].baseindex == expected[i].baseindex
+
+def test_grow_utf8_index_storage_is_lazy():
+    u = u'\xe4' * 64 * 100
+    b = u.encode('utf8')
+    storage = rutf8.grow_utf8_index_storage(b, len(u), rutf8.null_storage(), 3)
+    assert len(storage) == rutf8.UTF8_INDEX_STORAGE_MIN_ENTRIES
+    assert len(storage) < len(u) // 64 + 1
+    storage2 = rutf8.grow_utf8_index_storage(b, len(u), storage, 100)
+    assert storage2 == storage
+    storage = rutf8.grow_utf8_index_storage(b, len(u), storage, 64 * 4)
+    assert len(storage) == 8
+    storage = rutf8.grow_utf8_index_storage(b, len(u), storage, 64 * 30)
+    assert len(storage) == 31
+    storage = rutf8.grow_utf8_index_storage(b, len(u), storage, 64 * 31)
+    assert len(storage) == len(u) // 64 + 1
+
 @given(strategies.text())
 def test_codepoint_position_at_index_inverse(u):
     print u
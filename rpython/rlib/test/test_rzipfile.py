@@ -43,6 +43,26 @@ class BaseTestRZipFile(BaseRtypingTest):
         assert one()
         assert self.interpret(one, [])
 
+    def test_lazy_file_header(self):
+        zipname = self.zipname
+        compression = self.compression
+        def one():
+            rzip = RZipFile(zipname, "r", compression)
+            info = rzip.getinfo('three')
+            if info.file_offset != -1:
+                return -1
+            if rzip.read('three') != 'hello, world':
+                return -2
+            offset = info.file_offset
+            info2 = rzip.getinfo('one')
+            rzip.read_file_headers()
+            return (offset == info.header_offset + 30 + len('three') and
+                    info2.file_offset == len('one') + 30 and
+                    info.file_offset == offset)
+
+        assert one()
+        assert self.interpret(one, [])
+
 class TestRZipFile(BaseTestRZipFile):
     compression = ZIP_STORED
 